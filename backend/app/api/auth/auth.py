@@ -1,9 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
+from typing import Optional
 from app.db.database import get_db
-from app.schemas.user import UserCreate, UserLogin, User, Token
+from app.schemas.user import UserCreate, UserLogin, User, Token, TokenRefresh, Logout
 from app.services.auth import AuthService
-from app.core.deps import get_current_active_user
+from app.services.tokens import TokenService
+from app.core.deps import get_current_active_user, get_token_payload
 from app.models.user import User as UserModel
 
 router = APIRouter()
@@ -21,12 +23,25 @@ def login(
     db: Session = Depends(get_db)
 ):
     user = AuthService.authenticate(db, user_login)
-    access_token = AuthService.create_token(user)
-    return {
-        "access_token": access_token,
-        "token_type": "bearer",
-        "user": user
-    }
+    return {**AuthService.create_tokens(db, user), "user": user}
+
+@router.post("/refresh", response_model=Token)
+def refresh(
+    token_refresh: TokenRefresh,
+    db: Session = Depends(get_db)
+):
+    user, tokens = TokenService.refresh(db, token_refresh.refresh_token)
+    return {**tokens, "user": user}
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+def logout(
+    logout_data: Optional[Logout] = None,
+    payload: dict = Depends(get_token_payload),
+    db: Session = Depends(get_db),
+    current_user: UserModel = Depends(get_current_active_user)
+):
+    TokenService.logout(db, payload, current_user, logout_data.refresh_token if logout_data else None)
+    return None
 
 @router.get("/me", response_model=User)
 def get_current_user_info(
@@ -0,0 +1,64 @@
+from fastapi import APIRouter, Depends, status, Query
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from app.db.database import get_db
+from app.core.deps import get_current_active_user
+from app.models.user import User
+from app.schemas.group import Group, GroupCreate, GroupMemberAdd, GroupMemberPage
+from app.services.groups import GroupsService
+
+router = APIRouter()
+
+@router.post("/", response_model=Group, status_code=status.HTTP_201_CREATED)
+def create_group(
+    group_create: GroupCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    return GroupsService.create_group(db, group_create, current_user)
+
+@router.get("/", response_model=List[Group])
+def get_groups(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    return GroupsService.get_user_groups(db, current_user)
+
+@router.delete("/{group_id}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_group(
+    group_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    GroupsService.delete_group(db, group_id, current_user)
+    return None
+
+@router.get("/{group_id}/members", response_model=GroupMemberPage)
+def get_group_members(
+    group_id: int,
+    cursor: Optional[int] = Query(None, description="Id of the last member of the previous page"),
+    limit: Optional[int] = Query(None, ge=1, description="Page size"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    return GroupsService.get_members(db, group_id, current_user, cursor, limit)
+
+@router.post("/{group_id}/members", status_code=status.HTTP_204_NO_CONTENT)
+def add_group_member(
+    group_id: int,
+    member_data: GroupMemberAdd,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    GroupsService.add_member(db, group_id, member_data, current_user)
+    return None
+
+@router.delete("/{group_id}/members/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
+def remove_group_member(
+    group_id: int,
+    user_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    GroupsService.remove_member(db, group_id, user_id, current_user)
+    return None
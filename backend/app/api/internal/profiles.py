@@ -0,0 +1,24 @@
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+from typing import Any, Dict, List, Optional
+from app.core import profiling
+
+router = APIRouter()
+
+def require_profiling_token(x_profile: Optional[str] = Header(None)):
+    # Pretend the endpoints don't exist unless profiling is configured and authorized
+    if not profiling.is_authorized(x_profile):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+
+@router.get("/", dependencies=[Depends(require_profiling_token)])
+def list_profiles() -> List[Dict[str, Any]]:
+    return profiling.list_reports()
+
+@router.get("/{report_id}", dependencies=[Depends(require_profiling_token)])
+def get_profile(report_id: str) -> Dict[str, Any]:
+    report = profiling.get_report(report_id)
+    if report is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profile not found"
+        )
+    return report
@@ -0,0 +1,72 @@
+from fastapi import APIRouter, Depends, status, Query
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from app.db.database import get_db
+from app.core.deps import get_current_active_user
+from app.models.user import User
+from app.schemas.notebook import Notebook, NotebookCreate, NotebookUpdate, NotebookMove, NotebookNotePage
+from app.services.notebooks import NotebooksService
+
+router = APIRouter()
+
+@router.post("/", response_model=Notebook, status_code=status.HTTP_201_CREATED)
+def create_notebook(
+    notebook_create: NotebookCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    return NotebooksService.create_notebook(db, notebook_create, current_user)
+
+@router.get("/", response_model=List[Notebook])
+def get_notebooks(
+    parent_id: Optional[int] = Query(None, description="List the children of this notebook instead of the top level"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    return NotebooksService.get_children(db, current_user, parent_id)
+
+@router.get("/{notebook_id}", response_model=Notebook)
+def get_notebook(
+    notebook_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    return NotebooksService.get(db, notebook_id, current_user)
+
+@router.put("/{notebook_id}", response_model=Notebook)
+def rename_notebook(
+    notebook_id: int,
+    notebook_update: NotebookUpdate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    return NotebooksService.rename_notebook(db, notebook_id, notebook_update, current_user)
+
+@router.post("/{notebook_id}/move", response_model=Notebook)
+def move_notebook(
+    notebook_id: int,
+    move: NotebookMove,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    return NotebooksService.move_notebook(db, notebook_id, move.parent_id, current_user)
+
+@router.delete("/{notebook_id}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_notebook(
+    notebook_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    NotebooksService.delete_notebook(db, notebook_id, current_user)
+    return None
+
+@router.get("/{notebook_id}/notes", response_model=NotebookNotePage)
+def get_notebook_notes(
+    notebook_id: int,
+    recursive: bool = Query(True, description="Include notes in nested notebooks"),
+    cursor: Optional[int] = Query(None, description="Id of the last note of the previous page"),
+    limit: Optional[int] = Query(None, ge=1, description="Page size"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    return NotebooksService.get_notes(db, notebook_id, current_user, recursive, cursor, limit)
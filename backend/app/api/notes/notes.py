@@ -1,12 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+import json
+from fastapi import APIRouter, Depends, HTTPException, Response, status, Query
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from app.db.database import get_db
 from app.core.deps import get_current_active_user
 from app.models.user import User
 from app.models.note import VisibilityEnum
-from app.schemas.note import Note, NoteCreate, NoteUpdate, NoteShare, PublicNote, PublicLinkResponse
+from app.schemas.note import Note, NoteCreate, NoteUpdate, NoteShare, PublicNote, PublicLinkResponse, ExplorePage, CollaboratorPage, BacklinkPage, SimilarNote, DuplicateCheck, NoteViewStats
+from app.schemas.group import NoteGroupShare
+from app.schemas.notebook import NoteFiling
 from app.services.notes import NotesService
+from app.services.explore import ExploreService
+from app.services.render import RenderService
+from app.services.similarity import SimilarityService
+from app.services.view_stats import ViewStatsService
 
 router = APIRouter()
 
@@ -24,10 +31,11 @@ def create_note(
         "content": note.content,
         "visibility": note.visibility.value,
         "owner_id": note.owner_id,
+        "notebook_id": note.notebook_id,
         "created_at": note.created_at,
         "updated_at": note.updated_at,
         "tags": note.tags,
-        "shared_with": [user.email for user in note.shared_with] if note.shared_with else [],
+        "shared_count": 0,
         "public_token": note.public_token
     }
 
@@ -40,6 +48,7 @@ def get_notes(
     current_user: User = Depends(get_current_active_user)
 ):
     notes = NotesService.get_user_notes(db, current_user, search, visibility, tags)
+    shared_counts = NotesService.get_shared_counts(db, [note.id for note in notes])
     
     return [
         {
@@ -48,35 +57,121 @@ def get_notes(
             "content": note.content,
             "visibility": note.visibility.value,
             "owner_id": note.owner_id,
+            "notebook_id": note.notebook_id,
             "created_at": note.created_at,
             "updated_at": note.updated_at,
             "tags": note.tags,
-            "shared_with": [user.email for user in note.shared_with] if note.shared_with else [],
+            "shared_count": shared_counts.get(note.id, 0),
             "public_token": note.public_token
         }
         for note in notes
     ]
 
+@router.get("/explore", response_model=ExplorePage)
+def explore_public_notes(
+    cursor: Optional[int] = Query(None, description="Id of the last note of the previous page"),
+    limit: Optional[int] = Query(None, ge=1, description="Page size"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    return ExploreService.get_public_feed(db, cursor, limit)
+
+@router.get("/changes")
+def get_note_changes(
+    since: Optional[int] = Query(None, ge=0, description="Cursor returned by the previous sync; omit for a full sync"),
+    limit: Optional[int] = Query(None, ge=1, description="Maximum number of change log entries to apply"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    changes = NotesService.get_changes(db, current_user, since, limit)
+    notes = changes["notes"]
+    shared_counts = NotesService.get_shared_counts(db, [note.id for note in notes])
+    
+    return {
+        "notes": [
+            {
+                "id": note.id,
+                "title": note.title,
+                "content": note.content,
+                "visibility": note.visibility.value,
+                "owner_id": note.owner_id,
+                "notebook_id": note.notebook_id,
+                "created_at": note.created_at,
+                "updated_at": note.updated_at,
+                "tags": note.tags,
+                "shared_count": shared_counts.get(note.id, 0),
+                "public_token": note.public_token
+            }
+            for note in notes
+        ],
+        "deleted": changes["deleted"],
+        "cursor": changes["cursor"],
+        "has_more": changes["has_more"]
+    }
+
+@router.post("/duplicates", response_model=List[SimilarNote])
+def find_duplicate_notes(
+    check: DuplicateCheck,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    return SimilarityService.find_duplicates(db, current_user, check.content, check.threshold)
+
 @router.get("/{note_id}")
 def get_note(
     note_id: int,
+    render: bool = Query(False, description="Include server-rendered, sanitized HTML"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    note = NotesService.get_note(db, note_id, current_user)
+    entry = NotesService.get_note_cached(db, note_id, current_user)
+    if not render:
+        # Already serialized: no ORM objects or encoder on the hot path
+        return Response(content=entry.body, media_type="application/json")
     
-    return {
-        "id": note.id,
-        "title": note.title,
-        "content": note.content,
-        "visibility": note.visibility.value,
-        "owner_id": note.owner_id,
-        "created_at": note.created_at,
-        "updated_at": note.updated_at,
-        "tags": note.tags,
-        "shared_with": [user.email for user in note.shared_with] if note.shared_with else [],
-        "public_token": note.public_token
-    }
+    response = json.loads(entry.body)
+    response["rendered_html"] = RenderService.render_cached(response["content"])
+    return response
+
+@router.get("/{note_id}/collaborators", response_model=CollaboratorPage)
+def get_note_collaborators(
+    note_id: int,
+    cursor: Optional[int] = Query(None, description="Id of the last collaborator of the previous page"),
+    limit: Optional[int] = Query(None, ge=1, description="Page size"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    return NotesService.get_collaborators(db, note_id, current_user, cursor, limit)
+
+@router.get("/{note_id}/backlinks", response_model=BacklinkPage)
+def get_note_backlinks(
+    note_id: int,
+    cursor: Optional[int] = Query(None, description="Id of the last linking note of the previous page"),
+    limit: Optional[int] = Query(None, ge=1, description="Page size"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    return NotesService.get_backlinks(db, note_id, current_user, cursor, limit)
+
+@router.get("/{note_id}/views", response_model=NoteViewStats)
+def get_note_views(
+    note_id: int,
+    days: Optional[int] = Query(None, ge=1, description="Number of days up to today"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    note = NotesService.get_note(db, note_id, current_user)
+    return ViewStatsService.get_stats(db, note, current_user, days)
+
+@router.get("/{note_id}/similar", response_model=List[SimilarNote])
+def get_similar_notes(
+    note_id: int,
+    limit: Optional[int] = Query(None, ge=1, le=100, description="Maximum number of notes"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    note = NotesService.get_note(db, note_id, current_user)
+    return SimilarityService.similar_notes(db, note, current_user, limit)
 
 @router.put("/{note_id}")
 def update_note(
@@ -93,13 +188,24 @@ def update_note(
         "content": note.content,
         "visibility": note.visibility.value,
         "owner_id": note.owner_id,
+        "notebook_id": note.notebook_id,
         "created_at": note.created_at,
         "updated_at": note.updated_at,
         "tags": note.tags,
-        "shared_with": [user.email for user in note.shared_with] if note.shared_with else [],
+        "shared_count": NotesService.get_shared_counts(db, [note.id]).get(note.id, 0),
         "public_token": note.public_token
     }
 
+@router.put("/{note_id}/notebook", status_code=status.HTTP_204_NO_CONTENT)
+def file_note(
+    note_id: int,
+    filing: NoteFiling,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    NotesService.file_note(db, note_id, filing.notebook_id, current_user)
+    return None
+
 @router.delete("/{note_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_note(
     note_id: int,
@@ -124,13 +230,47 @@ def share_note(
         "content": note.content,
         "visibility": note.visibility.value,
         "owner_id": note.owner_id,
+        "notebook_id": note.notebook_id,
         "created_at": note.created_at,
         "updated_at": note.updated_at,
         "tags": note.tags,
-        "shared_with": [user.email for user in note.shared_with] if note.shared_with else [],
+        "shared_count": NotesService.get_shared_counts(db, [note.id]).get(note.id, 0),
         "public_token": note.public_token
     }
 
+@router.post("/{note_id}/share-group")
+def share_note_with_group(
+    note_id: int,
+    share_data: NoteGroupShare,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    note = NotesService.share_note_with_group(db, note_id, share_data, current_user)
+    
+    return {
+        "id": note.id,
+        "title": note.title,
+        "content": note.content,
+        "visibility": note.visibility.value,
+        "owner_id": note.owner_id,
+        "notebook_id": note.notebook_id,
+        "created_at": note.created_at,
+        "updated_at": note.updated_at,
+        "tags": note.tags,
+        "shared_count": NotesService.get_shared_counts(db, [note.id]).get(note.id, 0),
+        "public_token": note.public_token
+    }
+
+@router.delete("/{note_id}/share-group/{group_id}", status_code=status.HTTP_204_NO_CONTENT)
+def unshare_note_with_group(
+    note_id: int,
+    group_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    NotesService.unshare_note_with_group(db, note_id, group_id, current_user)
+    return None
+
 @router.post("/{note_id}/public-link", response_model=PublicLinkResponse)
 def generate_public_link(
     note_id: int,
@@ -1,25 +1,36 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.orm import Session
+from app.core import compression
 from app.db.database import get_db
+from app.db import flush_views
 from app.schemas.note import PublicNote
 from app.services.notes import NotesService
+from app.services.public_notes import PublicNoteCache
+from app.services.render import RenderService
+from app.services.view_stats import ViewStatsService
 
 router = APIRouter()
 
 @router.get("/{public_token}", response_model=PublicNote)
 def get_public_note(
     public_token: str,
+    request: Request,
+    background_tasks: BackgroundTasks,
+    render: bool = Query(False, description="Include server-rendered, sanitized HTML"),
     db: Session = Depends(get_db)
 ):
-    note = NotesService.get_public_note(db, public_token)
+    entry, version = PublicNoteCache.get(db, public_token, render)
+    if entry is None:
+        note = NotesService.get_public_note(db, public_token)
+        rendered_html = RenderService.get_html(note) if render else None
+        entry = PublicNoteCache.put(public_token, note, version, rendered_html)
     
-    return {
-        "id": note.id,
-        "title": note.title,
-        "content": note.content,
-        "visibility": note.visibility.value,
-        "created_at": note.created_at,
-        "updated_at": note.updated_at,
-        "tags": note.tags,
-        "public_token": note.public_token
-    } 
\ No newline at end of file
+    if ViewStatsService.enabled() and ViewStatsService.record(entry.note_id, request.headers.get("referer")):
+        background_tasks.add_task(flush_views.flush_in_background)
+    
+    encoding = compression.negotiate(request.headers.get("accept-encoding"))
+    body, encoding = entry.for_encoding(encoding)
+    headers = {"Vary": "Accept-Encoding"}
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -0,0 +1,27 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from app.db.database import get_db
+from app.core.deps import get_current_active_user
+from app.models.user import User
+from app.schemas.note import TagUsage
+from app.services.tags import TagsService
+
+router = APIRouter()
+
+@router.get("/", response_model=List[TagUsage])
+def get_tag_catalog(
+    limit: Optional[int] = Query(None, ge=1, description="Maximum number of tags"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    return TagsService.get_catalog(db, current_user, limit)
+
+@router.get("/autocomplete", response_model=List[TagUsage])
+def autocomplete_tags(
+    prefix: str = Query("", description="Tag name prefix"),
+    limit: Optional[int] = Query(None, ge=1, description="Maximum number of suggestions"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    return TagsService.autocomplete(db, current_user, prefix, limit)
@@ -0,0 +1,148 @@
+"""Per-client admission control and load shedding (``ADMISSION_*`` settings)."""
+import json
+import math
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+from app.core.config import settings
+from app.core.security import verify_token
+from app.core import metrics
+
+PUBLIC_READ = "public_read"
+READ = "read"
+WRITE = "write"
+AUTH = "auth"
+
+REJECTED = metrics.counter(
+    "admission_rejected_total", "Requests rejected by admission control", ("priority", "reason")
+)
+
+def classify(method: str, path: str) -> Optional[str]:
+    if path.startswith("/api/auth/"):
+        return AUTH
+    if path.startswith("/api/public/"):
+        return PUBLIC_READ
+    if path.startswith("/api/"):
+        return READ if method in ("GET", "HEAD", "OPTIONS") else WRITE
+    # Root, docs, metrics and internal endpoints are never throttled
+    return None
+
+class TokenBucket:
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+
+    def __init__(self, rate: float, capacity: float, now: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = now
+
+    def take(self, cost: float, now: float) -> float:
+        """Consume ``cost`` tokens; return 0 on success or seconds until possible."""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= cost:
+            self.tokens -= cost
+            return 0.0
+        return (min(cost, self.capacity) - self.tokens) / self.rate
+
+class AdmissionController:
+    def __init__(self):
+        self.buckets: "OrderedDict[Tuple[str, str], TokenBucket]" = OrderedDict()
+        self.client_in_flight: Dict[str, int] = {}
+        self.in_flight = 0
+
+    def _bucket(self, key: str, priority: str, now: float) -> TokenBucket:
+        bucket = self.buckets.get((key, priority))
+        if bucket is None:
+            rate, burst = settings.ADMISSION_RATES[priority]
+            bucket = self.buckets[(key, priority)] = TokenBucket(rate, burst, now)
+            while len(self.buckets) > settings.ADMISSION_MAX_KEYS:
+                self.buckets.popitem(last=False)
+        else:
+            self.buckets.move_to_end((key, priority))
+        return bucket
+
+    def admit(self, key: str, priority: str, cost: float) -> Optional[Tuple[int, str, float]]:
+        """Return None to admit, else (status, reason, retry_after_seconds)."""
+        shed_at = settings.ADMISSION_MAX_IN_FLIGHT * settings.ADMISSION_SHED_THRESHOLDS[priority]
+        if self.in_flight >= shed_at:
+            return 503, "overloaded", 1.0
+        if self.client_in_flight.get(key, 0) >= settings.ADMISSION_CLIENT_MAX_IN_FLIGHT:
+            return 429, "concurrency", 1.0
+        wait = self._bucket(key, priority, time.monotonic()).take(cost, time.monotonic())
+        if wait:
+            return 429, "rate", wait
+        return None
+
+    def acquire(self, key: str) -> None:
+        self.in_flight += 1
+        self.client_in_flight[key] = self.client_in_flight.get(key, 0) + 1
+
+    def release(self, key: str) -> None:
+        self.in_flight -= 1
+        remaining = self.client_in_flight[key] - 1
+        if remaining:
+            self.client_in_flight[key] = remaining
+        else:
+            del self.client_in_flight[key]
+
+def _client_key(scope) -> str:
+    for name, value in scope.get("headers", ()):
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            if scheme.lower() == "bearer" and token:
+                payload = verify_token(token)
+                if payload and payload.get("sub"):
+                    return f"user:{payload['sub']}"
+            break
+    client = scope.get("client")
+    return f"ip:{client[0] if client else 'unknown'}"
+
+def _request_cost(scope) -> float:
+    # Searches scan far more rows than plain listings
+    if b"search=" in scope.get("query_string", b""):
+        return settings.ADMISSION_SEARCH_COST
+    return 1.0
+
+class AdmissionMiddleware:
+    def __init__(self, app):
+        self.app = app
+        self.controller = AdmissionController()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        priority = classify(scope["method"], scope["path"])
+        if priority is None:
+            await self.app(scope, receive, send)
+            return
+
+        key = _client_key(scope)
+        rejection = self.controller.admit(key, priority, _request_cost(scope))
+        if rejection is not None:
+            status, reason, retry_after = rejection
+            REJECTED.inc(priority, reason)
+            await self._reject(send, status, reason, retry_after)
+            return
+
+        self.controller.acquire(key)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release(key)
+
+    @staticmethod
+    async def _reject(send, status: int, reason: str, retry_after: float) -> None:
+        detail = "Server is overloaded, retry later" if status == 503 else "Too many requests"
+        body = json.dumps({"detail": detail, "reason": reason}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(max(1, math.ceil(retry_after))).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,216 @@
+"""Negotiated response compression within a per-worker CPU budget."""
+import gzip
+import threading
+import time
+import zlib
+from typing import Dict, List, Optional
+from app.core.config import settings
+from app.core import metrics
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "text/",
+)
+
+COMPRESSED_BYTES = metrics.counter(
+    "compression_bytes_total", "Response bytes before and after compression", ("encoding", "stage")
+)
+SKIPPED = metrics.counter("compression_skipped_total", "Responses left uncompressed", ("reason",))
+
+def available_encodings() -> List[str]:
+    """Supported encodings in server preference order."""
+    encodings = []
+    if brotli is not None:
+        encodings.append("br")
+    if zstandard is not None:
+        encodings.append("zstd")
+    encodings.append("gzip")
+    return encodings
+
+def negotiate(accept_encoding: Optional[str]) -> Optional[str]:
+    if not accept_encoding:
+        return None
+    accepted: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+    wildcard = accepted.get("*", 0.0)
+    for encoding in available_encodings():
+        if accepted.get(encoding, wildcard) > 0:
+            return encoding
+    return None
+
+def compress(data: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(data, quality=settings.COMPRESSION_BROTLI_QUALITY)
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=settings.COMPRESSION_ZSTD_LEVEL).compress(data)
+    return gzip.compress(data, compresslevel=settings.COMPRESSION_GZIP_LEVEL, mtime=0)
+
+def compress_all(data: bytes) -> Dict[str, bytes]:
+    """Every available encoding of ``data``, for precompressed cache entries."""
+    return {encoding: compress(data, encoding) for encoding in available_encodings()}
+
+class _StreamEncoder:
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=settings.COMPRESSION_BROTLI_QUALITY)
+        elif encoding == "zstd":
+            self._compressor = zstandard.ZstdCompressor(level=settings.COMPRESSION_ZSTD_LEVEL).compressobj()
+        else:
+            self._compressor = zlib.compressobj(settings.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def chunk(self, data: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.process(data) + self._compressor.flush()
+        if self.encoding == "zstd":
+            return self._compressor.compress(data) + self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.finish()
+        return self._compressor.flush()
+
+class CPUBudget:
+    """Tracks compression CPU time spent in the current one-second window."""
+
+    def __init__(self):
+        self.window_start = time.monotonic()
+        self.spent = 0.0
+        self._lock = threading.Lock()
+
+    def available(self) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            if now - self.window_start >= 1.0:
+                self.window_start = now
+                self.spent = 0.0
+            return self.spent < settings.COMPRESSION_CPU_BUDGET
+
+    def charge(self, seconds: float) -> None:
+        with self._lock:
+            self.spent += seconds
+
+def _header(headers, name: bytes) -> Optional[bytes]:
+    for key, value in headers:
+        if key.lower() == name:
+            return value
+    return None
+
+class CompressionMiddleware:
+    def __init__(self, app):
+        self.app = app
+        self.budget = CPUBudget()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        accept = _header(scope.get("headers", ()), b"accept-encoding")
+        encoding = negotiate(accept.decode("latin-1") if accept else None)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        state = {"start": None, "encoder": None, "passthrough": False}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                headers = message.get("headers", [])
+                content_type = (_header(headers, b"content-type") or b"").decode("latin-1")
+                if (
+                    _header(headers, b"content-encoding") is not None
+                    or message["status"] in (204, 304)
+                    or not content_type.startswith(COMPRESSIBLE_TYPES)
+                ):
+                    state["passthrough"] = True
+                    await send(message)
+                else:
+                    state["start"] = message
+                return
+
+            if state["passthrough"]:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            start = state["start"]
+
+            if state["encoder"] is not None:
+                began = time.thread_time()
+                chunk = state["encoder"].chunk(body)
+                if not more_body:
+                    chunk += state["encoder"].finish()
+                self.budget.charge(time.thread_time() - began)
+                COMPRESSED_BYTES.inc(encoding, "in", amount=len(body))
+                COMPRESSED_BYTES.inc(encoding, "out", amount=len(chunk))
+                await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+                return
+
+            if not more_body:
+                # Whole body in one message: compress it in one go
+                if len(body) < settings.COMPRESSION_MIN_SIZE:
+                    SKIPPED.inc("small")
+                    await send(start)
+                    await send(message)
+                    return
+                if not self.budget.available():
+                    SKIPPED.inc("cpu_budget")
+                    await send(start)
+                    await send(message)
+                    return
+                began = time.thread_time()
+                compressed = compress(body, encoding)
+                self.budget.charge(time.thread_time() - began)
+                COMPRESSED_BYTES.inc(encoding, "in", amount=len(body))
+                COMPRESSED_BYTES.inc(encoding, "out", amount=len(compressed))
+                start["headers"] = self._encoded_headers(start.get("headers", []), encoding, len(compressed))
+                await send(start)
+                await send({"type": "http.response.body", "body": compressed, "more_body": False})
+                return
+
+            # Streaming response: compress incrementally, flushing every chunk
+            if not self.budget.available():
+                SKIPPED.inc("cpu_budget")
+                state["passthrough"] = True
+                await send(start)
+                await send(message)
+                return
+            state["encoder"] = _StreamEncoder(encoding)
+            start["headers"] = self._encoded_headers(start.get("headers", []), encoding, None)
+            await send(start)
+            await send_wrapper(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+    @staticmethod
+    def _encoded_headers(headers, encoding: str, length: Optional[int]):
+        vary = _header(headers, b"vary")
+        headers = [(k, v) for k, v in headers if k.lower() not in (b"content-length", b"vary")]
+        headers.append((b"content-encoding", encoding.encode()))
+        headers.append((b"vary", vary + b", Accept-Encoding" if vary else b"Accept-Encoding"))
+        if length is not None:
+            headers.append((b"content-length", str(length).encode()))
+        return headers
@@ -10,7 +10,13 @@ class Settings(BaseSettings):
     
     SECRET_KEY: str = os.getenv("SECRET_KEY", "your-secret-key-change-in-production")
     ALGORITHM: str = "HS256"
-    ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "15"))
+    REFRESH_TOKEN_EXPIRE_DAYS: int = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "30"))
+    # Revoked access tokens are read into each worker's denylist this often
+    REVOCATION_SYNC_SECONDS: int = int(os.getenv("REVOCATION_SYNC_SECONDS", "5"))
+    REVOCATION_BLOOM_CAPACITY: int = 100000
+    REVOCATION_BLOOM_ERROR_RATE: float = 0.001
+    TOKEN_PURGE_INTERVAL_SECONDS: int = int(os.getenv("TOKEN_PURGE_INTERVAL_SECONDS", "3600"))
     
     BACKEND_CORS_ORIGINS: list = ["http://localhost:3000", "http://127.0.0.1:3000"]
     
@@ -18,6 +24,146 @@ class Settings(BaseSettings):
     VERSION: str = "1.0.0"
     DEBUG: bool = os.getenv("DEBUG", "True").lower() == "true"
     
+    WEB_CONCURRENCY: int = int(os.getenv("WEB_CONCURRENCY", str(os.cpu_count() or 1)))
+    SERVER_LOOP: str = os.getenv("SERVER_LOOP", "auto")
+    SERVER_HTTP: str = os.getenv("SERVER_HTTP", "auto")
+    GRACEFUL_SHUTDOWN_TIMEOUT: int = int(os.getenv("GRACEFUL_SHUTDOWN_TIMEOUT", "30"))
+    
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    DB_POOL_TIMEOUT: int = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+    # Hash partitions for notes, note_tags and note_shares on Postgres; 0 disables
+    NOTES_PARTITIONS: int = int(os.getenv("NOTES_PARTITIONS", "0"))
+    
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "True").lower() == "true"
+    
+    ADMISSION_ENABLED: bool = os.getenv("ADMISSION_ENABLED", "True").lower() == "true"
+    ADMISSION_MAX_IN_FLIGHT: int = int(os.getenv("ADMISSION_MAX_IN_FLIGHT", "64"))
+    ADMISSION_CLIENT_MAX_IN_FLIGHT: int = int(os.getenv("ADMISSION_CLIENT_MAX_IN_FLIGHT", "8"))
+    ADMISSION_MAX_KEYS: int = 10000
+    ADMISSION_SEARCH_COST: float = 5.0
+    # Priority class -> (tokens per second, burst) for each client
+    ADMISSION_RATES: dict = {
+        "public_read": (10.0, 30.0),
+        "read": (20.0, 60.0),
+        "write": (5.0, 20.0),
+        "auth": (1.0, 10.0),
+    }
+    # Priority class -> fraction of ADMISSION_MAX_IN_FLIGHT above which it is shed
+    ADMISSION_SHED_THRESHOLDS: dict = {
+        "public_read": 0.6,
+        "read": 0.8,
+        "write": 0.9,
+        "auth": 1.0,
+    }
+    
+    COMPRESSION_ENABLED: bool = os.getenv("COMPRESSION_ENABLED", "True").lower() == "true"
+    COMPRESSION_MIN_SIZE: int = 1024
+    COMPRESSION_CPU_BUDGET: float = float(os.getenv("COMPRESSION_CPU_BUDGET", "0.25"))
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 5
+    COMPRESSION_ZSTD_LEVEL: int = 3
+    
+    CONTENT_COMPRESSION_ENABLED: bool = os.getenv("CONTENT_COMPRESSION_ENABLED", "True").lower() == "true"
+    CONTENT_COMPRESSION_MIN_BYTES: int = int(os.getenv("CONTENT_COMPRESSION_MIN_BYTES", "4096"))
+    CONTENT_ZSTD_LEVEL: int = 6
+    CONTENT_DICTIONARY_SIZE: int = 64 * 1024
+    
+    PUBLIC_NOTE_CACHE_SIZE_BYTES: int = 32 * 1024 * 1024
+    PUBLIC_NOTE_CACHE_TTL_SECONDS: int = 30
+    
+    # Shared tier: "local" (in-process stand-in) or "module:factory"; empty disables it
+    NOTE_CACHE_BACKEND: str = os.getenv("NOTE_CACHE_BACKEND", "")
+    # On by default only with a shared server to publish invalidations through: without
+    # one, workers serve each other's stale notes until the next sync
+    NOTE_CACHE_ENABLED: bool = os.getenv(
+        "NOTE_CACHE_ENABLED", "True" if ":" in NOTE_CACHE_BACKEND else "False"
+    ).lower() == "true"
+    NOTE_CACHE_SIZE_BYTES: int = int(os.getenv("NOTE_CACHE_SIZE_BYTES", str(32 * 1024 * 1024)))
+    NOTE_CACHE_TTL_SECONDS: int = 300
+    NOTE_CACHE_ACCESS_SIZE: int = 100000
+    NOTE_CACHE_MAX_INVALIDATIONS: int = 100000
+    NOTE_CACHE_SYNC_SECONDS: float = float(os.getenv("NOTE_CACHE_SYNC_SECONDS", "1"))
+    NOTE_CACHE_SHARED_TTL_SECONDS: int = 60
+    NOTE_CACHE_SHARED_SIZE_BYTES: int = 64 * 1024 * 1024
+    
+    RENDER_CACHE_SIZE_BYTES: int = 64 * 1024 * 1024
+    RENDER_WORKERS: int = 2
+    RENDER_PERSIST: bool = os.getenv("RENDER_PERSIST", "False").lower() == "true"
+    
+    PROFILING_TOKEN: Optional[str] = os.getenv("PROFILING_TOKEN")
+    PROFILING_SAMPLE_RATE: float = float(os.getenv("PROFILING_SAMPLE_RATE", "0"))
+    PROFILING_SAMPLE_INTERVAL_MS: float = 5.0
+    PROFILING_MAX_DEPTH: int = 64
+    PROFILING_MAX_REPORTS: int = 50
+    SLOW_QUERY_THRESHOLD_MS: float = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", "200"))
+    
+    EXPLORE_PAGE_SIZE: int = 20
+    EXPLORE_MAX_PAGE_SIZE: int = 100
+    EXPLORE_SNAPSHOT_SIZE: int = int(os.getenv("EXPLORE_SNAPSHOT_SIZE", "200"))
+    EXPLORE_SNAPSHOT_TTL_SECONDS: int = int(os.getenv("EXPLORE_SNAPSHOT_TTL_SECONDS", "30"))
+    
+    GROUP_MEMBERS_PAGE_SIZE: int = 50
+    GROUP_MEMBERS_MAX_PAGE_SIZE: int = 500
+    COLLABORATORS_PAGE_SIZE: int = 50
+    COLLABORATORS_MAX_PAGE_SIZE: int = 500
+    BACKLINKS_PAGE_SIZE: int = 50
+    BACKLINKS_MAX_PAGE_SIZE: int = 500
+    LINKS_BUILD_BATCH_SIZE: int = 500
+    
+    NOTEBOOK_MAX_DEPTH: int = 32
+    NOTEBOOK_NOTES_PAGE_SIZE: int = 50
+    NOTEBOOK_NOTES_MAX_PAGE_SIZE: int = 500
+    
+    # Public note views are buffered per worker and flushed in batches; 0 disables counting
+    VIEW_STATS_FLUSH_INTERVAL_SECONDS: int = int(os.getenv("VIEW_STATS_FLUSH_INTERVAL_SECONDS", "10"))
+    VIEW_STATS_MAX_PENDING: int = 10000
+    VIEW_STATS_FLUSH_BATCH_SIZE: int = 500
+    VIEW_STATS_DAYS: int = 30
+    VIEW_STATS_MAX_DAYS: int = 366
+    VIEW_STATS_TOP_REFERRERS: int = 10
+    
+    # Notifications are queued in notification_outbox and delivered in digests
+    NOTIFICATION_INTERVAL_SECONDS: int = int(os.getenv("NOTIFICATION_INTERVAL_SECONDS", "15"))
+    NOTIFICATION_DIGEST_SECONDS: int = int(os.getenv("NOTIFICATION_DIGEST_SECONDS", "60"))
+    NOTIFICATION_BATCH_SIZE: int = 1000
+    NOTIFICATION_MAX_ATTEMPTS: int = 5
+    NOTIFICATION_RETRY_SECONDS: int = 30
+    NOTIFICATION_MAX_BACKOFF_SECONDS: int = 300
+    # How long a dispatching worker holds its batch before another may resend it
+    NOTIFICATION_CLAIM_SECONDS: int = 300
+    # "log", "memory", "smtp" or "module:factory"
+    NOTIFICATION_EMAIL_SINK: str = os.getenv("NOTIFICATION_EMAIL_SINK", "log")
+    NOTIFICATION_PUSH_SINK: str = os.getenv("NOTIFICATION_PUSH_SINK", "log")
+    SMTP_HOST: str = os.getenv("SMTP_HOST", "localhost")
+    SMTP_PORT: int = int(os.getenv("SMTP_PORT", "1025"))
+    SMTP_FROM: str = os.getenv("SMTP_FROM", "CollabNotes <notifications@localhost>")
+    SMTP_TIMEOUT_SECONDS: float = 10.0
+    
+    TAG_AUTOCOMPLETE_LIMIT: int = 10
+    TAG_CATALOG_MAX_SIZE: int = 1000
+    TAG_GC_BATCH_SIZE: int = 1000
+    TAG_GC_INTERVAL_SECONDS: int = int(os.getenv("TAG_GC_INTERVAL_SECONDS", "3600"))
+    
+    CHANGES_PAGE_SIZE: int = 500
+    CHANGES_MAX_PAGE_SIZE: int = 5000
+    CHANGES_SETTLE_SECONDS: float = float(os.getenv("CHANGES_SETTLE_SECONDS", "2"))
+    CHANGES_RETENTION_DAYS: int = int(os.getenv("CHANGES_RETENTION_DAYS", "30"))
+    CHANGES_PURGE_BATCH_SIZE: int = 10000
+    CHANGES_PURGE_INTERVAL_SECONDS: int = int(os.getenv("CHANGES_PURGE_INTERVAL_SECONDS", "3600"))
+    
+    # MinHash over word shingles; changing these needs app.db.build_signatures --rebuild
+    SIMILARITY_NUM_PERM: int = 64
+    SIMILARITY_BANDS: int = 32
+    SIMILARITY_SHINGLE_WORDS: int = 2
+    SIMILARITY_MIN_SCORE: float = 0.2
+    SIMILARITY_DUPLICATE_THRESHOLD: float = 0.7
+    SIMILARITY_LIMIT: int = 10
+    SIMILARITY_INDEX_CACHE_BYTES: int = int(os.getenv("SIMILARITY_INDEX_CACHE_BYTES", str(256 * 1024 * 1024)))
+    SIMILARITY_INDEX_TTL_SECONDS: int = int(os.getenv("SIMILARITY_INDEX_TTL_SECONDS", "300"))
+    SIMILARITY_BUILD_BATCH_SIZE: int = 500
+    
     class Config:
         env_file = ".env"
 
@@ -5,33 +5,43 @@ from app.db.database import get_db
 from app.core.security import verify_token
 from app.models.user import User
 from app.schemas.user import TokenData
+from app.services.tokens import TokenService
 
 security = HTTPBearer()
 
-def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> User:
-    credentials_exception = HTTPException(
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+def get_token_payload(credentials: HTTPAuthorizationCredentials = Depends(security)) -> dict:
+    """Claims of a valid, unrevoked access token."""
+    payload = verify_token(credentials.credentials)
+    if payload is None or payload.get("type") != "access":
+        raise _credentials_exception()
     
-    token = credentials.credentials
-    payload = verify_token(token)
-    if payload is None:
-        raise credentials_exception
+    sub = payload.get("sub")
+    jti = payload.get("jti")
+    if not sub or not str(sub).isdigit() or not jti:
+        raise _credentials_exception()
     
-    email: str = payload.get("sub")
-    if email is None:
-        raise credentials_exception
+    # In-memory check, no query: see TokenService
+    if TokenService.is_revoked(jti):
+        raise _credentials_exception()
     
-    token_data = TokenData(email=email)
+    return payload
+
+def get_current_user(
+    payload: dict = Depends(get_token_payload),
+    db: Session = Depends(get_db)
+) -> User:
+    token_data = TokenData(user_id=int(payload["sub"]), jti=payload["jti"])
     
-    user = db.query(User).filter(User.email == token_data.email).first()
+    user = db.get(User, token_data.user_id)
     if user is None:
-        raise credentials_exception
+        raise _credentials_exception()
     
     return user
 
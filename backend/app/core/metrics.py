@@ -0,0 +1,245 @@
+"""In-process metrics with Prometheus text exposition; each worker keeps its own values."""
+import bisect
+import threading
+import time
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Sequence, Tuple
+from sqlalchemy import event
+from starlette.routing import Match
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Tuple[str, ...]) -> Tuple[str, ...]:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        return labels
+
+    def _format_labels(self, labels: Tuple[str, ...], extra: Optional[Tuple[str, str]] = None) -> str:
+        pairs = list(zip(self.labelnames, labels))
+        if extra:
+            pairs.append(extra)
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{self._format_labels(labels)} {value}" for labels, value in items]
+
+class Gauge(Counter):
+    type_name = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1.0) -> None:
+        self.inc(*labels, amount=-amount)
+
+    def set(self, *labels: str, value: float) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [per-bucket counts..., +Inf count, sum]
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            state[index] += 1
+            state[-1] += value
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = [(labels, list(state)) for labels, state in self._values.items()]
+        lines = []
+        for labels, state in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, state):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{self._format_labels(labels, ('le', repr(bound)))} {cumulative}")
+            cumulative += state[len(self.buckets)]
+            lines.append(f"{self.name}_bucket{self._format_labels(labels, ('le', '+Inf'))} {cumulative}")
+            lines.append(f"{self.name}_sum{self._format_labels(labels)} {state[-1]}")
+            lines.append(f"{self.name}_count{self._format_labels(labels)} {cumulative}")
+        return lines
+
+_registry: Dict[str, _Metric] = {}
+_registry_lock = threading.Lock()
+
+def _register(cls, name: str, *args, **kwargs):
+    with _registry_lock:
+        metric = _registry.get(name)
+        if metric is None:
+            metric = _registry[name] = cls(name, *args, **kwargs)
+        elif not isinstance(metric, cls):
+            raise ValueError(f"Metric {name} already registered as {metric.type_name}")
+        return metric
+
+def counter(name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+    return _register(Counter, name, documentation, labelnames)
+
+def gauge(name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+    return _register(Gauge, name, documentation, labelnames)
+
+def histogram(name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+    return _register(Histogram, name, documentation, labelnames, buckets)
+
+def render() -> str:
+    with _registry_lock:
+        metrics = list(_registry.values())
+    lines = []
+    for metric in metrics:
+        lines.extend(metric.header())
+        lines.extend(metric.samples())
+    return "\n".join(lines) + "\n"
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+REQUESTS = counter("http_requests_total", "HTTP requests by method, route and status", ("method", "route", "status"))
+LATENCY = histogram("http_request_duration_seconds", "HTTP request latency", ("method", "route"))
+IN_PROGRESS = gauge("http_requests_in_progress", "HTTP requests currently being served", ("method",))
+SQL_STATEMENTS = counter("db_statements_total", "SQL statements executed, by route", ("route",))
+SQL_TIME = counter("db_time_seconds_total", "Time spent executing SQL, by route", ("route",))
+SQL_PER_REQUEST = histogram(
+    "db_statements_per_request", "SQL statements executed per request", ("route",),
+    buckets=(1, 2, 5, 10, 20, 50, 100, 500)
+)
+CACHE = counter("cache_requests_total", "Cache lookups by cache name and result", ("cache", "result"))
+
+def cache_hit(cache: str) -> None:
+    CACHE.inc(cache, "hit")
+
+def cache_miss(cache: str) -> None:
+    CACHE.inc(cache, "miss")
+
+class _RequestStats:
+    __slots__ = ("statements", "db_time")
+
+    def __init__(self):
+        self.statements = 0
+        self.db_time = 0.0
+
+_current_request: ContextVar[Optional[_RequestStats]] = ContextVar("metrics_request", default=None)
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("metrics_start", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get("metrics_start")
+    if not started:
+        return
+    elapsed = time.perf_counter() - started.pop()
+    stats = _current_request.get()
+    if stats is not None:
+        stats.statements += 1
+        stats.db_time += elapsed
+
+def _handle_error(exception_context):
+    conn = exception_context.connection
+    started = conn.info.get("metrics_start") if conn is not None else None
+    if started:
+        started.pop()
+
+def instrument_engine(engine) -> None:
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(engine, "handle_error", _handle_error)
+
+def _route_label(scope) -> str:
+    route = scope.get("route")
+    if route is None:
+        # Older Starlette versions don't expose the matched route in the scope
+        app = scope.get("app")
+        for candidate in getattr(getattr(app, "router", None), "routes", ()):
+            match, _ = candidate.matches(scope)
+            if match == Match.FULL:
+                route = candidate
+                break
+    template = getattr(route, "path", None)
+    if template is None:
+        return "<unmatched>"
+    # Routes of included routers may only carry their own path; restore the
+    # prefix from the request path so labels stay templated and unique
+    segments = [s for s in scope["path"].split("/") if s]
+    route_segments = [s for s in template.split("/") if s]
+    prefix = segments[:max(0, len(segments) - len(route_segments))]
+    if prefix:
+        return "/" + "/".join(prefix) + template
+    return template
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording latency, status and SQL usage per route."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_holder = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status_holder[0] = message["status"]
+            await send(message)
+
+        stats = _RequestStats()
+        token = _current_request.set(stats)
+        IN_PROGRESS.inc(method)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            IN_PROGRESS.dec(method)
+            _current_request.reset(token)
+            route = _route_label(scope)
+            REQUESTS.inc(method, route, str(status_holder[0]))
+            LATENCY.observe(elapsed, method, route)
+            if stats.statements:
+                SQL_STATEMENTS.inc(route, amount=stats.statements)
+                SQL_TIME.inc(route, amount=stats.db_time)
+            SQL_PER_REQUEST.observe(stats.statements, route)
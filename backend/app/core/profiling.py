@@ -0,0 +1,250 @@
+"""On-demand request profiling and the slow-query log."""
+import logging
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from contextvars import ContextVar
+from typing import List, Optional
+from sqlalchemy import event
+from app.core.config import settings
+
+slow_query_logger = logging.getLogger("app.slow_query")
+
+_APP_PREFIX = "app."
+
+def _redact(parameters) -> str:
+    def describe(value):
+        if value is None:
+            return "NULL"
+        if isinstance(value, (str, bytes)):
+            return f"<{type(value).__name__} len={len(value)}>"
+        return f"<{type(value).__name__}>"
+
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(f"{key}: {describe(value)}" for key, value in parameters.items()) + "}"
+    if isinstance(parameters, (list, tuple)):
+        if parameters and isinstance(parameters[0], (list, tuple, dict)):
+            return f"<{len(parameters)} parameter sets>"
+        return "(" + ", ".join(describe(value) for value in parameters) + ")"
+    return describe(parameters)
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    module = frame.f_globals.get("__name__", "?")
+    return f"{module}:{getattr(code, 'co_qualname', code.co_name)}"
+
+def _calling_service(frame) -> Optional[str]:
+    """Name the service method behind a statement, else the nearest app frame."""
+    first_app_frame = None
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        if module.startswith("app.services."):
+            return _frame_label(frame)
+        if first_app_frame is None and module.startswith(_APP_PREFIX) and module != __name__:
+            first_app_frame = frame
+        frame = frame.f_back
+    return _frame_label(first_app_frame) if first_app_frame is not None else None
+
+class ProfileSession:
+    """Collects SQL statements and stack samples for one request."""
+
+    def __init__(self, method: str, path: str):
+        self.id = uuid.uuid4().hex
+        self.method = method
+        self.path = path
+        self.started_at = time.time()
+        self.duration = 0.0
+        self.status: Optional[int] = None
+        self.statements: List[dict] = []
+        self.threads = set()
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._lock = threading.Lock()
+
+    def add_statement(self, statement: str, parameters, elapsed: float, frame) -> None:
+        self.threads.add(threading.get_ident())
+        with self._lock:
+            self.statements.append({
+                "statement": statement,
+                "parameters": _redact(parameters),
+                "duration_ms": round(elapsed * 1000, 3),
+                "caller": _calling_service(frame),
+            })
+
+    def sample(self, frames) -> None:
+        for ident in list(self.threads):
+            frame = frames.get(ident)
+            if frame is None:
+                continue
+            stack = []
+            depth = 0
+            while frame is not None and depth < settings.PROFILING_MAX_DEPTH:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+                depth += 1
+            # Drop server/threadpool frames below the first application frame
+            while stack and not stack[-1].startswith(_APP_PREFIX):
+                stack.pop()
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def report(self) -> dict:
+        sql_time = sum(s["duration_ms"] for s in self.statements)
+        by_caller: Counter = Counter()
+        for statement in self.statements:
+            by_caller[statement["caller"] or "<unknown>"] += statement["duration_ms"]
+        leaf_counts: Counter = Counter()
+        for stack, count in self.stacks.items():
+            leaf_counts[stack.rsplit(";", 1)[-1]] += count
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "status": self.status,
+            "started_at": self.started_at,
+            "duration_ms": round(self.duration * 1000, 3),
+            "sql_count": len(self.statements),
+            "sql_time_ms": round(sql_time, 3),
+            "sql_time_by_caller_ms": {k: round(v, 3) for k, v in by_caller.most_common()},
+            "samples": self.samples,
+            "sample_interval_ms": settings.PROFILING_SAMPLE_INTERVAL_MS,
+            "top_functions": leaf_counts.most_common(20),
+            "stacks": [f"{stack} {count}" for stack, count in self.stacks.most_common(200)],
+            "statements": self.statements,
+        }
+
+class _Sampler:
+    """Single background thread sampling every active profile session."""
+
+    def __init__(self):
+        self.sessions = set()
+        self.lock = threading.Lock()
+        self.thread: Optional[threading.Thread] = None
+
+    def add(self, session: ProfileSession) -> None:
+        with self.lock:
+            self.sessions.add(session)
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+                self.thread.start()
+
+    def remove(self, session: ProfileSession) -> None:
+        with self.lock:
+            self.sessions.discard(session)
+
+    def _run(self) -> None:
+        interval = settings.PROFILING_SAMPLE_INTERVAL_MS / 1000
+        while True:
+            with self.lock:
+                sessions = list(self.sessions)
+                if not sessions:
+                    self.thread = None
+                    return
+            frames = sys._current_frames()
+            for session in sessions:
+                session.sample(frames)
+            del frames
+            time.sleep(interval)
+
+_sampler = _Sampler()
+_reports: "OrderedDict[str, dict]" = OrderedDict()
+_reports_lock = threading.Lock()
+_current_session: ContextVar[Optional[ProfileSession]] = ContextVar("profile_session", default=None)
+
+def _store(report: dict) -> None:
+    with _reports_lock:
+        _reports[report["id"]] = report
+        while len(_reports) > settings.PROFILING_MAX_REPORTS:
+            _reports.popitem(last=False)
+
+def list_reports() -> List[dict]:
+    with _reports_lock:
+        reports = list(_reports.values())
+    keys = ("id", "method", "path", "status", "started_at", "duration_ms", "sql_count", "sql_time_ms")
+    return [{key: report[key] for key in keys} for report in reversed(reports)]
+
+def get_report(report_id: str) -> Optional[dict]:
+    with _reports_lock:
+        return _reports.get(report_id)
+
+def is_authorized(token: Optional[str]) -> bool:
+    return bool(settings.PROFILING_TOKEN) and token == settings.PROFILING_TOKEN
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("profiling_start", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get("profiling_start")
+    if not started:
+        return
+    elapsed = time.perf_counter() - started.pop()
+
+    session = _current_session.get()
+    if session is not None:
+        session.add_statement(statement, parameters, elapsed, sys._getframe(1))
+
+    if elapsed * 1000 >= settings.SLOW_QUERY_THRESHOLD_MS:
+        slow_query_logger.warning(
+            "Slow query (%.1f ms) from %s: %s | params=%s",
+            elapsed * 1000,
+            _calling_service(sys._getframe(1)) or "<unknown>",
+            " ".join(statement.split()),
+            _redact(parameters),
+        )
+
+def _handle_error(exception_context):
+    conn = exception_context.connection
+    started = conn.info.get("profiling_start") if conn is not None else None
+    if started:
+        started.pop()
+
+def instrument_engine(engine) -> None:
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(engine, "handle_error", _handle_error)
+
+class ProfilingMiddleware:
+    """Profiles requests opted in by header or picked by the sample rate."""
+
+    def __init__(self, app):
+        self.app = app
+
+    def _should_profile(self, scope) -> bool:
+        if settings.PROFILING_TOKEN:
+            for name, value in scope.get("headers", ()):
+                if name == b"x-profile":
+                    return is_authorized(value.decode("latin-1"))
+        rate = settings.PROFILING_SAMPLE_RATE
+        return rate > 0 and random.random() < rate
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        session = ProfileSession(scope["method"], scope["path"])
+        # The event loop thread runs async dependencies and middleware
+        session.threads.add(threading.get_ident())
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                session.status = message["status"]
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [(b"x-profile-id", session.id.encode())]
+            await send(message)
+
+        token = _current_session.set(session)
+        _sampler.add(session)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            session.duration = time.perf_counter() - start
+            _sampler.remove(session)
+            _current_session.reset(token)
+            _store(session.report())
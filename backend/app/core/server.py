@@ -0,0 +1,13 @@
+from uvicorn.workers import UvicornWorker as BaseUvicornWorker
+from app.core.config import settings
+
+class UvicornWorker(BaseUvicornWorker):
+    """Gunicorn worker using the configured event loop and HTTP parser."""
+
+    CONFIG_KWARGS = {
+        "loop": settings.SERVER_LOOP,
+        "http": settings.SERVER_HTTP,
+        "lifespan": "on",
+        "proxy_headers": True,
+        "timeout_graceful_shutdown": settings.GRACEFUL_SHUTDOWN_TIMEOUT,
+    }
@@ -0,0 +1,82 @@
+from sqlalchemy import select, insert, update, literal, cast, and_, exists, func
+from sqlalchemy.orm import Session
+from app.models.group import NoteGroupShare
+from app.models.note import Note, NoteAccess, AccessRoleEnum, Tag, UserTag, note_shares, note_tags
+
+def _role(role: AccessRoleEnum):
+    # Cast explicitly so Postgres accepts the literal for its native enum type
+    return cast(literal(role.name), NoteAccess.role.type)
+
+def backfill_note_access(db: Session) -> int:
+    """Insert the note_access rows missing for existing owners and shares."""
+    missing = ~exists().where(
+        and_(NoteAccess.user_id == Note.owner_id, NoteAccess.note_id == Note.id)
+    )
+    owners = select(
+        Note.owner_id, Note.id, Note.owner_id, _role(AccessRoleEnum.OWNER)
+    ).where(missing)
+    result = db.execute(
+        insert(NoteAccess).from_select(["user_id", "note_id", "note_owner_id", "role"], owners)
+    )
+    inserted = result.rowcount or 0
+
+    missing = ~exists().where(
+        and_(
+            NoteAccess.user_id == note_shares.c.user_id,
+            NoteAccess.note_id == note_shares.c.note_id
+        )
+    )
+    shares = select(
+        note_shares.c.user_id, note_shares.c.note_id, Note.owner_id, _role(AccessRoleEnum.SHARED)
+    ).join(Note, Note.id == note_shares.c.note_id).where(missing)
+    result = db.execute(
+        insert(NoteAccess).from_select(["user_id", "note_id", "note_owner_id", "role"], shares)
+    )
+    inserted += result.rowcount or 0
+
+    # Rows written before note_owner_id existed
+    db.execute(
+        update(NoteAccess)
+        .where(NoteAccess.note_owner_id.is_(None))
+        .values(note_owner_id=select(Note.owner_id).where(Note.id == NoteAccess.note_id).scalar_subquery())
+    )
+
+    db.commit()
+    return inserted
+
+def backfill_group_share_owners(db: Session) -> int:
+    """Fill in note_owner_id on group shares written before the column existed."""
+    result = db.execute(
+        update(NoteGroupShare)
+        .where(NoteGroupShare.note_owner_id.is_(None))
+        .values(note_owner_id=select(Note.owner_id).where(Note.id == NoteGroupShare.note_id).scalar_subquery())
+    )
+    db.commit()
+    return result.rowcount or 0
+
+def backfill_user_tags(db: Session) -> int:
+    """Build the user_tags catalog rows missing for existing notes."""
+    missing = ~exists().where(
+        and_(UserTag.user_id == Note.owner_id, UserTag.tag_id == note_tags.c.tag_id)
+    )
+    usage = (
+        select(Note.owner_id, Tag.id, Tag.name, func.count())
+        .select_from(note_tags)
+        .join(Note, Note.id == note_tags.c.note_id)
+        .join(Tag, Tag.id == note_tags.c.tag_id)
+        .where(missing)
+        .group_by(Note.owner_id, Tag.id, Tag.name)
+    )
+    result = db.execute(
+        insert(UserTag).from_select(["user_id", "tag_id", "name", "usage_count"], usage)
+    )
+    db.commit()
+    return result.rowcount or 0
+
+if __name__ == "__main__":
+    from app.db.database import SessionLocal
+    db = SessionLocal()
+    count = backfill_note_access(db)
+    tag_count = backfill_user_tags(db)
+    db.close()
+    print(f"Backfilled {count} note_access rows and {tag_count} user_tags rows")
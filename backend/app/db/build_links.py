@@ -0,0 +1,47 @@
+"""Derive note_links for notes written before links were tracked."""
+import argparse
+import time
+from sqlalchemy.orm import Session, load_only, undefer
+from app.core.config import settings
+from app.models import user, group  # noqa: F401 - register the mappers Note relates to
+from app.models.note import Note
+from app.services.links import LinksService
+
+def build_links(db: Session, batch_size: int) -> dict:
+    scanned = updated = 0
+    last_id = 0
+    while True:
+        batch = (
+            db.query(Note)
+            .options(
+                load_only(Note.id, Note.owner_id, Note._content, Note.content_compressed),
+                undefer(Note.links_hash)
+            )
+            .filter(Note.id > last_id, Note.links_hash.is_(None))
+            .order_by(Note.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not batch:
+            break
+        last_id = batch[-1].id
+        scanned += len(batch)
+        for note in batch:
+            updated += LinksService.update_links(db, note)
+        db.commit()
+        db.expunge_all()
+    return {"scanned": scanned, "updated": updated}
+
+if __name__ == "__main__":
+    from app.db.database import SessionLocal
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=settings.LINKS_BUILD_BATCH_SIZE)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    start = time.perf_counter()
+    try:
+        result = build_links(db, args.batch_size)
+    finally:
+        db.close()
+    print(f"Links derived for {result['updated']} of {result['scanned']} notes in {time.perf_counter() - start:.1f}s")
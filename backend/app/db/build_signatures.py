@@ -0,0 +1,60 @@
+"""Compute MinHash signatures for notes that don't have one yet."""
+import argparse
+import time
+from sqlalchemy import insert
+from sqlalchemy.orm import Session, load_only
+from app.core.config import settings
+from app.models import user, group  # noqa: F401 - register the mappers Note relates to
+from app.models.note import Note, NoteSignature
+from app.utils import minhash
+
+def build_signatures(db: Session, batch_size: int, rebuild: bool = False) -> dict:
+    if minhash.np is None:
+        raise SystemExit("numpy is required to compute signatures")
+    if rebuild:
+        db.query(NoteSignature).delete(synchronize_session=False)
+        db.commit()
+
+    scanned = stored = 0
+    last_id = 0
+    while True:
+        batch = (
+            db.query(Note)
+            .options(load_only(Note.id, Note.owner_id, Note._content, Note.content_compressed))
+            .outerjoin(NoteSignature, NoteSignature.note_id == Note.id)
+            .filter(Note.id > last_id, NoteSignature.note_id.is_(None))
+            .order_by(Note.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not batch:
+            break
+        last_id = batch[-1].id
+        scanned += len(batch)
+        rows = []
+        for note in batch:
+            sig = minhash.signature(note.content)
+            if sig is not None:
+                rows.append({"note_id": note.id, "owner_id": note.owner_id, "signature": minhash.to_bytes(sig)})
+        if rows:
+            db.execute(insert(NoteSignature), rows)
+        db.commit()
+        # Bodies can be large; don't keep a whole batch of them in the identity map
+        db.expunge_all()
+        stored += len(rows)
+    return {"scanned": scanned, "stored": stored}
+
+if __name__ == "__main__":
+    from app.db.database import SessionLocal
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rebuild", action="store_true", help="Recompute every signature")
+    parser.add_argument("--batch-size", type=int, default=settings.SIMILARITY_BUILD_BATCH_SIZE)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    start = time.perf_counter()
+    try:
+        result = build_signatures(db, args.batch_size, args.rebuild)
+    finally:
+        db.close()
+    print(f"{result['stored']} signatures stored for {result['scanned']} notes in {time.perf_counter() - start:.1f}s")
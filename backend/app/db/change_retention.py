@@ -0,0 +1,54 @@
+"""Purge note_changes rows older than ``CHANGES_RETENTION_DAYS``."""
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.models.note import NoteChange
+
+logger = logging.getLogger(__name__)
+
+def purge_changes(db: Session) -> int:
+    cutoff = datetime.now(timezone.utc) - timedelta(days=settings.CHANGES_RETENTION_DAYS)
+    oldest, newest = db.execute(select(func.min(NoteChange.id), func.max(NoteChange.id))).one()
+    if newest is None:
+        return 0
+    first_kept = db.execute(
+        select(func.min(NoteChange.id)).where(NoteChange.created_at >= cutoff)
+    ).scalar()
+    # Keep the newest row and delete oldest first, so what is left is always a
+    # suffix of the log and ChangeLog.horizon can tell expired cursors apart
+    first_kept = min(first_kept or newest, newest)
+
+    purged = 0
+    start = oldest
+    while start < first_kept:
+        end = min(start + settings.CHANGES_PURGE_BATCH_SIZE, first_kept)
+        result = db.execute(delete(NoteChange).where(NoteChange.id >= start, NoteChange.id < end))
+        db.commit()
+        purged += result.rowcount or 0
+        start = end
+    return purged
+
+def _purge() -> int:
+    db = SessionLocal()
+    try:
+        return purge_changes(db)
+    finally:
+        db.close()
+
+async def run_periodically() -> None:
+    while True:
+        await asyncio.sleep(settings.CHANGES_PURGE_INTERVAL_SECONDS)
+        try:
+            purged = await run_in_threadpool(_purge)
+            if purged:
+                logger.info("Purged %d expired note changes", purged)
+        except Exception:
+            logger.exception("Note change purge failed")
+
+if __name__ == "__main__":
+    print(f"Purged {_purge()} expired note changes")
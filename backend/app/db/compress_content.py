@@ -0,0 +1,92 @@
+"""Move existing large note bodies into compressed storage."""
+import argparse
+import time
+from sqlalchemy import bindparam, func, select
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.note import Note, ContentDictionary
+from app.utils import content_codec
+
+notes = Note.__table__
+
+def train(db: Session, sample_size: int) -> int:
+    samples = db.execute(
+        select(notes.c.content)
+        .where(func.length(notes.c.content) >= settings.CONTENT_COMPRESSION_MIN_BYTES)
+        .order_by(notes.c.id.desc())
+        .limit(sample_size)
+    ).scalars().all()
+    dictionary = content_codec.train_dictionary(samples)
+    db.add(ContentDictionary(dict_id=dictionary.dict_id(), data=dictionary.as_bytes()))
+    db.commit()
+    content_codec.reload_dictionaries()
+    return dictionary.dict_id()
+
+def compress_existing(db: Session, batch_size: int) -> dict:
+    # Only if the body is still the one read: an edit committed in between wins
+    statement = notes.update().where(
+        notes.c.id == bindparam("note_id"),
+        notes.c.content_compressed.is_(None),
+        notes.c.content == bindparam("original"),
+    ).values(
+        content=None,
+        content_compressed=bindparam("compressed"),
+        # Storage change only: keep the onupdate default from firing
+        updated_at=notes.c.updated_at,
+    )
+    scanned = compressed = skipped = bytes_before = bytes_after = 0
+    last_id = 0
+    while True:
+        rows = db.execute(
+            select(notes.c.id, notes.c.content)
+            .where(
+                notes.c.id > last_id,
+                notes.c.content_compressed.is_(None),
+                func.length(notes.c.content) >= settings.CONTENT_COMPRESSION_MIN_BYTES
+            )
+            .order_by(notes.c.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+        scanned += len(rows)
+        for row in rows:
+            encoded = content_codec.encode(row.content)
+            if encoded is None:
+                continue
+            updated = db.execute(
+                statement, {"note_id": row.id, "original": row.content, "compressed": encoded}
+            ).rowcount
+            if not updated:
+                skipped += 1
+                continue
+            compressed += 1
+            bytes_before += len(row.content.encode())
+            bytes_after += len(encoded)
+        db.commit()
+    return {
+        "scanned": scanned,
+        "compressed": compressed,
+        "skipped": skipped,
+        "bytes_before": bytes_before,
+        "bytes_after": bytes_after,
+    }
+
+if __name__ == "__main__":
+    from app.db.database import SessionLocal
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--train", action="store_true", help="Train and store a new dictionary first")
+    parser.add_argument("--sample-size", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    start = time.perf_counter()
+    try:
+        if args.train:
+            print(f"Trained dictionary {train(db, args.sample_size)}")
+        result = compress_existing(db, args.batch_size)
+    finally:
+        db.close()
+    print(f"{result} in {time.perf_counter() - start:.1f}s")
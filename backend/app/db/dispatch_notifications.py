@@ -0,0 +1,46 @@
+"""Deliver pending notifications from the outbox."""
+import asyncio
+import logging
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.models import user, group  # noqa: F401 - register the mappers Note relates to
+from app.services.notifications import NotificationDispatcher
+
+logger = logging.getLogger(__name__)
+
+def dispatch_pending() -> dict:
+    totals = {"events": 0, "delivered": 0, "dropped": 0, "retried": 0, "digests": 0, "busy": False}
+    db = SessionLocal()
+    try:
+        while True:
+            result = NotificationDispatcher.dispatch(db)
+            for key in ("events", "delivered", "dropped", "retried", "digests"):
+                totals[key] += result[key]
+            if result["busy"]:
+                totals["busy"] = True
+                break
+            # Retried events stay in the outbox; only a full batch means more is due
+            if result["events"] < settings.NOTIFICATION_BATCH_SIZE:
+                break
+    finally:
+        db.close()
+    return totals
+
+async def run_periodically() -> None:
+    delay = settings.NOTIFICATION_INTERVAL_SECONDS
+    while True:
+        await asyncio.sleep(delay)
+        try:
+            result = await run_in_threadpool(dispatch_pending)
+        except Exception:
+            logger.exception("Notification dispatch failed")
+            continue
+        if result["busy"]:
+            delay = min(delay * 2, settings.NOTIFICATION_MAX_BACKOFF_SECONDS)
+            logger.warning("Notification sink busy, next dispatch in %ds", delay)
+        else:
+            delay = settings.NOTIFICATION_INTERVAL_SECONDS
+
+if __name__ == "__main__":
+    print(dispatch_pending())
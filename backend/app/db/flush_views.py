@@ -0,0 +1,27 @@
+"""Write the view counts buffered by this worker to note_view_stats."""
+import asyncio
+import logging
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.services.view_stats import ViewStatsService
+
+logger = logging.getLogger(__name__)
+
+def flush() -> int:
+    db = SessionLocal()
+    try:
+        return ViewStatsService.flush(db)
+    finally:
+        db.close()
+
+def flush_in_background() -> None:
+    try:
+        flush()
+    except Exception:
+        logger.exception("Note view flush failed")
+
+async def run_periodically() -> None:
+    while True:
+        await asyncio.sleep(settings.VIEW_STATS_FLUSH_INTERVAL_SECONDS)
+        await run_in_threadpool(flush_in_background)
@@ -0,0 +1,232 @@
+"""Generate a large, realistic synthetic dataset on top of init_test_data."""
+import argparse
+import bisect
+import csv
+import io
+import itertools
+import math
+import random
+import time
+from dataclasses import dataclass
+from typing import Iterable, List, Sequence
+from sqlalchemy import func, select, text, Table
+from sqlalchemy.orm import Session
+from app.core.security import get_password_hash
+from app.models.user import User
+from app.models.note import Note, Tag, NoteAccess, AccessRoleEnum, VisibilityEnum, note_tags, note_shares
+from app.db.init_data import init_test_data
+from app.db.backfill import backfill_note_access, backfill_user_tags
+
+GENERATED_PASSWORD = "password123"
+
+@dataclass
+class GeneratorConfig:
+    users: int = 1000
+    notes: int = 100000
+    tags: int = 5000
+    tag_zipf_s: float = 1.1
+    owner_zipf_s: float = 0.8
+    max_tags_per_note: int = 5
+    content_median: int = 1500
+    content_sigma: float = 1.2
+    content_max: int = 200000
+    public_ratio: float = 0.05
+    shared_ratio: float = 0.2
+    max_share_fanout: int = 50
+    batch_size: int = 10000
+    seed: int = 0
+
+class ZipfSampler:
+    """Draws ranks 0..n-1 with probability proportional to 1 / (rank + 1) ** s."""
+
+    def __init__(self, n: int, s: float, rng: random.Random):
+        self.rng = rng
+        self.cumulative = list(itertools.accumulate(1.0 / (k ** s) for k in range(1, n + 1)))
+        self.total = self.cumulative[-1] if self.cumulative else 0.0
+
+    def sample(self) -> int:
+        return bisect.bisect_left(self.cumulative, self.rng.random() * self.total)
+
+class _TableWriter:
+    """Buffers rows for one table and flushes them in batches."""
+
+    def __init__(self, db: Session, table: Table, columns: Sequence[str], batch_size: int, auto_flush: bool = True):
+        self.db = db
+        self.auto_flush = auto_flush
+        self.table = table
+        self.columns = list(columns)
+        self.batch_size = batch_size
+        self.rows: List[tuple] = []
+        self.written = 0
+        self.use_copy = db.get_bind().dialect.name == "postgresql"
+
+    def add(self, row: tuple) -> None:
+        self.rows.append(row)
+        if self.auto_flush and len(self.rows) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self.rows:
+            return
+        if self.use_copy:
+            self._copy(self.rows)
+        else:
+            self.db.execute(self.table.insert(), [dict(zip(self.columns, row)) for row in self.rows])
+        self.written += len(self.rows)
+        self.rows = []
+
+    def _copy(self, rows: Iterable[tuple]) -> None:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerows(rows)
+        buffer.seek(0)
+        cursor = self.db.connection().connection.cursor()
+        try:
+            cursor.copy_expert(
+                f"COPY {self.table.name} ({', '.join(self.columns)}) FROM STDIN WITH (FORMAT csv)",
+                buffer
+            )
+        finally:
+            cursor.close()
+
+def _content_pool(rng: random.Random, size: int) -> str:
+    words = [
+        "project", "meeting", "draft", "review", "todo", "idea", "release", "design",
+        "api", "database", "customer", "roadmap", "notes", "summary", "follow-up", "bug",
+    ]
+    lines = []
+    length = 0
+    while length < size:
+        line = " ".join(rng.choice(words) for _ in range(rng.randint(4, 14)))
+        if rng.random() < 0.1:
+            line = "## " + line
+        elif rng.random() < 0.2:
+            line = "- " + line
+        lines.append(line)
+        length += len(line) + 1
+    return "\n".join(lines)
+
+def _next_id(db: Session, model) -> int:
+    return (db.execute(select(func.max(model.id))).scalar() or 0) + 1
+
+def _reset_sequences(db: Session) -> None:
+    if db.get_bind().dialect.name != "postgresql":
+        return
+    for table in ("users", "tags", "notes"):
+        db.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT MAX(id) FROM {table}))"
+        ))
+
+def generate(db: Session, config: GeneratorConfig) -> dict:
+    rng = random.Random(config.seed)
+    init_test_data(db)
+    backfill_note_access(db)
+
+    # Ids are assigned here rather than read back so COPY can stream blindly
+    user_start = _next_id(db, User)
+    tag_start = _next_id(db, Tag)
+    note_start = _next_id(db, Note)
+    user_ids = list(range(user_start, user_start + config.users))
+    tag_ids = list(range(tag_start, tag_start + config.tags))
+
+    hashed_password = get_password_hash(GENERATED_PASSWORD)
+    users = _TableWriter(db, User.__table__, ["id", "email", "name", "hashed_password", "is_active"], config.batch_size)
+    for i, user_id in enumerate(user_ids):
+        users.add((user_id, f"gen{config.seed}-{i}@example.com", f"Generated User {i}", hashed_password, True))
+    users.flush()
+
+    tags = _TableWriter(db, Tag.__table__, ["id", "name"], config.batch_size)
+    for i, tag_id in enumerate(tag_ids):
+        tags.add((tag_id, f"gen{config.seed}-tag-{i}"))
+    tags.flush()
+
+    notes = _TableWriter(
+        db, Note.__table__, ["id", "title", "content", "visibility", "owner_id", "public_token"],
+        config.batch_size, auto_flush=False
+    )
+    # Association rows are only flushed right after the notes they reference
+    tag_links = _TableWriter(db, note_tags, ["note_id", "tag_id"], config.batch_size, auto_flush=False)
+    shares = _TableWriter(db, note_shares, ["note_id", "user_id"], config.batch_size, auto_flush=False)
+    access = _TableWriter(db, NoteAccess.__table__, ["user_id", "note_id", "note_owner_id", "role"], config.batch_size, auto_flush=False)
+
+    tag_sampler = ZipfSampler(len(tag_ids), config.tag_zipf_s, rng)
+    owner_sampler = ZipfSampler(len(user_ids), config.owner_zipf_s, rng)
+    pool = _content_pool(rng, min(config.content_max, 1 << 20) * 2)
+    mu = math.log(config.content_median)
+
+    for n in range(config.notes):
+        note_id = note_start + n
+        owner_id = user_ids[owner_sampler.sample()]
+
+        size = max(1, min(config.content_max, int(rng.lognormvariate(mu, config.content_sigma))))
+        offset = rng.randrange(0, max(1, len(pool) - size))
+        content = pool[offset:offset + size]
+
+        roll = rng.random()
+        if roll < config.public_ratio:
+            visibility = VisibilityEnum.PUBLIC
+        elif roll < config.public_ratio + config.shared_ratio and len(user_ids) > 1:
+            visibility = VisibilityEnum.SHARED
+        else:
+            visibility = VisibilityEnum.PRIVATE
+        public_token = f"gen{config.seed}-{note_id}" if visibility == VisibilityEnum.PUBLIC else None
+
+        notes.add((note_id, f"Note {n} {content[:40].strip()}", content, visibility.name, owner_id, public_token))
+        access.add((owner_id, note_id, owner_id, AccessRoleEnum.OWNER.name))
+
+        if tag_ids:
+            tag_count = min(config.max_tags_per_note, int(rng.paretovariate(1.5)) - 1)
+            for tag_id in {tag_ids[tag_sampler.sample()] for _ in range(tag_count)}:
+                tag_links.add((note_id, tag_id))
+
+        if visibility == VisibilityEnum.SHARED:
+            fanout = min(config.max_share_fanout, len(user_ids) - 1, int(rng.paretovariate(1.2)))
+            recipients = set()
+            while len(recipients) < fanout:
+                recipient = user_ids[owner_sampler.sample()]
+                if recipient != owner_id:
+                    recipients.add(recipient)
+            for recipient in recipients:
+                shares.add((note_id, recipient))
+                access.add((recipient, note_id, owner_id, AccessRoleEnum.SHARED.name))
+
+        if len(notes.rows) >= config.batch_size:
+            notes.flush()
+            tag_links.flush()
+            shares.flush()
+            access.flush()
+
+    for writer in (notes, tag_links, shares, access):
+        writer.flush()
+    _reset_sequences(db)
+    db.commit()
+    user_tags = backfill_user_tags(db)
+
+    return {
+        "users": users.written,
+        "tags": tags.written,
+        "notes": notes.written,
+        "note_tags": tag_links.written,
+        "note_shares": shares.written,
+        "note_access": access.written,
+        "user_tags": user_tags,
+    }
+
+def _parse_args(argv=None) -> GeneratorConfig:
+    defaults = GeneratorConfig()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    for name, value in vars(defaults).items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=type(value), default=value)
+    return GeneratorConfig(**vars(parser.parse_args(argv)))
+
+if __name__ == "__main__":
+    from app.db.database import SessionLocal
+    config = _parse_args()
+    db = SessionLocal()
+    start = time.perf_counter()
+    try:
+        counts = generate(db, config)
+    finally:
+        db.close()
+    elapsed = time.perf_counter() - start
+    print(", ".join(f"{count} {table}" for table, count in counts.items()) + f" generated in {elapsed:.1f}s")
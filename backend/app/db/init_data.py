@@ -2,6 +2,7 @@ from sqlalchemy.orm import Session
 from app.core.security import get_password_hash
 from app.models.user import User
 from app.models.note import Note, Tag, VisibilityEnum
+from app.db.backfill import backfill_note_access, backfill_user_tags
 
 def init_test_data(db: Session) -> None:
     test_user = db.query(User).filter(User.email == "test@example.com").first()
@@ -45,6 +46,10 @@ def init_test_data(db: Session) -> None:
         db.add(guide_note)
         db.commit()
 
+        # Notes are inserted directly, so derive their access and tag catalog rows
+        backfill_note_access(db)
+        backfill_user_tags(db)
+
 if __name__ == "__main__":
     from app.db.database import SessionLocal
     db = SessionLocal()
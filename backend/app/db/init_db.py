@@ -1,10 +1,57 @@
+from sqlalchemy import inspect, text
 from sqlalchemy.orm import Session
-from app.db.database import engine, Base
-from app.models import user, note
+from sqlalchemy.schema import CreateColumn
+from app.db.database import engine, Base, SessionLocal
+from app.core.config import settings
+from app.db.backfill import backfill_note_access, backfill_group_share_owners, backfill_user_tags
+from app.db.partitioning import create_tables, partition_tables
+from app.models import user, note, group, notebook, notification, token
+
+def add_missing_columns():
+    """Add nullable columns and indexes introduced after a table was created."""
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    with engine.begin() as connection:
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            existing_columns = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing_columns or not column.nullable:
+                    continue
+                ddl = CreateColumn(column).compile(dialect=engine.dialect)
+                connection.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {ddl}"))
+            for index in table.indexes:
+                index.create(connection, checkfirst=True)
+
+def collate_tag_names():
+    """Give user_tags.name the "C" collation on Postgres tables created without it."""
+    if engine.dialect.name != "postgresql":
+        return
+    with engine.begin() as connection:
+        collation = connection.execute(text(
+            "SELECT collation_name FROM information_schema.columns "
+            "WHERE table_name = 'user_tags' AND column_name = 'name'"
+        )).scalar()
+        if collation != "C":
+            # Rebuilds ix_user_tags_user_id_name in the new order
+            connection.execute(text('ALTER TABLE user_tags ALTER COLUMN name TYPE VARCHAR COLLATE "C"'))
 
 def init_db():
     # Create all tables
-    Base.metadata.create_all(bind=engine)
+    create_tables(engine)
+    add_missing_columns()
+    collate_tag_names()
+    # No-op outside Postgres and once the tables are partitioned
+    partition_tables(engine, settings.NOTES_PARTITIONS)
+
+    db = SessionLocal()
+    try:
+        backfill_note_access(db)
+        backfill_group_share_owners(db)
+        backfill_user_tags(db)
+    finally:
+        db.close()
 
 if __name__ == "__main__":
     init_db()
@@ -0,0 +1,258 @@
+"""Hash partitioning of the note tables on Postgres."""
+import argparse
+import json
+import logging
+from typing import List
+from sqlalchemy import event, func, inspect, select, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.schema import CreateTable
+from app.db.database import Base
+
+logger = logging.getLogger(__name__)
+
+PARTITION_KEYS = {
+    "notes": "owner_id",
+    "note_tags": "note_id",
+    "note_shares": "note_id",
+}
+
+def is_partitioned(connection: Connection, table: str) -> bool:
+    relkind = connection.execute(
+        text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:table)"), {"table": table}
+    ).scalar()
+    return relkind == "p"
+
+def _partition_table(connection: Connection, name: str, key: str, partitions: int) -> None:
+    table = Base.metadata.tables[name]
+    old = f"{name}_unpartitioned"
+
+    # Foreign keys into this table would pin the old copy; notes.id stops being unique anyway
+    referencing = connection.execute(text(
+        "SELECT conname, conrelid::regclass::text FROM pg_constraint "
+        "WHERE contype = 'f' AND confrelid = to_regclass(:table)"
+    ), {"table": name}).all()
+    for constraint, referencing_table in referencing:
+        connection.execute(text(f'ALTER TABLE {referencing_table} DROP CONSTRAINT "{constraint}"'))
+
+    sequence = connection.execute(
+        text("SELECT pg_get_serial_sequence(:table, 'id')"), {"table": name}
+    ).scalar() if "id" in table.c else None
+
+    connection.execute(text(f"ALTER TABLE {name} RENAME TO {old}"))
+    # Index names are schema-wide: free them for the partitioned copy
+    for (index,) in connection.execute(text(
+        "SELECT indexname FROM pg_indexes WHERE tablename = :table"
+    ), {"table": old}):
+        connection.execute(text(f'ALTER INDEX "{index}" RENAME TO "{index}_unpartitioned"'))
+
+    connection.execute(text(
+        f"CREATE TABLE {name} (LIKE {old} INCLUDING DEFAULTS) PARTITION BY HASH ({key})"
+    ))
+    primary_key = [column.name for column in table.primary_key.columns]
+    if key not in primary_key:
+        primary_key.append(key)
+    connection.execute(text(
+        f"ALTER TABLE {name} ADD CONSTRAINT {name}_pkey PRIMARY KEY ({', '.join(primary_key)})"
+    ))
+    for remainder in range(partitions):
+        connection.execute(text(
+            f"CREATE TABLE {name}_p{remainder} PARTITION OF {name} "
+            f"FOR VALUES WITH (MODULUS {partitions}, REMAINDER {remainder})"
+        ))
+
+    connection.execute(text(f"INSERT INTO {name} SELECT * FROM {old}"))
+    if sequence:
+        connection.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY {name}.id"))
+    connection.execute(text(f"DROP TABLE {old}"))
+
+    for foreign_key in table.foreign_key_constraints:
+        if foreign_key.referred_table.name in PARTITION_KEYS:
+            continue
+        columns = ", ".join(column.name for column in foreign_key.columns)
+        referred = ", ".join(element.column.name for element in foreign_key.elements)
+        connection.execute(text(
+            f"ALTER TABLE {name} ADD FOREIGN KEY ({columns}) "
+            f"REFERENCES {foreign_key.referred_table.name} ({referred})"
+        ))
+    for index in table.indexes:
+        columns = ", ".join(column.name for column in index.columns)
+        # Unique indexes without the partition key can't exist on a partitioned table
+        unique = "UNIQUE " if index.unique and key in {column.name for column in index.columns} else ""
+        connection.execute(text(f"CREATE {unique}INDEX {index.name} ON {name} ({columns})"))
+
+def create_tables(engine: Engine) -> None:
+    """``create_all`` that leaves out foreign keys into partitioned tables."""
+    if engine.dialect.name != "postgresql":
+        Base.metadata.create_all(bind=engine)
+        return
+    with engine.begin() as connection:
+        partitioned = {name for name in PARTITION_KEYS if is_partitioned(connection, name)}
+        if not partitioned:
+            Base.metadata.create_all(bind=connection)
+            return
+        existing = set(inspect(connection).get_table_names())
+        for table in Base.metadata.sorted_tables:
+            if table.name in existing:
+                continue
+            foreign_keys = [
+                foreign_key for foreign_key in table.foreign_key_constraints
+                if foreign_key.referred_table.name not in partitioned
+            ]
+            connection.execute(CreateTable(table, include_foreign_key_constraints=foreign_keys))
+            for index in table.indexes:
+                index.create(connection)
+
+def partition_tables(engine: Engine, partitions: int) -> List[str]:
+    """Convert the note tables that aren't partitioned yet; return their names."""
+    if engine.dialect.name != "postgresql" or partitions <= 0:
+        return []
+    converted = []
+    with engine.begin() as connection:
+        for name, key in PARTITION_KEYS.items():
+            if is_partitioned(connection, name):
+                continue
+            _partition_table(connection, name, key, partitions)
+            converted.append(name)
+    if converted:
+        logger.info("Partitioned %s into %d hash partitions", ", ".join(converted), partitions)
+    return converted
+
+def _scanned_partitions(plan: dict, parent: str) -> List[str]:
+    """Partitions of ``parent`` the executed plan actually read."""
+    scanned = []
+    stack = [plan]
+    while stack:
+        node = stack.pop()
+        relation = node.get("Relation Name", "")
+        if relation.startswith(f"{parent}_p") and node.get("Actual Loops", 0) > 0:
+            scanned.append(relation)
+        stack.extend(node.get("Plans", []))
+    return sorted(set(scanned))
+
+def _explain_service_call(db, call) -> dict:
+    """Run ``call`` and return the executed plan of its first notes query."""
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if not captured and "FROM notes" in statement:
+            captured.append((statement, parameters))
+
+    connection = db.connection()
+    event.listen(connection, "before_cursor_execute", capture)
+    try:
+        call()
+    finally:
+        event.remove(connection, "before_cursor_execute", capture)
+    statement, parameters = captured[0]
+    cursor = connection.connection.cursor()
+    try:
+        cursor.execute("EXPLAIN (ANALYZE, FORMAT JSON) " + statement, parameters)
+        return cursor.fetchone()[0][0]["Plan"]
+    finally:
+        cursor.close()
+
+def _owner_partitions(db, owner_ids) -> List[str]:
+    """The notes partitions hash partitioning assigns ``owner_ids`` to."""
+    cursor = db.connection().connection.cursor()
+    try:
+        cursor.execute(
+            "EXPLAIN (ANALYZE, FORMAT JSON) SELECT 1 FROM notes WHERE owner_id = ANY(%s)", (sorted(owner_ids),)
+        )
+        return _scanned_partitions(cursor.fetchone()[0][0]["Plan"], "notes")
+    finally:
+        cursor.close()
+
+def _union_arms(plan: dict) -> List[dict]:
+    """The arms of the first UNION ALL (an Append over subqueries) in ``plan``."""
+    stack = [plan]
+    while stack:
+        node = stack.pop()
+        children = node.get("Plans", [])
+        if node["Node Type"] == "Append" and children and all(
+            child["Node Type"] == "Subquery Scan" for child in children
+        ):
+            return children
+        stack.extend(children)
+    return [plan]
+
+def verify(db) -> dict:
+    """EXPLAIN ANALYZE the note reads and report the notes partitions each one read."""
+    from app.models.group import GroupMember, NoteGroupShare
+    from app.models.note import Note, NoteAccess, AccessRoleEnum
+    from app.models.user import User
+    from app.services.notes import NotesService
+
+    owner_id = db.query(Note.owner_id).group_by(Note.owner_id).order_by(func.count().desc()).limit(1).scalar()
+    if owner_id is None:
+        raise SystemExit("No notes to verify against; generate some data first")
+    owner = db.get(User, owner_id)
+    owned_id = db.query(Note.id).filter(Note.owner_id == owner_id).limit(1).scalar()
+    listing = _union_arms(_explain_service_call(db, lambda: NotesService.get_user_notes(db, owner)))
+
+    checked = {
+        "get_user_notes (own notes)": (_scanned_partitions(listing[0], "notes"), [owner_id]),
+        "get_note (owner)": (
+            _scanned_partitions(_explain_service_call(db, lambda: NotesService.get_note(db, owned_id, owner)), "notes"),
+            [owner_id],
+        ),
+    }
+    shared = db.query(NoteAccess).filter(NoteAccess.role == AccessRoleEnum.SHARED).limit(1).first()
+    if shared:
+        recipient = db.get(User, shared.user_id)
+        plan = _explain_service_call(db, lambda: NotesService.get_note(db, shared.note_id, recipient))
+        checked["get_note (shared)"] = (_scanned_partitions(plan, "notes"), [shared.note_owner_id])
+
+    # A group member with no access row of their own
+    via_group = db.query(NoteGroupShare.note_id, NoteGroupShare.note_owner_id, GroupMember.user_id).join(
+        GroupMember, GroupMember.group_id == NoteGroupShare.group_id
+    ).filter(
+        ~select(NoteAccess.user_id).where(
+            NoteAccess.note_id == NoteGroupShare.note_id, NoteAccess.user_id == GroupMember.user_id
+        ).exists()
+    ).limit(1).first()
+    if via_group:
+        member = db.get(User, via_group.user_id)
+        plan = _explain_service_call(db, lambda: NotesService.get_note(db, via_group.note_id, member))
+        checked["get_note (group share)"] = (_scanned_partitions(plan, "notes"), [via_group.note_owner_id])
+
+    not_pruned = {}
+    recipient_id = db.query(NoteAccess.user_id).filter(NoteAccess.role == AccessRoleEnum.SHARED).group_by(
+        NoteAccess.user_id
+    ).order_by(func.count().desc()).limit(1).scalar()
+    if recipient_id is not None:
+        top_recipient = db.get(User, recipient_id)
+        arms = _union_arms(_explain_service_call(db, lambda: NotesService.get_user_notes(db, top_recipient)))
+        not_pruned["get_user_notes (shared notes)"] = _scanned_partitions(arms[-1], "notes")
+
+    return {
+        "checked": {
+            label: {"partitions": partitions, "expected": _owner_partitions(db, owner_ids)}
+            for label, (partitions, owner_ids) in checked.items()
+        },
+        "not_pruned": not_pruned,
+    }
+
+if __name__ == "__main__":
+    from app.core.config import settings
+    from app.db.database import engine, SessionLocal
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--partitions", type=int, default=settings.NOTES_PARTITIONS)
+    parser.add_argument("--verify", action="store_true", help="Check partition pruning with EXPLAIN ANALYZE")
+    args = parser.parse_args()
+
+    if args.verify:
+        db = SessionLocal()
+        try:
+            report = verify(db)
+        finally:
+            db.close()
+        print(json.dumps(report, indent=2))
+        pruned = all(case["partitions"] == case["expected"] for case in report["checked"].values())
+        print("OK: every checked path reads only its owner's notes partition" if pruned
+              else "FAIL: some checked paths read other notes partitions")
+        if report["not_pruned"]:
+            print("Not checked, reads unpruned partitions: " + ", ".join(report["not_pruned"]))
+        raise SystemExit(0 if pruned else 1)
+
+    print(f"Partitioned: {partition_tables(engine, args.partitions) or 'nothing to do'}")
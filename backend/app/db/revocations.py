@@ -0,0 +1,45 @@
+"""Keep this worker's access token denylist in step with revoked_tokens."""
+import asyncio
+import logging
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.models import user, note, group  # noqa: F401 - register the mappers User relates to
+from app.services.tokens import TokenService
+
+logger = logging.getLogger(__name__)
+
+def sync() -> int:
+    db = SessionLocal()
+    try:
+        return TokenService.sync(db)
+    finally:
+        db.close()
+
+def _purge() -> int:
+    db = SessionLocal()
+    try:
+        return TokenService.purge(db)
+    finally:
+        db.close()
+
+async def sync_periodically() -> None:
+    while True:
+        await asyncio.sleep(settings.REVOCATION_SYNC_SECONDS)
+        try:
+            await run_in_threadpool(sync)
+        except Exception:
+            logger.exception("Token denylist sync failed")
+
+async def purge_periodically() -> None:
+    while True:
+        await asyncio.sleep(settings.TOKEN_PURGE_INTERVAL_SECONDS)
+        try:
+            purged = await run_in_threadpool(_purge)
+            if purged:
+                logger.info("Purged %d expired tokens", purged)
+        except Exception:
+            logger.exception("Expired token purge failed")
+
+if __name__ == "__main__":
+    print(f"Purged {_purge()} expired tokens")
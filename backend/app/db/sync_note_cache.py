@@ -0,0 +1,28 @@
+"""Keep this worker's note cache in step with writes made by other workers."""
+import asyncio
+import logging
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.models import user, note, group  # noqa: F401 - register the mappers Note relates to
+from app.services.note_cache import note_cache
+
+logger = logging.getLogger(__name__)
+
+def sync() -> int:
+    db = SessionLocal()
+    try:
+        return note_cache.sync(db)
+    finally:
+        db.close()
+
+async def run_periodically() -> None:
+    while True:
+        await asyncio.sleep(settings.NOTE_CACHE_SYNC_SECONDS)
+        try:
+            await run_in_threadpool(sync)
+        except Exception:
+            logger.exception("Note cache sync failed")
+
+if __name__ == "__main__":
+    print(f"Applied {sync()} note changes")
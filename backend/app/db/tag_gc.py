@@ -0,0 +1,58 @@
+"""Remove tags no longer attached to any note."""
+import asyncio
+import logging
+from typing import Optional
+from sqlalchemy import delete, exists, select
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.models.note import Tag, UserTag, note_tags
+
+logger = logging.getLogger(__name__)
+
+def sweep_orphan_tags(db: Session, batch_size: Optional[int] = None) -> int:
+    batch_size = batch_size or settings.TAG_GC_BATCH_SIZE
+    deleted = 0
+    last_id = 0
+    while True:
+        ids = db.execute(
+            select(Tag.id).where(Tag.id > last_id).order_by(Tag.id).limit(batch_size)
+        ).scalars().all()
+        if not ids:
+            break
+        last_id = ids[-1]
+        unused = [
+            ~exists().where(note_tags.c.tag_id == Tag.id),
+            ~exists().where(UserTag.tag_id == Tag.id)
+        ]
+        # Skip tags get_or_create_tags holds FOR KEY SHARE: a note is about to use them
+        orphans = db.execute(
+            select(Tag.id).where(Tag.id.in_(ids), *unused).with_for_update(skip_locked=True)
+        ).scalars().all()
+        if orphans:
+            # Re-checked inside the DELETE so a tag attached since the scan survives
+            result = db.execute(delete(Tag).where(Tag.id.in_(orphans), *unused))
+            deleted += result.rowcount or 0
+        db.commit()
+    return deleted
+
+def _sweep() -> int:
+    db = SessionLocal()
+    try:
+        return sweep_orphan_tags(db)
+    finally:
+        db.close()
+
+async def run_periodically() -> None:
+    while True:
+        await asyncio.sleep(settings.TAG_GC_INTERVAL_SECONDS)
+        try:
+            deleted = await run_in_threadpool(_sweep)
+            if deleted:
+                logger.info("Removed %d orphaned tags", deleted)
+        except Exception:
+            logger.exception("Orphaned tag sweep failed")
+
+if __name__ == "__main__":
+    print(f"Removed {_sweep()} orphaned tags")
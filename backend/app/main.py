@@ -1,17 +1,82 @@
+import time
+
+# Measured before any application import so the startup log covers import time
+_import_started = time.perf_counter()
+
+import asyncio
+import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response
+from starlette.concurrency import run_in_threadpool
 from app.core.config import settings
+from app.core import metrics, profiling, admission, compression
+from app.db.database import engine
+from app.db import tag_gc, change_retention, flush_views, dispatch_notifications, revocations, sync_note_cache
 from app.api.auth import auth
 from app.api.notes import notes
 from app.api.notes import public
+from app.api.groups import groups
+from app.api.notebooks import notebooks
+from app.api.tags import tags
 from app.api.users import settings as user_settings
+from app.api.internal import profiles
+
+_imports_done = time.perf_counter()
+
+logger = logging.getLogger("uvicorn.error")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    startup_started = time.perf_counter()
+    # Open one connection per worker up front so the first request doesn't pay for it
+    with engine.connect():
+        pass
+    # Load revoked tokens before serving so the first requests don't query for them
+    try:
+        await run_in_threadpool(revocations.sync)
+    except Exception:
+        logger.exception("Token denylist sync failed")
+    logger.info(
+        "Startup complete: imports %.3fs, lifespan %.3fs",
+        _imports_done - _import_started,
+        time.perf_counter() - startup_started,
+    )
+    background = []
+    if settings.REVOCATION_SYNC_SECONDS > 0:
+        background.append(asyncio.create_task(revocations.sync_periodically()))
+    if settings.TOKEN_PURGE_INTERVAL_SECONDS > 0:
+        background.append(asyncio.create_task(revocations.purge_periodically()))
+    if settings.NOTE_CACHE_ENABLED and settings.NOTE_CACHE_SYNC_SECONDS > 0:
+        background.append(asyncio.create_task(sync_note_cache.run_periodically()))
+    if settings.TAG_GC_INTERVAL_SECONDS > 0:
+        background.append(asyncio.create_task(tag_gc.run_periodically()))
+    if settings.CHANGES_PURGE_INTERVAL_SECONDS > 0:
+        background.append(asyncio.create_task(change_retention.run_periodically()))
+    if settings.VIEW_STATS_FLUSH_INTERVAL_SECONDS > 0:
+        background.append(asyncio.create_task(flush_views.run_periodically()))
+    if settings.NOTIFICATION_INTERVAL_SECONDS > 0:
+        background.append(asyncio.create_task(dispatch_notifications.run_periodically()))
+    yield
+    for task in background:
+        task.cancel()
+    # Views counted since the last flush would otherwise be lost
+    await run_in_threadpool(flush_views.flush_in_background)
+    engine.dispose()
 
 app = FastAPI(
     title=settings.APP_NAME,
     version=settings.VERSION,
-    debug=settings.DEBUG
+    debug=settings.DEBUG,
+    lifespan=lifespan
 )
 
+# Middleware added first runs innermost: rejections still get CORS headers
+# and are counted by the metrics middleware
+if settings.ADMISSION_ENABLED:
+    app.add_middleware(admission.AdmissionMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.BACKEND_CORS_ORIGINS,
@@ -20,10 +85,24 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(compression.CompressionMiddleware)
+
+profiling.instrument_engine(engine)
+app.add_middleware(profiling.ProfilingMiddleware)
+
+if settings.METRICS_ENABLED:
+    metrics.instrument_engine(engine)
+    app.add_middleware(metrics.MetricsMiddleware)
+
 app.include_router(auth.router, prefix="/api/auth", tags=["auth"])
 app.include_router(notes.router, prefix="/api/notes", tags=["notes"])
 app.include_router(public.router, prefix="/api/public/notes", tags=["public"])
+app.include_router(groups.router, prefix="/api/groups", tags=["groups"])
+app.include_router(notebooks.router, prefix="/api/notebooks", tags=["notebooks"])
+app.include_router(tags.router, prefix="/api/tags", tags=["tags"])
 app.include_router(user_settings.router, prefix="/api/users", tags=["users"])
+app.include_router(profiles.router, prefix="/internal/profiles", tags=["internal"], include_in_schema=False)
 
 @app.get("/")
 def read_root():
@@ -32,3 +111,7 @@ def read_root():
         "version": settings.VERSION,
         "docs": "/docs"
     }
+
+@app.get("/metrics", include_in_schema=False)
+def read_metrics():
+    return Response(content=metrics.render(), media_type=metrics.CONTENT_TYPE)
@@ -1,15 +1,19 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Table, Enum
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, BigInteger, String, Text, LargeBinary, Date, DateTime, ForeignKey, Table, Enum, Index
+from sqlalchemy.ext.hybrid import hybrid_property
+from sqlalchemy.orm import relationship, deferred
 from sqlalchemy.sql import func
 import enum
 import secrets
 from app.db.database import Base
+from app.utils import content_codec
 
 note_tags = Table(
     'note_tags',
     Base.metadata,
     Column('note_id', Integer, ForeignKey('notes.id'), primary_key=True),
-    Column('tag_id', Integer, ForeignKey('tags.id'), primary_key=True)
+    Column('tag_id', Integer, ForeignKey('tags.id'), primary_key=True),
+    # Orphan sweeps look tags up by id alone
+    Index('ix_note_tags_tag_id', 'tag_id')
 )
 
 note_shares = Table(
@@ -24,25 +28,65 @@ class VisibilityEnum(enum.Enum):
     SHARED = "SHARED"
     PUBLIC = "PUBLIC"
 
+class AccessRoleEnum(enum.Enum):
+    OWNER = "OWNER"
+    SHARED = "SHARED"
+
 class Note(Base):
     __tablename__ = "notes"
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, nullable=False)
-    content = Column(Text, nullable=True)
+    # Large bodies live compressed in content_compressed; use the content property.
+    # Both load together on first access, so listings that skip bodies never fetch them
+    _content = deferred(Column("content", Text, nullable=True), group="content")
+    content_compressed = deferred(Column(LargeBinary, nullable=True), group="content")
     visibility = Column(Enum(VisibilityEnum), default=VisibilityEnum.PRIVATE)
     owner_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    notebook_id = Column(Integer, ForeignKey("notebooks.id", ondelete="SET NULL"), nullable=True)
     public_token = Column(String, unique=True, nullable=True, index=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # Server-side markdown render, only loaded when explicitly requested
+    rendered_html = deferred(Column(Text, nullable=True))
+    rendered_hash = deferred(Column(String(64), nullable=True))
+    # Hash of the content note_links were last derived from
+    links_hash = deferred(Column(String(64), nullable=True))
 
     owner = relationship("User", back_populates="notes")
     tags = relationship("Tag", secondary=note_tags, back_populates="notes")
-    shared_with = relationship("User", secondary=note_shares, back_populates="shared_notes")
+    # note_shares rows are removed with bulk deletes, never by loading every collaborator
+    shared_with = relationship("User", secondary=note_shares, back_populates="shared_notes", passive_deletes=True)
+
+    __table_args__ = (
+        Index("ix_notes_visibility_id", "visibility", "id"),
+        # [[Title]] links resolve against the author's own notes
+        Index("ix_notes_owner_id_title", "owner_id", "title"),
+        Index("ix_notes_notebook_id_id", "notebook_id", "id"),
+    )
+
+    @hybrid_property
+    def content(self):
+        if self.content_compressed is None:
+            return self._content
+        # Decoded on first read only, and again only if the stored bytes change
+        cached = self.__dict__.get("_decoded_content")
+        if cached is None or cached[0] is not self.content_compressed:
+            cached = (self.content_compressed, content_codec.decode(self.content_compressed))
+            self.__dict__["_decoded_content"] = cached
+        return cached[1]
 
-    @property
-    def shared_with_emails(self):
-        return [user.email for user in self.shared_with] if self.shared_with else []
+    @content.setter
+    def content(self, value):
+        compressed = content_codec.encode(value)
+        self._content = None if compressed is not None else value
+        self.content_compressed = compressed
+        self.__dict__.pop("_decoded_content", None)
+
+    @content.expression
+    def content(cls):
+        # Only matches uncompressed bodies; nothing filters on content in SQL
+        return cls._content
 
     def generate_public_token(self):
         if not self.public_token:
@@ -56,4 +100,102 @@ class Tag(Base):
     name = Column(String, unique=True, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
-    notes = relationship("Note", secondary=note_tags, back_populates="tags") 
\ No newline at end of file
+    notes = relationship("Note", secondary=note_tags, back_populates="tags") 
+
+class ContentDictionary(Base):
+    """zstd dictionaries trained on note bodies; the newest compresses new writes."""
+    __tablename__ = "content_dictionaries"
+
+    id = Column(Integer, primary_key=True)
+    dict_id = Column(BigInteger, unique=True, nullable=False)
+    data = Column(LargeBinary, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class UserTag(Base):
+    """Per-user tag catalog with materialized usage counts."""
+    __tablename__ = "user_tags"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    tag_id = Column(Integer, ForeignKey("tags.id", ondelete="CASCADE"), primary_key=True)
+    # Byte order on Postgres too, so prefix ranges on the index match LIKE
+    # whatever the database collation (SQLite already compares bytes)
+    name = Column(String().with_variant(String(collation="C"), "postgresql"), nullable=False)
+    usage_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        Index("ix_user_tags_user_id_name", "user_id", "name"),
+    )
+
+class NoteAccess(Base):
+    """Denormalized (user, note) access rows, one per owner and per share."""
+    __tablename__ = "note_access"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    note_id = Column(Integer, ForeignKey("notes.id", ondelete="CASCADE"), primary_key=True)
+    role = Column(Enum(AccessRoleEnum), nullable=False)
+    # Copy of notes.owner_id so lookups through this table can name the notes
+    # partition when notes is hash-partitioned by owner (see app.db.partitioning)
+    note_owner_id = Column(Integer, nullable=True)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        Index("ix_note_access_note_id", "note_id"),
+    )
+
+class NoteChange(Base):
+    """Append-only change log backing incremental sync; ``id`` is the cursor."""
+    __tablename__ = "note_changes"
+
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    # Only note_id: the note changed. user_id: that user may have lost access to
+    # note_id, or without a note joined or left group_id. group_id and note_id:
+    # the group's members may have lost access. No foreign keys: tombstones
+    # outlive what they name
+    note_id = Column(Integer, nullable=True)
+    user_id = Column(Integer, nullable=True)
+    group_id = Column(Integer, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+
+    __table_args__ = (
+        Index("ix_note_changes_user_id_id", "user_id", "id"),
+        Index("ix_note_changes_group_id_id", "group_id", "id"),
+        Index("ix_note_changes_note_id_id", "note_id", "id"),
+    )
+
+
+class NoteSignature(Base):
+    """MinHash signature of a note's content (see app.utils.minhash)."""
+    __tablename__ = "note_signatures"
+
+    note_id = Column(Integer, ForeignKey("notes.id", ondelete="CASCADE"), primary_key=True)
+    owner_id = Column(Integer, nullable=False)
+    signature = Column(LargeBinary, nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        Index("ix_note_signatures_owner_id_note_id", "owner_id", "note_id"),
+    )
+
+
+class NoteLink(Base):
+    """A reference from one note's content to another note."""
+    __tablename__ = "note_links"
+
+    source_id = Column(Integer, ForeignKey("notes.id", ondelete="CASCADE"), primary_key=True)
+    target_id = Column(Integer, ForeignKey("notes.id", ondelete="CASCADE"), primary_key=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_note_links_target_id_source_id", "target_id", "source_id"),
+    )
+
+
+class NoteViewStat(Base):
+    """Daily view count of a public note per referring host."""
+    __tablename__ = "note_view_stats"
+
+    note_id = Column(Integer, ForeignKey("notes.id", ondelete="CASCADE"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    referrer = Column(String(255), primary_key=True)
+    views = Column(BigInteger, nullable=False, default=0)
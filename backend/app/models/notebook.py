@@ -0,0 +1,24 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
+from sqlalchemy.sql import func
+from app.db.database import Base
+
+class Notebook(Base):
+    """A folder of notes, nested under an optional parent notebook."""
+    __tablename__ = "notebooks"
+
+    id = Column(Integer, primary_key=True, index=True)
+    owner_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    parent_id = Column(Integer, ForeignKey("notebooks.id", ondelete="CASCADE"), nullable=True)
+    name = Column(String, nullable=False)
+    # Ids from the root, e.g. /3/17/42/: a subtree is one range on (owner_id, path),
+    # which needs bytewise comparison (C collation on Postgres)
+    path = Column(String().with_variant(String(collation="C"), "postgresql"), nullable=False)
+    note_count = Column(Integer, nullable=False, default=0)
+    total_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        Index("ix_notebooks_owner_id_path", "owner_id", "path"),
+        Index("ix_notebooks_owner_id_parent_id_name", "owner_id", "parent_id", "name"),
+    )
@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, ForeignKey, Index
+from sqlalchemy.sql import func
+from app.db.database import Base
+
+class OutboxEvent(Base):
+    """A notification waiting to be delivered."""
+    __tablename__ = "notification_outbox"
+
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    recipient_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    kind = Column(String, nullable=False)
+    # No foreign key: the note may be deleted before delivery, which drops the event
+    note_id = Column(Integer, nullable=True)
+    actor_id = Column(Integer, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    retry_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_notification_outbox_recipient_id_note_id", "recipient_id", "note_id"),
+    )
@@ -23,4 +23,4 @@ class User(Base):
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
     notes = relationship("Note", back_populates="owner", cascade="all, delete-orphan")
-    shared_notes = relationship("Note", secondary="note_shares", back_populates="shared_with") 
\ No newline at end of file
+    shared_notes = relationship("Note", secondary="note_shares", back_populates="shared_with", passive_deletes=True) 
\ No newline at end of file
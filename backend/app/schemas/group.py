@@ -0,0 +1,31 @@
+from pydantic import BaseModel, EmailStr
+from typing import List, Optional
+from datetime import datetime
+
+class GroupCreate(BaseModel):
+    name: str
+
+class Group(BaseModel):
+    id: int
+    name: str
+    owner_id: int
+    created_at: datetime
+    member_count: int = 0
+
+    class Config:
+        from_attributes = True
+
+class GroupMemberAdd(BaseModel):
+    user_email: EmailStr
+
+class GroupMember(BaseModel):
+    id: int
+    email: str
+    name: Optional[str] = None
+
+class GroupMemberPage(BaseModel):
+    items: List[GroupMember]
+    next_cursor: Optional[int] = None
+
+class NoteGroupShare(BaseModel):
+    group_id: int
@@ -1,6 +1,6 @@
-from pydantic import BaseModel, computed_field
+from pydantic import BaseModel, Field
 from typing import List, Optional
-from datetime import datetime
+from datetime import date, datetime
 from enum import Enum
 
 class VisibilityEnum(str, Enum):
@@ -18,6 +18,14 @@ class Tag(TagBase):
     class Config:
         from_attributes = True
 
+class TagUsage(BaseModel):
+    tag_id: int
+    name: str
+    usage_count: int
+
+    class Config:
+        from_attributes = True
+
 class NoteBase(BaseModel):
     title: str
     content: Optional[str] = None
@@ -25,7 +33,7 @@ class NoteBase(BaseModel):
     tags: List[str] = []
 
 class NoteCreate(NoteBase):
-    pass
+    notebook_id: Optional[int] = None
 
 class NoteUpdate(BaseModel):
     title: Optional[str] = None
@@ -36,21 +44,49 @@ class NoteUpdate(BaseModel):
 class Note(NoteBase):
     id: int
     owner_id: int
+    notebook_id: Optional[int] = None
     created_at: datetime
     updated_at: Optional[datetime] = None
     tags: List[Tag] = []
-    shared_with: Optional[List[str]] = None
+    # Users the note is shared with directly, i.e. the collaborators list;
+    # members of groups it is shared with are not counted
+    shared_count: int = 0
     public_token: Optional[str] = None
 
     class Config:
         from_attributes = True
-        
-    @computed_field
-    @property
-    def shared_with_emails(self) -> Optional[List[str]]:
-        if hasattr(self, '_shared_with_users') and self._shared_with_users:
-            return [user.email for user in self._shared_with_users]
-        return self.shared_with or []
+
+class Collaborator(BaseModel):
+    id: int
+    email: str
+    name: Optional[str] = None
+
+class CollaboratorPage(BaseModel):
+    items: List[Collaborator]
+    next_cursor: Optional[int] = None
+
+class Backlink(BaseModel):
+    id: int
+    title: str
+    owner_id: int
+    updated_at: Optional[datetime] = None
+
+class BacklinkPage(BaseModel):
+    items: List[Backlink]
+    next_cursor: Optional[int] = None
+
+class DailyViews(BaseModel):
+    day: date
+    views: int
+
+class ReferrerViews(BaseModel):
+    referrer: str
+    views: int
+
+class NoteViewStats(BaseModel):
+    total_views: int
+    days: List[DailyViews]
+    referrers: List[ReferrerViews]
 
 class NoteShare(BaseModel):
     user_email: str
@@ -64,10 +100,36 @@ class PublicNote(BaseModel):
     updated_at: Optional[datetime] = None
     tags: List[Tag] = []
     public_token: str
+    rendered_html: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+class ExploreNote(BaseModel):
+    # No content: the body is read through public_token, which checks it is still public
+    id: int
+    title: str
+    owner_id: int
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+    tags: List[Tag] = []
+    public_token: Optional[str] = None
 
     class Config:
         from_attributes = True
 
+class ExplorePage(BaseModel):
+    items: List[ExploreNote]
+    next_cursor: Optional[int] = None
+
 class PublicLinkResponse(BaseModel):
     public_url: str
-    public_token: str 
\ No newline at end of file
+    public_token: str 
+class SimilarNote(BaseModel):
+    id: int
+    title: str
+    similarity: float
+
+class DuplicateCheck(BaseModel):
+    content: str
+    threshold: Optional[float] = Field(None, ge=0, le=1)
@@ -0,0 +1,37 @@
+from pydantic import BaseModel
+from typing import List, Optional
+from datetime import datetime
+from app.schemas.note import VisibilityEnum
+
+class NotebookCreate(BaseModel):
+    name: str
+    parent_id: Optional[int] = None
+
+class NotebookUpdate(BaseModel):
+    name: str
+
+class NotebookMove(BaseModel):
+    parent_id: Optional[int] = None
+
+class Notebook(BaseModel):
+    id: int
+    name: str
+    parent_id: Optional[int] = None
+    depth: int
+    note_count: int = 0
+    total_count: int = 0
+    created_at: datetime
+
+class NotebookNote(BaseModel):
+    id: int
+    title: str
+    notebook_id: int
+    visibility: VisibilityEnum
+    updated_at: Optional[datetime] = None
+
+class NotebookNotePage(BaseModel):
+    items: List[NotebookNote]
+    next_cursor: Optional[int] = None
+
+class NoteFiling(BaseModel):
+    notebook_id: Optional[int] = None
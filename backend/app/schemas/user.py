@@ -38,11 +38,20 @@ class UserLogin(BaseModel):
 
 class Token(BaseModel):
     access_token: str
+    refresh_token: str
     token_type: str
+    expires_in: int
     user: User
 
+class TokenRefresh(BaseModel):
+    refresh_token: str
+
+class Logout(BaseModel):
+    refresh_token: Optional[str] = None
+
 class TokenData(BaseModel):
-    email: Optional[str] = None
+    user_id: int
+    jti: str
 
 class PasswordUpdate(BaseModel):
     current_password: str
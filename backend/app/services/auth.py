@@ -1,7 +1,8 @@
 from sqlalchemy.orm import Session
 from app.models.user import User
 from app.schemas.user import UserCreate, UserLogin
-from app.core.security import get_password_hash, verify_password, create_access_token
+from app.core.security import get_password_hash, verify_password
+from app.services.tokens import TokenService
 from fastapi import HTTPException, status
 
 class AuthService:
@@ -50,5 +51,6 @@ class AuthService:
         return user
 
     @staticmethod
-    def create_token(user: User) -> str:
-        return create_access_token(data={"sub": user.email}) 
\ No newline at end of file
+    def create_tokens(db: Session, user: User) -> dict:
+        # The subject is the immutable id, so changing an email keeps sessions valid
+        return TokenService.issue(db, user)
@@ -0,0 +1,67 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import func, insert, select
+from typing import Dict, Iterable, Optional
+from datetime import datetime
+from app.models.note import Note, NoteAccess, NoteChange
+from app.models.group import NoteGroupShare
+
+class ChangeLog:
+    """Writes note_changes rows inside the caller's transaction."""
+
+    @staticmethod
+    def note_changed(db: Session, note_id: int) -> None:
+        db.add(NoteChange(note_id=note_id))
+
+    @staticmethod
+    def notes_changed(db: Session, note_ids) -> None:
+        """``note_changed`` for many notes; ``note_ids`` may be a list or a subquery."""
+        db.execute(insert(NoteChange).from_select(["note_id"], select(Note.id).where(Note.id.in_(note_ids))))
+
+    @staticmethod
+    def notes_removed(db: Session, note_ids) -> None:
+        """Tombstones for everyone with direct or group access to ``note_ids``; call before deleting that access."""
+        db.execute(insert(NoteChange).from_select(
+            ["note_id", "user_id"],
+            select(NoteAccess.note_id, NoteAccess.user_id).where(NoteAccess.note_id.in_(note_ids))
+        ))
+        db.execute(insert(NoteChange).from_select(
+            ["note_id", "group_id"],
+            select(NoteGroupShare.note_id, NoteGroupShare.group_id).where(NoteGroupShare.note_id.in_(note_ids))
+        ))
+
+    @staticmethod
+    def group_access_removed(db: Session, group_id: int, note_ids: Optional[Iterable[int]] = None) -> None:
+        """Members of ``group_id`` lost access to ``note_ids`` (all its notes by default)."""
+        if note_ids is not None:
+            for note_id in note_ids:
+                db.add(NoteChange(note_id=note_id, group_id=group_id))
+            return
+        db.execute(insert(NoteChange).from_select(
+            ["note_id", "group_id"],
+            select(NoteGroupShare.note_id, NoteGroupShare.group_id).where(NoteGroupShare.group_id == group_id)
+        ))
+
+    @staticmethod
+    def membership_changed(db: Session, group_id: int, user_id: int) -> None:
+        db.add(NoteChange(user_id=user_id, group_id=group_id))
+
+    @staticmethod
+    def settled_bound(db: Session, settled: datetime) -> int:
+        """Lowest id that can't be served yet: the first row newer than ``settled``."""
+        unsettled = db.query(func.min(NoteChange.id)).filter(NoteChange.created_at > settled).scalar()
+        if unsettled is not None:
+            return unsettled
+        return db.query(func.coalesce(func.max(NoteChange.id), 0)).scalar() + 1
+
+    @staticmethod
+    def versions(db: Session, note_ids: Iterable[int]) -> Dict[int, int]:
+        """Id of the latest change row of each of ``note_ids``; notes without one are left out."""
+        return dict(db.query(NoteChange.note_id, func.max(NoteChange.id)).filter(
+            NoteChange.note_id.in_(list(note_ids))
+        ).group_by(NoteChange.note_id).all())
+
+    @staticmethod
+    def horizon(db: Session) -> int:
+        """Oldest cursor that can still be served; older ones need a full resync."""
+        oldest = db.query(func.min(NoteChange.id)).scalar()
+        return oldest - 1 if oldest is not None else 0
@@ -0,0 +1,104 @@
+import threading
+import time
+from sqlalchemy.orm import Session, selectinload
+from typing import List, Optional
+from app.core.config import settings
+from app.core import metrics
+from app.models.note import Note, VisibilityEnum
+from app.schemas.note import ExploreNote
+
+class _Snapshot:
+    """In-memory copy of the newest public notes, shared by all requests of a worker."""
+
+    def __init__(self):
+        self.items: List[dict] = []
+        self.complete = False
+        self.expires_at = 0.0
+        # Bumped by invalidate: a refresh that read the notes before it is discarded
+        self.generation = 0
+        self.lock = threading.Lock()
+
+    def is_fresh(self) -> bool:
+        return time.monotonic() < self.expires_at
+
+    def invalidate(self) -> None:
+        self.generation += 1
+        self.expires_at = 0.0
+
+_snapshot = _Snapshot()
+
+class ExploreService:
+    @staticmethod
+    def _query_public_notes(db: Session, cursor: Optional[int], limit: int) -> List[Note]:
+        query = db.query(Note).options(selectinload(Note.tags)).filter(
+            Note.visibility == VisibilityEnum.PUBLIC
+        )
+        if cursor is not None:
+            query = query.filter(Note.id < cursor)
+        return query.order_by(Note.id.desc()).limit(limit).all()
+
+    @staticmethod
+    def _serialize(notes: List[Note]) -> List[dict]:
+        return [ExploreNote.model_validate(note).model_dump() for note in notes]
+
+    @staticmethod
+    def _refresh_snapshot(db: Session) -> bool:
+        with _snapshot.lock:
+            if _snapshot.is_fresh():
+                return True
+            generation = _snapshot.generation
+            size = settings.EXPLORE_SNAPSHOT_SIZE
+            notes = ExploreService._query_public_notes(db, None, size)
+            if generation != _snapshot.generation:
+                return False
+            _snapshot.items = ExploreService._serialize(notes)
+            _snapshot.complete = len(notes) < size
+            _snapshot.expires_at = time.monotonic() + settings.EXPLORE_SNAPSHOT_TTL_SECONDS
+            return True
+
+    @staticmethod
+    def _still_public(db: Session, page: List[dict]) -> List[dict]:
+        # Other workers' invalidations don't reach this snapshot: drop what stopped being public
+        public = {note_id for (note_id,) in db.query(Note.id).filter(
+            Note.id.in_([item["id"] for item in page]),
+            Note.visibility == VisibilityEnum.PUBLIC
+        )}
+        return [item for item in page if item["id"] in public]
+
+    @staticmethod
+    def _from_snapshot(cursor: Optional[int], limit: int) -> Optional[List[dict]]:
+        items = _snapshot.items
+        start = 0
+        if cursor is not None:
+            # Items are ordered by id descending, so skip everything >= cursor
+            while start < len(items) and items[start]["id"] >= cursor:
+                start += 1
+            if start == len(items) and not _snapshot.complete:
+                return None
+        page = items[start:start + limit]
+        if len(page) < limit and not _snapshot.complete:
+            return None
+        return page
+
+    @staticmethod
+    def get_public_feed(db: Session, cursor: Optional[int] = None, limit: Optional[int] = None) -> dict:
+        limit = min(limit or settings.EXPLORE_PAGE_SIZE, settings.EXPLORE_MAX_PAGE_SIZE)
+
+        fresh = _snapshot.is_fresh() or ExploreService._refresh_snapshot(db)
+        page = ExploreService._from_snapshot(cursor, limit) if fresh else None
+        if page is not None:
+            metrics.cache_hit("explore_snapshot")
+            next_cursor = page[-1]["id"] if len(page) == limit else None
+            page = ExploreService._still_public(db, page) if page else page
+        else:
+            metrics.cache_miss("explore_snapshot")
+            # Deep pages fall through to the (visibility, id) index
+            notes = ExploreService._query_public_notes(db, cursor, limit)
+            page = ExploreService._serialize(notes)
+            next_cursor = page[-1]["id"] if len(page) == limit else None
+
+        return {"items": page, "next_cursor": next_cursor}
+
+    @staticmethod
+    def invalidate() -> None:
+        _snapshot.invalidate()
@@ -0,0 +1,163 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import func
+from typing import List, Optional
+from app.core.config import settings
+from app.models.group import Group, GroupMember, NoteGroupShare
+from app.models.user import User
+from app.schemas.group import GroupCreate, GroupMemberAdd
+from app.services.changes import ChangeLog
+from app.services.note_cache import note_cache
+from fastapi import HTTPException, status
+
+class GroupsService:
+    @staticmethod
+    def create_group(db: Session, group_create: GroupCreate, user: User) -> dict:
+        group = Group(name=group_create.name, owner_id=user.id)
+        db.add(group)
+        db.flush()
+        db.add(GroupMember(group_id=group.id, user_id=user.id))
+        db.commit()
+        db.refresh(group)
+        return GroupsService._serialize(group, 1)
+
+    @staticmethod
+    def get_user_groups(db: Session, user: User) -> List[dict]:
+        # Correlated count: one index range scan per group, not a scan of all memberships
+        member_count = (
+            db.query(func.count())
+            .select_from(GroupMember)
+            .filter(GroupMember.group_id == Group.id)
+            .correlate(Group)
+            .scalar_subquery()
+        )
+        membership = db.query(GroupMember.group_id).filter(GroupMember.user_id == user.id)
+        rows = (
+            db.query(Group, member_count)
+            .filter(Group.id.in_(membership))
+            .order_by(Group.name)
+            .all()
+        )
+        return [GroupsService._serialize(group, count) for group, count in rows]
+
+    @staticmethod
+    def get_group(db: Session, group_id: int, user: User) -> Group:
+        group = db.query(Group).filter(Group.id == group_id).first()
+        if not group or not GroupsService.is_member(db, group_id, user.id):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Group not found"
+            )
+        return group
+
+    @staticmethod
+    def is_member(db: Session, group_id: int, user_id: int) -> bool:
+        return db.query(
+            db.query(GroupMember).filter(
+                GroupMember.group_id == group_id,
+                GroupMember.user_id == user_id
+            ).exists()
+        ).scalar()
+
+    @staticmethod
+    def get_members(
+        db: Session,
+        group_id: int,
+        user: User,
+        cursor: Optional[int] = None,
+        limit: Optional[int] = None
+    ) -> dict:
+        GroupsService.get_group(db, group_id, user)
+        limit = min(limit or settings.GROUP_MEMBERS_PAGE_SIZE, settings.GROUP_MEMBERS_MAX_PAGE_SIZE)
+
+        query = (
+            db.query(User.id, User.email, User.name)
+            .join(GroupMember, GroupMember.user_id == User.id)
+            .filter(GroupMember.group_id == group_id)
+        )
+        if cursor is not None:
+            query = query.filter(User.id > cursor)
+        rows = query.order_by(User.id).limit(limit).all()
+
+        items = [{"id": row.id, "email": row.email, "name": row.name} for row in rows]
+        next_cursor = items[-1]["id"] if len(items) == limit else None
+        return {"items": items, "next_cursor": next_cursor}
+
+    @staticmethod
+    def add_member(db: Session, group_id: int, member_data: GroupMemberAdd, user: User) -> bool:
+        group = GroupsService._get_owned_group(db, group_id, user)
+
+        member = db.query(User).filter(User.email == member_data.user_email).first()
+        if not member:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="User not found"
+            )
+
+        if not GroupsService.is_member(db, group.id, member.id):
+            db.add(GroupMember(group_id=group.id, user_id=member.id))
+            ChangeLog.membership_changed(db, group.id, member.id)
+            db.commit()
+            note_cache.invalidate_users([member.id])
+        return True
+
+    @staticmethod
+    def remove_member(db: Session, group_id: int, member_id: int, user: User) -> bool:
+        group = GroupsService.get_group(db, group_id, user)
+
+        # Members may leave on their own; everything else is up to the owner
+        if group.owner_id != user.id and member_id != user.id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Only owner can remove members"
+            )
+        if member_id == group.owner_id:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Owner cannot leave the group"
+            )
+
+        removed = db.query(GroupMember).filter(
+            GroupMember.group_id == group.id,
+            GroupMember.user_id == member_id
+        ).delete(synchronize_session=False)
+        if removed:
+            ChangeLog.membership_changed(db, group.id, member_id)
+        db.commit()
+        if removed:
+            note_cache.invalidate_users([member_id])
+        return True
+
+    @staticmethod
+    def delete_group(db: Session, group_id: int, user: User) -> bool:
+        group = GroupsService._get_owned_group(db, group_id, user)
+
+        ChangeLog.group_access_removed(db, group.id)
+        shared_note_ids = [note_id for (note_id,) in db.query(NoteGroupShare.note_id).filter(
+            NoteGroupShare.group_id == group.id
+        )]
+        db.query(NoteGroupShare).filter(NoteGroupShare.group_id == group.id).delete(synchronize_session=False)
+        db.query(GroupMember).filter(GroupMember.group_id == group.id).delete(synchronize_session=False)
+        db.delete(group)
+        db.commit()
+        note_cache.invalidate_notes(db, shared_note_ids)
+        return True
+
+    @staticmethod
+    def _get_owned_group(db: Session, group_id: int, user: User) -> Group:
+        group = GroupsService.get_group(db, group_id, user)
+        if group.owner_id != user.id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Only owner can manage group"
+            )
+        return group
+
+    @staticmethod
+    def _serialize(group: Group, member_count: int) -> dict:
+        return {
+            "id": group.id,
+            "name": group.name,
+            "owner_id": group.owner_id,
+            "created_at": group.created_at,
+            "member_count": member_count,
+        }
@@ -0,0 +1,80 @@
+import re
+from typing import Optional, Set, Tuple
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.note import Note, NoteLink
+from app.services.render import RenderService
+
+# [[42]], [[42|label]] or [[Title]]
+_WIKI_LINK = re.compile(r"\[\[([^\[\]|\n]+)(?:\|[^\[\]\n]*)?\]\]")
+# Links to the app itself, relative or on one of its own origins
+_APP_LINK = re.compile(
+    r"(?:(?P<origin>https?://[^\s/()<>\[\]]+)|(?<![\w/.:]))"
+    r"/(?:dashboard/notes/(?P<id>\d+)|public/notes/(?P<token>[\w-]+))"
+)
+
+class LinksService:
+    @staticmethod
+    def parse(content: Optional[str]) -> Tuple[Set[int], Set[str], Set[str]]:
+        """Note ids, titles and public tokens referenced by ``content``."""
+        ids, titles, tokens = set(), set(), set()
+        if not content:
+            return ids, titles, tokens
+        for match in _WIKI_LINK.finditer(content):
+            reference = match.group(1).strip()
+            if reference.isdigit():
+                ids.add(int(reference))
+            elif reference:
+                titles.add(reference)
+        origins = {origin.rstrip("/") for origin in settings.BACKEND_CORS_ORIGINS}
+        for match in _APP_LINK.finditer(content):
+            if match.group("origin") and match.group("origin") not in origins:
+                continue
+            if match.group("id"):
+                ids.add(int(match.group("id")))
+            else:
+                tokens.add(match.group("token"))
+        return ids, titles, tokens
+
+    @staticmethod
+    def _resolve(db: Session, note: Note, ids: Set[int], titles: Set[str], tokens: Set[str]) -> Set[int]:
+        targets = set()
+        if ids:
+            targets.update(note_id for (note_id,) in db.query(Note.id).filter(Note.id.in_(ids)))
+        if titles:
+            # Titles are only unambiguous within the author's own notes
+            targets.update(note_id for (note_id,) in db.query(Note.id).filter(
+                Note.owner_id == note.owner_id, Note.title.in_(titles)
+            ))
+        if tokens:
+            targets.update(note_id for (note_id,) in db.query(Note.id).filter(Note.public_token.in_(tokens)))
+        targets.discard(note.id)
+        return targets
+
+    @staticmethod
+    def update_links(db: Session, note: Note) -> bool:
+        """Bring ``note``'s outgoing links in line with its content; False if it is unchanged."""
+        content_hash = RenderService.content_hash(note.content)
+        if note.links_hash == content_hash:
+            return False
+        targets = LinksService._resolve(db, note, *LinksService.parse(note.content))
+        existing = {
+            target_id for (target_id,) in
+            db.query(NoteLink.target_id).filter(NoteLink.source_id == note.id)
+        }
+        removed = existing - targets
+        if removed:
+            db.query(NoteLink).filter(
+                NoteLink.source_id == note.id,
+                NoteLink.target_id.in_(removed)
+            ).delete(synchronize_session=False)
+        db.add_all(NoteLink(source_id=note.id, target_id=target_id) for target_id in targets - existing)
+        note.links_hash = content_hash
+        return True
+
+    @staticmethod
+    def delete_links(db: Session, note_ids) -> None:
+        """Drop links from and to ``note_ids`` (ids or a subquery of them)."""
+        db.query(NoteLink).filter(
+            NoteLink.source_id.in_(note_ids) | NoteLink.target_id.in_(note_ids)
+        ).delete(synchronize_session=False)
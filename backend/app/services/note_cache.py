@@ -0,0 +1,290 @@
+import importlib
+import json
+import secrets
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Hashable, Iterable, Optional
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core import metrics
+from app.models.note import Note, NoteChange, VisibilityEnum
+from app.schemas.note import Note as NoteSchema
+from app.services.changes import ChangeLog
+from app.utils.lru import LRUCache
+
+class LocalBackend:
+    """In-process stand-in for a shared cache server such as Redis."""
+
+    def __init__(self):
+        # Tombstones have no body but still take a slot
+        self._values = LRUCache(
+            max_size=settings.NOTE_CACHE_SHARED_SIZE_BYTES,
+            ttl=settings.NOTE_CACHE_SHARED_TTL_SECONDS,
+            sizeof=lambda entry: 64 + len(entry[1] or b""),
+        )
+        self._lock = threading.Lock()
+        self._subscribers = []
+
+    def get(self, key: str) -> Optional[bytes]:
+        """The value under ``key``; None when missing or a tombstone."""
+        entry = self._values.get(key)
+        return entry[1] if entry is not None else None
+
+    def set(self, key: str, value: Optional[bytes], version: int) -> None:
+        """Store ``value`` (None for a tombstone) unless a newer version is already stored."""
+        with self._lock:
+            current = self._values.get(key)
+            if current is None or current[0] <= version:
+                self._values.set(key, (version, value))
+
+    def publish(self, message: str) -> None:
+        for callback in list(self._subscribers):
+            callback(message)
+
+    def subscribe(self, callback: Callable[[str], None]) -> None:
+        self._subscribers.append(callback)
+
+BACKENDS: Dict[str, Callable[[], object]] = {
+    "local": LocalBackend,
+}
+
+_backends: Dict[str, object] = {}
+
+def get_backend(name: str):
+    """The shared tier named ``name``, one instance per process; None when empty."""
+    if not name:
+        return None
+    backend = _backends.get(name)
+    if backend is None:
+        factory = BACKENDS.get(name)
+        if factory is None:
+            module, _, attribute = name.partition(":")
+            factory = getattr(importlib.import_module(module), attribute)
+        backend = _backends[name] = factory()
+    return backend
+
+class CachedNote:
+    """Serialized note (the ``Note`` schema as JSON) and what access checks need from it."""
+
+    __slots__ = ("body", "owner_id", "public", "stamp")
+
+    def __init__(self, body: bytes, owner_id: int, public: bool, stamp: int):
+        self.body = body
+        self.owner_id = owner_id
+        self.public = public
+        self.stamp = stamp
+
+    @classmethod
+    def from_note(cls, note: Note, shared_count: int, stamp: int) -> "CachedNote":
+        body = NoteSchema.model_validate({
+            "id": note.id,
+            "title": note.title,
+            "content": note.content,
+            "visibility": note.visibility.value,
+            "owner_id": note.owner_id,
+            "notebook_id": note.notebook_id,
+            "created_at": note.created_at,
+            "updated_at": note.updated_at,
+            "tags": note.tags,
+            "shared_count": shared_count,
+            "public_token": note.public_token
+        }).model_dump_json().encode()
+        return cls(body, note.owner_id, note.visibility == VisibilityEnum.PUBLIC, stamp)
+
+    @classmethod
+    def from_body(cls, body: bytes, stamp: int) -> "CachedNote":
+        data = json.loads(body)
+        return cls(body, data["owner_id"], data["visibility"] == VisibilityEnum.PUBLIC.value, stamp)
+
+class _Invalidations:
+    """Sequence number of the latest invalidation of each key."""
+
+    def __init__(self, max_keys: int):
+        self._lock = threading.Lock()
+        self._last: "OrderedDict[Hashable, int]" = OrderedDict()
+        self.max_keys = max_keys
+        self.seq = 0
+        self.floor = 0
+
+    def bump(self, keys: Iterable[Hashable]) -> None:
+        with self._lock:
+            self.seq += 1
+            for key in keys:
+                self._last[key] = self.seq
+                self._last.move_to_end(key)
+            while len(self._last) > self.max_keys:
+                _, seq = self._last.popitem(last=False)
+                self.floor = seq
+
+    def bump_all(self) -> None:
+        with self._lock:
+            self.seq += 1
+            self.floor = self.seq
+            self._last.clear()
+
+    def valid(self, stamp: int, *keys: Hashable) -> bool:
+        if stamp < self.floor:
+            return False
+        return all(stamp >= self._last.get(key, 0) for key in keys)
+
+class NoteCache:
+    """Two-tier cache of serialized notes and per-user access results."""
+
+    def __init__(self, backend=None):
+        self._notes = LRUCache(
+            max_size=settings.NOTE_CACHE_SIZE_BYTES,
+            ttl=settings.NOTE_CACHE_TTL_SECONDS,
+            sizeof=lambda entry: len(entry.body),
+        )
+        self._access = LRUCache(max_size=settings.NOTE_CACHE_ACCESS_SIZE, ttl=settings.NOTE_CACHE_TTL_SECONDS)
+        self._invalidations = _Invalidations(settings.NOTE_CACHE_MAX_INVALIDATIONS)
+        self._origin = secrets.token_hex(8)
+        self._backend = backend
+        self._resolved = backend is not None
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._seen = set()
+        self.synced_at = datetime.now(timezone.utc)
+        if backend is not None:
+            backend.subscribe(self._receive)
+
+    @property
+    def backend(self):
+        if not self._resolved:
+            with self._lock:
+                if not self._resolved:
+                    # Resolved on first use, after gunicorn has forked the worker
+                    self._backend = get_backend(settings.NOTE_CACHE_BACKEND)
+                    if self._backend is not None:
+                        self._backend.subscribe(self._receive)
+                    self._resolved = True
+        return self._backend
+
+    def stamp(self) -> int:
+        """Take before loading anything that will be ``put``."""
+        return self._invalidations.seq
+
+    def version(self, db: Session, note_id: int) -> int:
+        """Shared-tier version of ``note_id``; read before loading the note to ``put``."""
+        if self.backend is None:
+            return 0
+        return ChangeLog.versions(db, [note_id]).get(note_id, 0)
+
+    def get(self, note_id: int) -> Optional[CachedNote]:
+        stamp = self.stamp()
+        entry = self._notes.get(note_id)
+        if entry is not None and self._invalidations.valid(entry.stamp, ("note", note_id)):
+            metrics.cache_hit("note")
+            return entry
+        metrics.cache_miss("note")
+        backend = self.backend
+        if backend is None:
+            return None
+        body = backend.get(f"note:{note_id}")
+        if body is None:
+            metrics.cache_miss("note_shared")
+            return None
+        metrics.cache_hit("note_shared")
+        entry = CachedNote.from_body(body, stamp)
+        self._notes.set(note_id, entry)
+        return entry
+
+    def put(self, note: Note, shared_count: int, stamp: int, version: int) -> CachedNote:
+        entry = CachedNote.from_note(note, shared_count, stamp)
+        # Loaded before an invalidation that has already happened: serve it once, keep nothing
+        if self._invalidations.valid(stamp, ("note", note.id)):
+            self._notes.set(note.id, entry)
+            backend = self.backend
+            if backend is not None:
+                backend.set(f"note:{note.id}", entry.body, version)
+        return entry
+
+    def get_access(self, note_id: int, user_id: int) -> Optional[bool]:
+        """Whether ``user_id`` may read ``note_id``, or None when not cached."""
+        cached = self._access.get((note_id, user_id))
+        if cached is not None and self._invalidations.valid(cached[0], ("note", note_id), ("user", user_id)):
+            metrics.cache_hit("note_access")
+            return cached[1]
+        metrics.cache_miss("note_access")
+        return None
+
+    def put_access(self, note_id: int, user_id: int, allowed: bool, stamp: int) -> None:
+        self._access.set((note_id, user_id), (stamp, allowed))
+
+    def invalidate_notes(self, db: Session, note_ids: Iterable[int]) -> None:
+        """Evict ``note_ids`` and their access results on all workers, after the commit that logged them."""
+        note_ids = list(note_ids)
+        if not note_ids:
+            return
+        self._evict_notes(note_ids)
+        backend = self.backend
+        if backend is not None:
+            versions = ChangeLog.versions(db, note_ids)
+            for note_id in note_ids:
+                backend.set(f"note:{note_id}", None, versions.get(note_id, 0))
+            backend.publish(f"{self._origin} note {','.join(map(str, note_ids))}")
+
+    def invalidate_users(self, user_ids: Iterable[int]) -> None:
+        """Evict every access result of ``user_ids``, on all workers."""
+        user_ids = list(user_ids)
+        if not user_ids:
+            return
+        self._invalidations.bump(("user", user_id) for user_id in user_ids)
+        backend = self.backend
+        if backend is not None:
+            backend.publish(f"{self._origin} user {','.join(map(str, user_ids))}")
+
+    def clear(self) -> None:
+        """Evict everything, on all workers; for changes too broad to enumerate."""
+        self._clear()
+        backend = self.backend
+        if backend is not None:
+            backend.publish(f"{self._origin} all")
+
+    def _evict_notes(self, note_ids) -> None:
+        self._invalidations.bump(("note", note_id) for note_id in note_ids)
+        for note_id in note_ids:
+            self._notes.delete(note_id)
+
+    def _clear(self) -> None:
+        self._invalidations.bump_all()
+        self._notes.clear()
+        self._access.clear()
+
+    def _receive(self, message: str) -> None:
+        origin, kind, *ids = message.split(" ")
+        if origin == self._origin:
+            return
+        if kind == "all":
+            self._clear()
+        elif kind == "note":
+            self._evict_notes([int(note_id) for note_id in ids[0].split(",")])
+        elif kind == "user":
+            self._invalidations.bump(("user", int(user_id)) for user_id in ids[0].split(","))
+
+    def sync(self, db: Session) -> int:
+        """Evict what other workers changed since the last sync; returns change rows applied."""
+        with self._sync_lock:
+            started = datetime.now(timezone.utc)
+            # Rows are read again until they have settled (see NotesService.get_changes),
+            # so a change committed late by another worker isn't missed; the extra
+            # second covers SQLite's whole-second timestamps
+            since = self.synced_at - timedelta(seconds=settings.CHANGES_SETTLE_SECONDS + 1)
+            rows = db.query(NoteChange.id, NoteChange.note_id, NoteChange.user_id).filter(
+                NoteChange.created_at >= since
+            ).all()
+            db.rollback()
+            fresh = [row for row in rows if row.id not in self._seen]
+            note_ids = {row.note_id for row in fresh if row.note_id is not None}
+            # Joined or left a group: that user's access to any note may differ
+            user_ids = {row.user_id for row in fresh if row.note_id is None and row.user_id is not None}
+            if note_ids:
+                self._evict_notes(note_ids)
+            if user_ids:
+                self._invalidations.bump(("user", user_id) for user_id in user_ids)
+            self._seen = {row.id for row in rows}
+            self.synced_at = started
+            return len(fresh)
+
+note_cache = NoteCache()
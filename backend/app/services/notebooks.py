@@ -0,0 +1,216 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import func, literal
+from typing import List, Optional
+from app.core.config import settings
+from app.models.note import Note
+from app.models.notebook import Notebook
+from app.models.user import User
+from app.schemas.notebook import NotebookCreate, NotebookUpdate
+from app.services.changes import ChangeLog
+from app.services.note_cache import note_cache
+from fastapi import HTTPException, status
+
+def _subtree(path: str):
+    """Filter for ``path`` and everything below it, as an index range."""
+    # Every path under /3/17/ sorts before /3/170: "/" is the byte just below "0"
+    return Notebook.path >= path, Notebook.path < path[:-1] + "0"
+
+def _ancestor_ids(path: str) -> List[int]:
+    """Ids on ``path`` from the root down, the notebook itself included."""
+    return [int(part) for part in path.strip("/").split("/")]
+
+def _depth(path: str) -> int:
+    return path.count("/") - 1
+
+class NotebooksService:
+    @staticmethod
+    def _serialize(notebook: Notebook) -> dict:
+        return {
+            "id": notebook.id,
+            "name": notebook.name,
+            "parent_id": notebook.parent_id,
+            "depth": _depth(notebook.path),
+            "note_count": notebook.note_count,
+            "total_count": notebook.total_count,
+            "created_at": notebook.created_at,
+        }
+
+    @staticmethod
+    def get_notebook(db: Session, notebook_id: int, user: User, for_update: bool = False) -> Notebook:
+        query = db.query(Notebook).filter(Notebook.id == notebook_id, Notebook.owner_id == user.id)
+        if for_update:
+            query = query.with_for_update()
+        notebook = query.first()
+        if not notebook:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Notebook not found"
+            )
+        return notebook
+
+    @staticmethod
+    def _adjust_totals(db: Session, notebook_ids: List[int], delta: int) -> None:
+        if notebook_ids and delta:
+            db.query(Notebook).filter(Notebook.id.in_(notebook_ids)).update(
+                {Notebook.total_count: Notebook.total_count + delta}, synchronize_session=False
+            )
+
+    @staticmethod
+    def create_notebook(db: Session, notebook_create: NotebookCreate, user: User) -> dict:
+        parent_path = "/"
+        if notebook_create.parent_id is not None:
+            parent = NotebooksService.get_notebook(db, notebook_create.parent_id, user)
+            if _depth(parent.path) >= settings.NOTEBOOK_MAX_DEPTH:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Notebooks are nested too deeply"
+                )
+            parent_path = parent.path
+
+        notebook = Notebook(
+            owner_id=user.id,
+            parent_id=notebook_create.parent_id,
+            name=notebook_create.name,
+            path=parent_path,
+            note_count=0,
+            total_count=0
+        )
+        db.add(notebook)
+        db.flush()
+        # The path ends with the notebook's own id, known only after the insert
+        notebook.path = f"{parent_path}{notebook.id}/"
+        db.commit()
+        db.refresh(notebook)
+        return NotebooksService._serialize(notebook)
+
+    @staticmethod
+    def get_children(db: Session, user: User, parent_id: Optional[int] = None) -> List[dict]:
+        """Notebooks directly under ``parent_id``, or the top-level ones."""
+        if parent_id is not None:
+            NotebooksService.get_notebook(db, parent_id, user)
+        notebooks = db.query(Notebook).filter(
+            Notebook.owner_id == user.id,
+            Notebook.parent_id == parent_id if parent_id is not None else Notebook.parent_id.is_(None)
+        ).order_by(Notebook.name).all()
+        return [NotebooksService._serialize(notebook) for notebook in notebooks]
+
+    @staticmethod
+    def get(db: Session, notebook_id: int, user: User) -> dict:
+        return NotebooksService._serialize(NotebooksService.get_notebook(db, notebook_id, user))
+
+    @staticmethod
+    def rename_notebook(db: Session, notebook_id: int, notebook_update: NotebookUpdate, user: User) -> dict:
+        notebook = NotebooksService.get_notebook(db, notebook_id, user)
+        notebook.name = notebook_update.name
+        db.commit()
+        db.refresh(notebook)
+        return NotebooksService._serialize(notebook)
+
+    @staticmethod
+    def move_notebook(db: Session, notebook_id: int, parent_id: Optional[int], user: User) -> dict:
+        """Re-parent a notebook with its whole subtree in one bulk path update."""
+        # Lock both ends so concurrent moves can't build a cycle between them
+        notebook = NotebooksService.get_notebook(db, notebook_id, user, for_update=True)
+        parent = NotebooksService.get_notebook(db, parent_id, user, for_update=True) if parent_id is not None else None
+        if notebook.parent_id == parent_id:
+            return NotebooksService._serialize(notebook)
+
+        old_path = notebook.path
+        parent_path = parent.path if parent else "/"
+        if parent_path.startswith(old_path):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Cannot move a notebook into itself"
+            )
+        subtree_depth = db.query(
+            func.max(func.length(Notebook.path) - func.length(func.replace(Notebook.path, "/", "")))
+        ).filter(Notebook.owner_id == user.id, *_subtree(old_path)).scalar() - _depth(old_path) - 1
+        if _depth(parent_path) + 1 + subtree_depth > settings.NOTEBOOK_MAX_DEPTH:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Notebooks are nested too deeply"
+            )
+
+        new_path = f"{parent_path}{notebook.id}/"
+        NotebooksService._adjust_totals(db, _ancestor_ids(old_path)[:-1], -notebook.total_count)
+        NotebooksService._adjust_totals(db, _ancestor_ids(parent_path) if parent else [], notebook.total_count)
+        db.query(Notebook).filter(Notebook.owner_id == user.id, *_subtree(old_path)).update(
+            {Notebook.path: literal(new_path) + func.substr(Notebook.path, len(old_path) + 1)},
+            synchronize_session=False
+        )
+        db.query(Notebook).filter(Notebook.id == notebook.id).update(
+            {Notebook.parent_id: parent_id}, synchronize_session=False
+        )
+        db.commit()
+        db.refresh(notebook)
+        return NotebooksService._serialize(notebook)
+
+    @staticmethod
+    def delete_notebook(db: Session, notebook_id: int, user: User) -> bool:
+        """Delete a notebook and everything below it; their notes become unfiled."""
+        notebook = NotebooksService.get_notebook(db, notebook_id, user, for_update=True)
+        subtree_ids = db.query(Notebook.id).filter(Notebook.owner_id == user.id, *_subtree(notebook.path))
+        unfiled = db.query(Note.id).filter(Note.owner_id == user.id, Note.notebook_id.in_(subtree_ids))
+        unfiled_ids = [note_id for (note_id,) in unfiled]
+        ChangeLog.notes_changed(db, unfiled)
+        db.query(Note).filter(Note.owner_id == user.id, Note.notebook_id.in_(subtree_ids)).update(
+            {Note.notebook_id: None}, synchronize_session=False
+        )
+        NotebooksService._adjust_totals(db, _ancestor_ids(notebook.path)[:-1], -notebook.total_count)
+        db.query(Notebook).filter(Notebook.owner_id == user.id, *_subtree(notebook.path)).delete(
+            synchronize_session=False
+        )
+        db.commit()
+        note_cache.invalidate_notes(db, unfiled_ids)
+        return True
+
+    @staticmethod
+    def count_note(db: Session, notebook_id: Optional[int], delta: int) -> None:
+        """Count a note filed into (+1) or out of (-1) ``notebook_id`` and its ancestors."""
+        if notebook_id is None:
+            return
+        path = db.query(Notebook.path).filter(Notebook.id == notebook_id).scalar()
+        if path is None:
+            return
+        db.query(Notebook).filter(Notebook.id == notebook_id).update(
+            {Notebook.note_count: Notebook.note_count + delta}, synchronize_session=False
+        )
+        NotebooksService._adjust_totals(db, _ancestor_ids(path), delta)
+
+    @staticmethod
+    def get_notes(
+        db: Session,
+        notebook_id: int,
+        user: User,
+        recursive: bool = True,
+        cursor: Optional[int] = None,
+        limit: Optional[int] = None
+    ) -> dict:
+        """Notes filed in a notebook, or anywhere under it when ``recursive``, by id."""
+        notebook = NotebooksService.get_notebook(db, notebook_id, user)
+        limit = min(limit or settings.NOTEBOOK_NOTES_PAGE_SIZE, settings.NOTEBOOK_NOTES_MAX_PAGE_SIZE)
+
+        query = db.query(Note.id, Note.title, Note.notebook_id, Note.visibility, Note.updated_at).filter(
+            Note.owner_id == user.id
+        )
+        if recursive:
+            subtree_ids = db.query(Notebook.id).filter(Notebook.owner_id == user.id, *_subtree(notebook.path))
+            query = query.filter(Note.notebook_id.in_(subtree_ids))
+        else:
+            query = query.filter(Note.notebook_id == notebook.id)
+        if cursor is not None:
+            query = query.filter(Note.id > cursor)
+        rows = query.order_by(Note.id).limit(limit).all()
+
+        items = [
+            {
+                "id": row.id,
+                "title": row.title,
+                "notebook_id": row.notebook_id,
+                "visibility": row.visibility.value,
+                "updated_at": row.updated_at,
+            }
+            for row in rows
+        ]
+        next_cursor = items[-1]["id"] if len(items) == limit else None
+        return {"items": items, "next_cursor": next_cursor}
@@ -1,35 +1,60 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import or_, and_, func
-from typing import List, Optional
-from app.models.note import Note, Tag, VisibilityEnum
+from sqlalchemy.orm import Session, undefer_group
+from sqlalchemy import or_, and_, exists, func, select, union
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+from app.core.config import settings
+from app.models.note import Note, Tag, VisibilityEnum, NoteAccess, NoteChange, NoteLink, AccessRoleEnum, note_shares
 from app.models.user import User
+from app.models.group import GroupMember, NoteGroupShare
 from app.schemas.note import NoteCreate, NoteUpdate, NoteShare
+from app.schemas.group import NoteGroupShare as NoteGroupShareCreate
+from app.services.groups import GroupsService
+from app.services.tags import TagsService
+from app.services.changes import ChangeLog
+from app.services.explore import ExploreService
+from app.services.links import LinksService
+from app.services.notebooks import NotebooksService
+from app.services.note_cache import CachedNote, note_cache
+from app.services.notifications import Outbox
+from app.services.public_notes import PublicNoteCache
+from app.services.render import RenderService
+from app.services.similarity import SimilarityService
+from app.services.view_stats import ViewStatsService
 from fastapi import HTTPException, status
 
 class NotesService:
     @staticmethod
     def create_note(db: Session, note_create: NoteCreate, user: User) -> Note:
-        tags = []
-        if note_create.tags:
-            for tag_name in note_create.tags:
-                tag = db.query(Tag).filter(Tag.name == tag_name).first()
-                if not tag:
-                    tag = Tag(name=tag_name)
-                    db.add(tag)
-                    db.flush()
-                tags.append(tag)
+        if note_create.notebook_id is not None:
+            NotebooksService.get_notebook(db, note_create.notebook_id, user)
+        tags = TagsService.get_or_create_tags(db, note_create.tags or [])
         
         db_note = Note(
             title=note_create.title,
             content=note_create.content,
             visibility=note_create.visibility,
-            owner_id=user.id
+            owner_id=user.id,
+            notebook_id=note_create.notebook_id
         )
         
         db_note.tags = tags
         db.add(db_note)
+        db.flush()
+        db.add(NoteAccess(user_id=user.id, note_id=db_note.id, note_owner_id=user.id, role=AccessRoleEnum.OWNER))
+        TagsService.record_usage(db, user.id, added=tags)
+        NotebooksService.count_note(db, db_note.notebook_id, 1)
+        ChangeLog.note_changed(db, db_note.id)
+        LinksService.update_links(db, db_note)
+        signature = SimilarityService.store_signature(db, db_note)
         db.commit()
         db.refresh(db_note)
+        
+        note_cache.invalidate_notes(db, [db_note.id])
+        SimilarityService.update_index(user.id, db_note.id, signature)
+        if db_note.content:
+            RenderService.schedule(db_note.id, db_note.content)
+        if db_note.visibility == VisibilityEnum.PUBLIC:
+            ExploreService.invalidate()
         return db_note
 
     @staticmethod
@@ -40,13 +65,16 @@ class NotesService:
         visibility: Optional[VisibilityEnum] = None,
         tags: Optional[List[str]] = None
     ) -> List[Note]:
-        query = db.query(Note).filter(
-            or_(
-                Note.owner_id == user.id,
-                Note.visibility == VisibilityEnum.PUBLIC,
-                Note.shared_with.any(id=user.id)
-            )
+        # Own notes filter on the partition key, so a partitioned notes table reads
+        # one partition; everyone else's are joined on (id, owner_id) and disjoint
+        accessible = NotesService._accessible_notes(user.id).subquery()
+        foreign = select(accessible).where(accessible.c.owner_id != user.id).subquery()
+        owned = db.query(Note).filter(Note.owner_id == user.id)
+        shared = db.query(Note).join(
+            foreign,
+            and_(foreign.c.note_id == Note.id, foreign.c.owner_id == Note.owner_id)
         )
+        query = owned.union_all(shared)
         
         if search:
             query = query.filter(
@@ -63,10 +91,40 @@ class NotesService:
             for tag_name in tags:
                 query = query.filter(Note.tags.any(Tag.name == tag_name))
         
-        return query.order_by(Note.updated_at.desc()).all()
+        return query.options(undefer_group("content")).order_by(Note.updated_at.desc()).all()
 
     @staticmethod
     def get_note(db: Session, note_id: int, user: User) -> Note:
+        note, readable = NotesService._find_note(db, note_id, user)
+        if not readable:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Not enough permissions"
+            )
+        return note
+
+    @staticmethod
+    def _find_note(db: Session, note_id: int, user: User) -> Tuple[Note, bool]:
+        """The note and whether ``user`` may read it; 404 if it doesn't exist."""
+        # Access rows and group shares name the owner, and so the partition,
+        # letting the planner read a single notes partition
+        owner_id = db.query(NoteAccess.note_owner_id).filter(
+            NoteAccess.user_id == user.id,
+            NoteAccess.note_id == note_id
+        ).scalar()
+        if owner_id is None:
+            # Group shares carry the owner too
+            owner_id = db.query(NoteGroupShare.note_owner_id).join(
+                GroupMember, GroupMember.group_id == NoteGroupShare.group_id
+            ).filter(
+                NoteGroupShare.note_id == note_id,
+                GroupMember.user_id == user.id
+            ).limit(1).scalar()
+        if owner_id is not None:
+            note = db.query(Note).filter(Note.id == note_id, Note.owner_id == owner_id).first()
+            if note:
+                return note, True
+        
         note = db.query(Note).filter(Note.id == note_id).first()
         if not note:
             raise HTTPException(
@@ -74,15 +132,201 @@ class NotesService:
                 detail="Note not found"
             )
         
-        if (note.owner_id != user.id and 
-            note.visibility != VisibilityEnum.PUBLIC and
-            user not in note.shared_with):
+        readable = (note.owner_id == user.id or
+                    note.visibility == VisibilityEnum.PUBLIC or
+                    NotesService.get_access_role(db, note_id, user.id) is not None)
+        return note, readable
+
+    @staticmethod
+    def get_note_cached(db: Session, note_id: int, user: User) -> CachedNote:
+        """``get_note`` serialized, served from the note cache when it can be."""
+        if not settings.NOTE_CACHE_ENABLED:
+            note = NotesService.get_note(db, note_id, user)
+            return CachedNote.from_note(note, NotesService.get_shared_counts(db, [note.id]).get(note.id, 0), 0)
+
+        stamp = note_cache.stamp()
+        entry = note_cache.get(note_id)
+        if entry is None:
+            version = note_cache.version(db, note_id)
+            note, readable = NotesService._find_note(db, note_id, user)
+            shared_count = NotesService.get_shared_counts(db, [note.id]).get(note.id, 0)
+            entry = note_cache.put(note, shared_count, stamp, version)
+            note_cache.put_access(note_id, user.id, readable, stamp)
+        else:
+            readable = note_cache.get_access(note_id, user.id)
+            if readable is None:
+                readable = (entry.owner_id == user.id or
+                            entry.public or
+                            NotesService.get_access_role(db, note_id, user.id) is not None)
+                note_cache.put_access(note_id, user.id, readable, stamp)
+        if not readable:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Not enough permissions"
             )
-        
-        return note
+        return entry
+
+    @staticmethod
+    def _accessible_notes(user_id: int):
+        """(note_id, owner_id) of notes owned by, shared with, or shared with a group of the user."""
+        direct = select(NoteAccess.note_id, NoteAccess.note_owner_id.label("owner_id")).where(
+            NoteAccess.user_id == user_id
+        )
+        via_groups = (
+            select(NoteGroupShare.note_id, NoteGroupShare.note_owner_id.label("owner_id"))
+            .join(GroupMember, GroupMember.group_id == NoteGroupShare.group_id)
+            .where(GroupMember.user_id == user_id)
+        )
+        return union(direct, via_groups)
+
+    @staticmethod
+    def get_changes(db: Session, user: User, since: Optional[int] = None, limit: Optional[int] = None) -> dict:
+        """Notes changed and note ids removed for ``user`` after cursor ``since``."""
+        settled = datetime.now(timezone.utc) - timedelta(seconds=settings.CHANGES_SETTLE_SECONDS)
+        if since is None:
+            cursor = ChangeLog.settled_bound(db, settled) - 1
+            notes = NotesService.get_user_notes(db, user)
+            return {"notes": notes, "deleted": [], "cursor": cursor, "has_more": False}
+
+        if since < ChangeLog.horizon(db):
+            raise HTTPException(
+                status_code=status.HTTP_410_GONE,
+                detail="Sync cursor expired, full resync required"
+            )
+
+        limit = min(limit or settings.CHANGES_PAGE_SIZE, settings.CHANGES_MAX_PAGE_SIZE)
+        bound = ChangeLog.settled_bound(db, settled)
+        accessible = NotesService._accessible_notes(user.id).subquery()
+        my_groups = select(GroupMember.group_id).where(GroupMember.user_id == user.id)
+
+        # A primary-key range scan from the cursor: empty when nothing changed
+        events = db.query(NoteChange.id, NoteChange.note_id, NoteChange.group_id).filter(
+            NoteChange.id > since,
+            NoteChange.id < bound,
+            or_(
+                and_(
+                    NoteChange.user_id.is_(None),
+                    NoteChange.group_id.is_(None),
+                    NoteChange.note_id.in_(select(accessible.c.note_id))
+                ),
+                NoteChange.user_id == user.id,
+                and_(NoteChange.user_id.is_(None), NoteChange.group_id.in_(my_groups))
+            )
+        ).order_by(NoteChange.id).limit(limit).all()
+
+        candidates = {event.note_id for event in events if event.note_id is not None}
+        changed_groups = {event.group_id for event in events if event.note_id is None}
+        if changed_groups:
+            # Joined or left a group: every note shared with it may have appeared or gone
+            candidates.update(db.scalars(
+                select(NoteGroupShare.note_id).where(NoteGroupShare.group_id.in_(changed_groups))
+            ))
+
+        notes = []
+        if candidates:
+            notes = db.query(Note).options(undefer_group("content")).join(
+                accessible,
+                and_(accessible.c.note_id == Note.id, accessible.c.owner_id == Note.owner_id)
+            ).filter(
+                Note.id.in_(candidates)
+            ).all()
+        visible = {note.id for note in notes}
+
+        return {
+            "notes": notes,
+            "deleted": sorted(candidates - visible),
+            "cursor": events[-1].id if events else since,
+            "has_more": len(events) == limit,
+        }
+
+    @staticmethod
+    def get_access_role(db: Session, note_id: int, user_id: int) -> Optional[AccessRoleEnum]:
+        role = db.query(NoteAccess.role).filter(
+            NoteAccess.user_id == user_id,
+            NoteAccess.note_id == note_id
+        ).scalar()
+        if role is not None:
+            return role
+        shared_via_group = db.query(
+            db.query(NoteGroupShare)
+            .join(GroupMember, GroupMember.group_id == NoteGroupShare.group_id)
+            .filter(NoteGroupShare.note_id == note_id, GroupMember.user_id == user_id)
+            .exists()
+        ).scalar()
+        return AccessRoleEnum.SHARED if shared_via_group else None
+
+    @staticmethod
+    def get_shared_counts(db: Session, note_ids: List[int]) -> Dict[int, int]:
+        """Number of users each note is shared with directly, in one grouped query."""
+        if not note_ids:
+            return {}
+        rows = db.query(NoteAccess.note_id, func.count()).filter(
+            NoteAccess.note_id.in_(note_ids),
+            NoteAccess.role == AccessRoleEnum.SHARED
+        ).group_by(NoteAccess.note_id).all()
+        return dict(rows)
+
+    @staticmethod
+    def get_collaborators(
+        db: Session,
+        note_id: int,
+        user: User,
+        cursor: Optional[int] = None,
+        limit: Optional[int] = None
+    ) -> dict:
+        NotesService.get_note(db, note_id, user)
+        limit = min(limit or settings.COLLABORATORS_PAGE_SIZE, settings.COLLABORATORS_MAX_PAGE_SIZE)
+
+        # Only the columns the page needs: full User rows carry profile pictures
+        query = (
+            db.query(User.id, User.email, User.name)
+            .join(NoteAccess, NoteAccess.user_id == User.id)
+            .filter(NoteAccess.note_id == note_id, NoteAccess.role == AccessRoleEnum.SHARED)
+        )
+        if cursor is not None:
+            query = query.filter(User.id > cursor)
+        rows = query.order_by(User.id).limit(limit).all()
+
+        items = [{"id": row.id, "email": row.email, "name": row.name} for row in rows]
+        next_cursor = items[-1]["id"] if len(items) == limit else None
+        return {"items": items, "next_cursor": next_cursor}
+
+    @staticmethod
+    def get_backlinks(
+        db: Session,
+        note_id: int,
+        user: User,
+        cursor: Optional[int] = None,
+        limit: Optional[int] = None
+    ) -> dict:
+        """Notes linking to ``note_id`` that ``user`` may read, by source id."""
+        NotesService.get_note(db, note_id, user)
+        limit = min(limit or settings.BACKLINKS_PAGE_SIZE, settings.BACKLINKS_MAX_PAGE_SIZE)
+
+        readable = or_(
+            Note.visibility == VisibilityEnum.PUBLIC,
+            exists().where(NoteAccess.user_id == user.id, NoteAccess.note_id == Note.id),
+            exists().where(
+                NoteGroupShare.note_id == Note.id,
+                GroupMember.group_id == NoteGroupShare.group_id,
+                GroupMember.user_id == user.id
+            )
+        )
+        query = (
+            db.query(Note.id, Note.title, Note.owner_id, Note.updated_at)
+            .join(NoteLink, NoteLink.source_id == Note.id)
+            .filter(NoteLink.target_id == note_id, readable)
+        )
+        if cursor is not None:
+            query = query.filter(NoteLink.source_id > cursor)
+        rows = query.order_by(NoteLink.source_id).limit(limit).all()
+
+        items = [
+            {"id": row.id, "title": row.title, "owner_id": row.owner_id, "updated_at": row.updated_at}
+            for row in rows
+        ]
+        next_cursor = items[-1]["id"] if len(items) == limit else None
+        return {"items": items, "next_cursor": next_cursor}
 
     @staticmethod
     def update_note(db: Session, note_id: int, note_update: NoteUpdate, user: User) -> Note:
@@ -94,6 +338,8 @@ class NotesService:
                 detail="Only owner can update note"
             )
         
+        was_public = note.visibility == VisibilityEnum.PUBLIC
+        
         if note_update.title is not None:
             note.title = note_update.title
         if note_update.content is not None:
@@ -102,20 +348,57 @@ class NotesService:
             note.visibility = note_update.visibility
         
         if note_update.tags is not None:
-            tags = []
-            for tag_name in note_update.tags:
-                tag = db.query(Tag).filter(Tag.name == tag_name).first()
-                if not tag:
-                    tag = Tag(name=tag_name)
-                    db.add(tag)
-                    db.flush()
-                tags.append(tag)
+            tags = TagsService.get_or_create_tags(db, note_update.tags)
+            old_ids = {tag.id for tag in note.tags}
+            new_ids = {tag.id for tag in tags}
+            TagsService.record_usage(
+                db, note.owner_id,
+                added=[tag for tag in tags if tag.id not in old_ids],
+                removed=[tag for tag in note.tags if tag.id not in new_ids]
+            )
             note.tags = tags
         
         note.updated_at = func.now()
+        ChangeLog.note_changed(db, note.id)
+        Outbox.note_updated(db, note, user.id)
+        if note_update.content is not None:
+            LinksService.update_links(db, note)
+            signature = SimilarityService.store_signature(db, note)
+        
+        db.commit()
+        db.refresh(note)
+        
+        note_cache.invalidate_notes(db, [note.id])
+        PublicNoteCache.invalidate(note.public_token)
+        if note_update.content is not None:
+            SimilarityService.update_index(note.owner_id, note.id, signature)
+            RenderService.schedule(note.id, note.content)
+        if was_public or note.visibility == VisibilityEnum.PUBLIC:
+            ExploreService.invalidate()
+        return note
+
+    @staticmethod
+    def file_note(db: Session, note_id: int, notebook_id: Optional[int], user: User) -> Note:
+        """Move a note into one of the owner's notebooks, or out of any with None."""
+        note = NotesService.get_note(db, note_id, user)
+        
+        if note.owner_id != user.id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Only owner can file note"
+            )
+        if notebook_id is not None:
+            NotebooksService.get_notebook(db, notebook_id, user)
+        if note.notebook_id == notebook_id:
+            return note
         
+        NotebooksService.count_note(db, note.notebook_id, -1)
+        NotebooksService.count_note(db, notebook_id, 1)
+        note.notebook_id = notebook_id
+        ChangeLog.note_changed(db, note.id)
         db.commit()
         db.refresh(note)
+        note_cache.invalidate_notes(db, [note.id])
         return note
 
     @staticmethod
@@ -128,8 +411,25 @@ class NotesService:
                 detail="Only owner can delete note"
             )
         
+        ChangeLog.notes_removed(db, [note.id])
+        db.query(NoteAccess).filter(NoteAccess.note_id == note.id).delete(synchronize_session=False)
+        db.query(NoteGroupShare).filter(NoteGroupShare.note_id == note.id).delete(synchronize_session=False)
+        db.execute(note_shares.delete().where(note_shares.c.note_id == note.id))
+        SimilarityService.delete_signatures(db, [note.id])
+        LinksService.delete_links(db, [note.id])
+        ViewStatsService.delete_stats(db, [note.id])
+        TagsService.record_usage(db, note.owner_id, removed=note.tags)
+        NotebooksService.count_note(db, note.notebook_id, -1)
+        was_public = note.visibility == VisibilityEnum.PUBLIC
+        public_token = note.public_token
         db.delete(note)
         db.commit()
+        
+        note_cache.invalidate_notes(db, [note_id])
+        SimilarityService.update_index(user.id, note_id, None)
+        PublicNoteCache.invalidate(public_token)
+        if was_public:
+            ExploreService.invalidate()
         return True
 
     @staticmethod
@@ -155,14 +455,82 @@ class NotesService:
                 detail="Cannot share with yourself"
             )
         
-        if share_user not in note.shared_with:
-            note.shared_with.append(share_user)
+        # Only a direct share counts: access through a group ends with the group share
+        already_shared = db.query(NoteAccess).filter(
+            NoteAccess.user_id == share_user.id,
+            NoteAccess.note_id == note.id
+        ).first()
+        if not already_shared:
+            was_public = note.visibility == VisibilityEnum.PUBLIC
+            db.execute(note_shares.insert().values(note_id=note.id, user_id=share_user.id))
+            note.visibility = VisibilityEnum.SHARED
+            db.add(NoteAccess(
+                user_id=share_user.id, note_id=note.id, note_owner_id=note.owner_id, role=AccessRoleEnum.SHARED
+            ))
+            ChangeLog.note_changed(db, note.id)
+            Outbox.note_shared(db, note, user.id, [share_user.id])
+            db.commit()
+            db.refresh(note)
+            note_cache.invalidate_notes(db, [note.id])
+            PublicNoteCache.invalidate(note.public_token)
+            if was_public:
+                ExploreService.invalidate()
+        
+        return note
+
+    @staticmethod
+    def share_note_with_group(db: Session, note_id: int, share_data: NoteGroupShareCreate, user: User) -> Note:
+        note = NotesService.get_note(db, note_id, user)
+        
+        if note.owner_id != user.id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Only owner can share note"
+            )
+        
+        # Sharing requires membership, so group ids can't be probed
+        group = GroupsService.get_group(db, share_data.group_id, user)
+        
+        already_shared = db.query(NoteGroupShare).filter(
+            NoteGroupShare.note_id == note.id,
+            NoteGroupShare.group_id == group.id
+        ).first()
+        if not already_shared:
+            was_public = note.visibility == VisibilityEnum.PUBLIC
             note.visibility = VisibilityEnum.SHARED
+            db.add(NoteGroupShare(note_id=note.id, group_id=group.id, note_owner_id=note.owner_id))
+            ChangeLog.note_changed(db, note.id)
+            Outbox.note_shared(db, note, user.id, select(GroupMember.user_id).where(GroupMember.group_id == group.id))
             db.commit()
             db.refresh(note)
+            note_cache.invalidate_notes(db, [note.id])
+            PublicNoteCache.invalidate(note.public_token)
+            if was_public:
+                ExploreService.invalidate()
         
         return note
 
+    @staticmethod
+    def unshare_note_with_group(db: Session, note_id: int, group_id: int, user: User) -> bool:
+        note = NotesService.get_note(db, note_id, user)
+        
+        if note.owner_id != user.id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Only owner can unshare note"
+            )
+        
+        removed = db.query(NoteGroupShare).filter(
+            NoteGroupShare.note_id == note.id,
+            NoteGroupShare.group_id == group_id
+        ).delete(synchronize_session=False)
+        if removed:
+            ChangeLog.group_access_removed(db, group_id, [note.id])
+        db.commit()
+        if removed:
+            note_cache.invalidate_notes(db, [note.id])
+        return True
+
     @staticmethod
     def generate_public_link(db: Session, note_id: int, user: User) -> dict:
         note = NotesService.get_note(db, note_id, user)
@@ -174,8 +542,10 @@ class NotesService:
             )
         
         public_token = note.generate_public_token()
+        ChangeLog.note_changed(db, note.id)
         db.commit()
         db.refresh(note)
+        note_cache.invalidate_notes(db, [note.id])
         
         public_url = f"/public/notes/{public_token}"
         
@@ -206,6 +576,11 @@ class NotesService:
                 detail="Only owner can revoke public links"
             )
         
+        public_token = note.public_token
         note.public_token = None
+        ChangeLog.note_changed(db, note.id)
         db.commit()
+        
+        note_cache.invalidate_notes(db, [note.id])
+        PublicNoteCache.invalidate(public_token)
         return True 
\ No newline at end of file
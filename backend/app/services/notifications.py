@@ -0,0 +1,332 @@
+import importlib
+import json
+import logging
+import smtplib
+from collections import OrderedDict, deque
+from datetime import datetime, timedelta, timezone
+from email.message import EmailMessage
+from typing import Callable, Dict, List, Optional, Set, Tuple
+from sqlalchemy import exists, insert, literal, or_, select, union, update
+from sqlalchemy.orm import Session, load_only
+from app.core import metrics
+from app.core.config import settings
+from app.models.group import GroupMember, NoteGroupShare
+from app.models.note import Note, NoteAccess, AccessRoleEnum
+from app.models.notification import OutboxEvent
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+SHARED = "shared"
+UPDATED = "updated"
+
+EMAIL = "email"
+PUSH = "push"
+
+EVENTS = metrics.counter("notification_events_total", "Outbox events processed, by outcome", ("outcome",))
+DIGESTS = metrics.counter("notification_digests_total", "Notification digests delivered, by channel", ("channel",))
+DELAY = metrics.histogram(
+    "notification_delay_seconds", "Time from outbox write to delivery",
+    buckets=(1, 5, 15, 30, 60, 120, 300, 600, 1800, 3600)
+)
+BUSY = metrics.counter("notification_sink_busy_total", "Dispatch cycles cut short by a sink asking to back off", ("channel",))
+
+def _wants_notifications():
+    return or_(User.email_notifications.is_(True), User.browser_notifications.is_(True))
+
+class Outbox:
+    """Writes notification_outbox rows inside the caller's transaction."""
+
+    @staticmethod
+    def note_shared(db: Session, note: Note, actor_id: int, recipient_ids) -> None:
+        """``recipient_ids`` may be a list or a subquery."""
+        db.execute(insert(OutboxEvent).from_select(
+            ["recipient_id", "kind", "note_id", "actor_id"],
+            select(User.id, literal(SHARED), literal(note.id), literal(actor_id)).where(
+                User.id.in_(recipient_ids), User.id != actor_id, _wants_notifications()
+            )
+        ))
+
+    @staticmethod
+    def note_updated(db: Session, note: Note, actor_id: int) -> None:
+        readers = union(
+            select(NoteAccess.user_id).where(NoteAccess.note_id == note.id, NoteAccess.role == AccessRoleEnum.SHARED),
+            select(GroupMember.user_id).join(
+                NoteGroupShare, NoteGroupShare.group_id == GroupMember.group_id
+            ).where(NoteGroupShare.note_id == note.id)
+        )
+        pending = exists().where(
+            OutboxEvent.recipient_id == User.id,
+            OutboxEvent.note_id == note.id,
+            OutboxEvent.kind == UPDATED
+        )
+        db.execute(insert(OutboxEvent).from_select(
+            ["recipient_id", "kind", "note_id", "actor_id"],
+            select(User.id, literal(UPDATED), literal(note.id), literal(actor_id)).where(
+                User.id.in_(readers), User.id != actor_id, _wants_notifications(), ~pending
+            )
+        ))
+
+    @staticmethod
+    def delete_for(db: Session, user_id: int) -> None:
+        db.query(OutboxEvent).filter(OutboxEvent.recipient_id == user_id).delete(synchronize_session=False)
+
+
+class Digest:
+    """Everything one recipient is told on one channel in one delivery."""
+
+    __slots__ = ("recipient_id", "email", "name", "channel", "items")
+
+    def __init__(self, recipient_id: int, email: str, name: Optional[str], channel: str, items: List[dict]):
+        self.recipient_id = recipient_id
+        self.email = email
+        self.name = name
+        self.channel = channel
+        self.items = items
+
+    @property
+    def subject(self) -> str:
+        if len(self.items) == 1:
+            return f"Activity on “{self.items[0]['title']}”"
+        return f"Activity on {len(self.items)} notes"
+
+    def lines(self) -> List[str]:
+        lines = []
+        for item in self.items:
+            actors = ", ".join(item["actors"]) or "Someone"
+            if item["shared"]:
+                lines.append(f"{actors} shared “{item['title']}” with you")
+            if item["updated"]:
+                lines.append(f"“{item['title']}” was updated by {actors}")
+        return lines
+
+    def as_dict(self) -> dict:
+        return {"recipient_id": self.recipient_id, "subject": self.subject, "items": self.items}
+
+
+class SinkBusy(Exception):
+    """Raised by a sink that can't take more right now."""
+
+
+class LogSink:
+    """Logs digests instead of delivering them (the default)."""
+
+    def send(self, digest: Digest) -> None:
+        logger.info("Notify %s via %s: %s", digest.email, digest.channel, json.dumps(digest.as_dict()))
+
+    def close(self) -> None:
+        pass
+
+
+class MemorySink:
+    """Keeps the latest digests in memory, for local runs and benchmarks."""
+
+    def __init__(self, max_size: int = 10000):
+        self.sent = deque(maxlen=max_size)
+
+    def send(self, digest: Digest) -> None:
+        self.sent.append(digest)
+
+    def close(self) -> None:
+        pass
+
+
+class SmtpSink:
+    """Sends each digest as an email over one SMTP connection per dispatch cycle."""
+
+    def __init__(self):
+        self._smtp: Optional[smtplib.SMTP] = None
+
+    def send(self, digest: Digest) -> None:
+        message = EmailMessage()
+        message["From"] = settings.SMTP_FROM
+        message["To"] = digest.email
+        message["Subject"] = digest.subject
+        origin = settings.BACKEND_CORS_ORIGINS[0].rstrip("/")
+        message.set_content("\n".join(
+            [f"Hi {digest.name or digest.email},", ""] + digest.lines() +
+            ["", *(f"{origin}/dashboard/notes/{item['note_id']}" for item in digest.items)]
+        ))
+        try:
+            if self._smtp is None:
+                self._smtp = smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT, timeout=settings.SMTP_TIMEOUT_SECONDS)
+            self._smtp.send_message(message)
+        except smtplib.SMTPResponseException as e:
+            # 4xx replies are the server asking us to slow down or come back later
+            if 400 <= e.smtp_code < 500:
+                self.close()
+                raise SinkBusy(str(e)) from e
+            raise
+
+    def close(self) -> None:
+        if self._smtp is not None:
+            try:
+                self._smtp.quit()
+            except smtplib.SMTPException:
+                pass
+            self._smtp = None
+
+
+# Sink name -> factory. NOTIFICATION_*_SINK may also name one as "module:attribute".
+SINKS: Dict[str, Callable[[], object]] = {
+    "log": LogSink,
+    "memory": MemorySink,
+    "smtp": SmtpSink,
+}
+
+_sinks: Dict[str, object] = {}
+
+def get_sink(channel: str):
+    sink = _sinks.get(channel)
+    if sink is None:
+        name = settings.NOTIFICATION_EMAIL_SINK if channel == EMAIL else settings.NOTIFICATION_PUSH_SINK
+        factory = SINKS.get(name)
+        if factory is None:
+            module, _, attribute = name.partition(":")
+            factory = getattr(importlib.import_module(module), attribute)
+        sink = _sinks[channel] = factory()
+    return sink
+
+def _aware(value: datetime) -> datetime:
+    # SQLite hands back naive UTC timestamps
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+class NotificationDispatcher:
+    @staticmethod
+    def _digest_items(
+        events: List[OutboxEvent], titles: Dict[int, str], names: Dict[int, str], readable: Set[Tuple[int, int]]
+    ) -> List[dict]:
+        items: "OrderedDict[int, dict]" = OrderedDict()
+        for event in events:
+            if event.note_id not in titles or (event.recipient_id, event.note_id) not in readable:
+                continue
+            item = items.get(event.note_id)
+            if item is None:
+                item = items[event.note_id] = {
+                    "note_id": event.note_id, "title": titles[event.note_id],
+                    "shared": False, "updated": False, "actors": []
+                }
+            item[event.kind] = True
+            actor = names.get(event.actor_id)
+            if actor and actor not in item["actors"]:
+                item["actors"].append(actor)
+        return list(items.values())
+
+    @staticmethod
+    def dispatch(db: Session, limit: Optional[int] = None) -> dict:
+        """Deliver one batch of due outbox events, folded into one digest per recipient and channel."""
+        limit = limit or settings.NOTIFICATION_BATCH_SIZE
+        now = datetime.now(timezone.utc)
+        due = [
+            OutboxEvent.created_at <= now - timedelta(seconds=settings.NOTIFICATION_DIGEST_SECONDS),
+            or_(OutboxEvent.retry_at.is_(None), OutboxEvent.retry_at <= now)
+        ]
+        batch = select(OutboxEvent.id).where(*due).order_by(OutboxEvent.id).limit(limit)
+        if db.get_bind().dialect.name == "postgresql":
+            batch = batch.with_for_update(skip_locked=True)
+        # Hide the batch from other workers until it is delivered, retried or the claim expires
+        claimed = db.execute(
+            update(OutboxEvent).where(OutboxEvent.id.in_(batch), *due).values(
+                retry_at=now + timedelta(seconds=settings.NOTIFICATION_CLAIM_SECONDS)
+            ).returning(OutboxEvent.id),
+            execution_options={"synchronize_session": False}
+        ).scalars().all()
+        db.commit()
+        result = {"events": len(claimed), "delivered": 0, "dropped": 0, "retried": 0, "digests": 0, "busy": False}
+        if not claimed:
+            return result
+        events = db.query(OutboxEvent).filter(OutboxEvent.id.in_(claimed)).order_by(OutboxEvent.id).all()
+
+        by_recipient: "OrderedDict[int, List[OutboxEvent]]" = OrderedDict()
+        for event in events:
+            by_recipient.setdefault(event.recipient_id, []).append(event)
+        user_ids = set(by_recipient) | {event.actor_id for event in events if event.actor_id is not None}
+        users = {
+            user.id: user for user in db.query(User).options(load_only(
+                User.id, User.email, User.name, User.is_active, User.email_notifications, User.browser_notifications
+            )).filter(User.id.in_(user_ids))
+        }
+        names = {user_id: user.name or user.email for user_id, user in users.items()}
+        titles = dict(db.query(Note.id, Note.title).filter(
+            Note.id.in_({event.note_id for event in events if event.note_id is not None})
+        ).all())
+        # Access as of now: a recipient unshared since the event was queued isn't told the title
+        readable = set(db.query(OutboxEvent.recipient_id, OutboxEvent.note_id).filter(
+            OutboxEvent.id.in_(claimed),
+            or_(
+                exists().where(
+                    NoteAccess.user_id == OutboxEvent.recipient_id, NoteAccess.note_id == OutboxEvent.note_id
+                ),
+                exists().where(
+                    NoteGroupShare.note_id == OutboxEvent.note_id,
+                    GroupMember.group_id == NoteGroupShare.group_id,
+                    GroupMember.user_id == OutboxEvent.recipient_id
+                )
+            )
+        ).all())
+
+        done: List[int] = []
+        retried: List[int] = []
+        try:
+            for recipient_id, recipient_events in by_recipient.items():
+                user = users.get(recipient_id)
+                items = NotificationDispatcher._digest_items(recipient_events, titles, names, readable)
+                channels = []
+                if user is not None and user.is_active:
+                    if user.email_notifications:
+                        channels.append(EMAIL)
+                    if user.browser_notifications:
+                        channels.append(PUSH)
+                if not items or not channels:
+                    done.extend(event.id for event in recipient_events)
+                    result["dropped"] += len(recipient_events)
+                    continue
+
+                try:
+                    for channel in channels:
+                        try:
+                            get_sink(channel).send(Digest(user.id, user.email, user.name, channel, items))
+                        except SinkBusy:
+                            BUSY.inc(channel)
+                            raise
+                        DIGESTS.inc(channel)
+                        result["digests"] += 1
+                except SinkBusy:
+                    result["busy"] = True
+                    break
+                except Exception:
+                    logger.exception("Notification delivery to user %d failed", recipient_id)
+                    for event in recipient_events:
+                        event.attempts += 1
+                        if event.attempts >= settings.NOTIFICATION_MAX_ATTEMPTS:
+                            done.append(event.id)
+                            result["dropped"] += 1
+                        else:
+                            event.retry_at = now + timedelta(
+                                seconds=settings.NOTIFICATION_RETRY_SECONDS * 2 ** (event.attempts - 1)
+                            )
+                            retried.append(event.id)
+                            result["retried"] += 1
+                    continue
+
+                done.extend(event.id for event in recipient_events)
+                result["delivered"] += len(recipient_events)
+                for event in recipient_events:
+                    DELAY.observe((now - _aware(event.created_at)).total_seconds())
+        finally:
+            for sink in _sinks.values():
+                sink.close()
+
+        if done:
+            db.query(OutboxEvent).filter(OutboxEvent.id.in_(done)).delete(synchronize_session=False)
+        if result["busy"]:
+            # Events the busy sink never got are due again right away
+            skipped = set(claimed) - set(done) - set(retried)
+            for event in events:
+                if event.id in skipped:
+                    event.retry_at = None
+        db.commit()
+        for outcome in ("delivered", "dropped", "retried"):
+            if result[outcome]:
+                EVENTS.inc(outcome, amount=result[outcome])
+        return result
@@ -0,0 +1,79 @@
+from typing import Dict, Optional, Tuple
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core import compression, metrics
+from app.models.note import Note, NoteChange
+from app.schemas.note import PublicNote
+from app.utils.lru import LRUCache
+
+class CachedBody:
+    """Serialized public note with every precompressed encoding of it."""
+
+    __slots__ = ("note_id", "version", "body", "encoded")
+
+    def __init__(self, note_id: int, version: int, body: bytes, encoded: Dict[str, bytes]):
+        self.note_id = note_id
+        self.version = version
+        self.body = body
+        self.encoded = encoded
+
+    @property
+    def size(self) -> int:
+        return len(self.body) + sum(len(data) for data in self.encoded.values())
+
+    def for_encoding(self, encoding: Optional[str]):
+        """Return (body, encoding) for the negotiated encoding, or identity."""
+        if encoding in self.encoded:
+            return self.encoded[encoding], encoding
+        return self.body, None
+
+_cache = LRUCache(
+    max_size=settings.PUBLIC_NOTE_CACHE_SIZE_BYTES,
+    ttl=settings.PUBLIC_NOTE_CACHE_TTL_SECONDS,
+    sizeof=lambda entry: entry.size,
+)
+
+class PublicNoteCache:
+    """Per-worker cache of public note bodies, checked against the database on every hit."""
+
+    @staticmethod
+    def get(db: Session, public_token: str, render: bool = False) -> Tuple[Optional[CachedBody], Optional[int]]:
+        """The cached entry if still current, and the version to ``put`` a fresh one with."""
+        version = select(func.coalesce(func.max(NoteChange.id), 0)).where(
+            NoteChange.note_id == Note.id
+        ).scalar_subquery()
+        current = db.query(Note.id, version).filter(Note.public_token == public_token).first()
+        entry = _cache.get((public_token, render))
+        if entry is not None and current is not None and (entry.note_id, entry.version) == tuple(current):
+            metrics.cache_hit("public_note")
+            return entry, current[1]
+        metrics.cache_miss("public_note")
+        return None, current[1] if current is not None else None
+
+    @staticmethod
+    def put(public_token: str, note: Note, version: Optional[int], rendered_html: Optional[str] = None) -> CachedBody:
+        render = rendered_html is not None
+        body = PublicNote.model_validate({
+            "id": note.id,
+            "title": note.title,
+            "content": note.content,
+            "visibility": note.visibility.value,
+            "created_at": note.created_at,
+            "updated_at": note.updated_at,
+            "tags": note.tags,
+            "public_token": note.public_token,
+            "rendered_html": rendered_html
+        }).model_dump_json(exclude=None if render else {"rendered_html"}).encode()
+        # Compress once per change, not once per view
+        encoded = compression.compress_all(body) if len(body) >= settings.COMPRESSION_MIN_SIZE else {}
+        entry = CachedBody(note.id, version, body, encoded)
+        if version is not None:
+            _cache.set((public_token, render), entry)
+        return entry
+
+    @staticmethod
+    def invalidate(public_token: Optional[str]) -> None:
+        if public_token:
+            _cache.delete((public_token, False))
+            _cache.delete((public_token, True))
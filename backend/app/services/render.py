@@ -0,0 +1,102 @@
+import hashlib
+import html
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+from app.core.config import settings
+from app.core import metrics
+from app.db.database import SessionLocal
+from app.models.note import Note
+from app.utils.lru import LRUCache
+
+try:
+    from markdown_it import MarkdownIt
+except ImportError:  # pragma: no cover - optional dependency
+    MarkdownIt = None
+
+try:
+    import nh3
+except ImportError:  # pragma: no cover - optional dependency
+    nh3 = None
+
+logger = logging.getLogger(__name__)
+
+# Raw HTML in notes is escaped rather than passed through; nh3 then
+# sanitizes the generated markup as a second line of defence
+_markdown = MarkdownIt("commonmark", {"html": False}).enable("table").enable("strikethrough") if MarkdownIt else None
+
+_cache = LRUCache(max_size=settings.RENDER_CACHE_SIZE_BYTES, sizeof=len)
+_executor: Optional[ThreadPoolExecutor] = None
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=settings.RENDER_WORKERS, thread_name_prefix="render")
+    return _executor
+
+class RenderService:
+    @staticmethod
+    def content_hash(content: Optional[str]) -> str:
+        return hashlib.sha256((content or "").encode()).hexdigest()
+
+    @staticmethod
+    def render(content: Optional[str]) -> str:
+        if not content:
+            return ""
+        if _markdown is None:
+            return f"<pre>{html.escape(content)}</pre>"
+        rendered = _markdown.render(content)
+        if nh3 is not None:
+            rendered = nh3.clean(rendered)
+        return rendered
+
+    @staticmethod
+    def render_cached(content: Optional[str], content_hash: Optional[str] = None) -> str:
+        content_hash = content_hash or RenderService.content_hash(content)
+        rendered = _cache.get(content_hash)
+        if rendered is not None:
+            metrics.cache_hit("render")
+            return rendered
+        metrics.cache_miss("render")
+        rendered = RenderService.render(content)
+        _cache.set(content_hash, rendered)
+        return rendered
+
+    @staticmethod
+    def get_html(note: Note) -> str:
+        content_hash = RenderService.content_hash(note.content)
+        rendered = _cache.get(content_hash)
+        if rendered is not None:
+            metrics.cache_hit("render")
+            return rendered
+        # Deferred columns: only loaded when persistence is on and we get here
+        if settings.RENDER_PERSIST and note.rendered_hash == content_hash and note.rendered_html is not None:
+            metrics.cache_hit("render_persisted")
+            _cache.set(content_hash, note.rendered_html)
+            return note.rendered_html
+        return RenderService.render_cached(note.content, content_hash)
+
+    @staticmethod
+    def schedule(note_id: int, content: Optional[str]) -> None:
+        """Render in the background so the next read finds the HTML ready."""
+        _get_executor().submit(RenderService._render_and_store, note_id, content)
+
+    @staticmethod
+    def _render_and_store(note_id: int, content: Optional[str]) -> None:
+        try:
+            content_hash = RenderService.content_hash(content)
+            rendered = RenderService.render_cached(content, content_hash)
+            if not settings.RENDER_PERSIST:
+                return
+            db = SessionLocal()
+            try:
+                db.query(Note).filter(Note.id == note_id).update(
+                    # Keep updated_at: a background render is not an edit
+                    {Note.rendered_html: rendered, Note.rendered_hash: content_hash, Note.updated_at: Note.updated_at},
+                    synchronize_session=False
+                )
+                db.commit()
+            finally:
+                db.close()
+        except Exception:
+            logger.exception("Failed to render note %s", note_id)
@@ -1,5 +1,16 @@
 from sqlalchemy.orm import Session
 from app.models.user import User
+from app.models.note import Note, NoteAccess, NoteSignature, UserTag, note_shares
+from app.models.group import Group, GroupMember, NoteGroupShare
+from app.models.notebook import Notebook
+from app.models.token import RefreshToken
+from app.services.changes import ChangeLog
+from app.services.links import LinksService
+from app.services.note_cache import note_cache
+from app.services.notifications import Outbox
+from app.services.similarity import SimilarityService
+from app.services.tokens import TokenService
+from app.services.view_stats import ViewStatsService
 from app.schemas.user import UserUpdate, PasswordUpdate, ProfileUpdate, PreferencesUpdate
 from app.core.security import verify_password, get_password_hash
 from fastapi import HTTPException, status
@@ -50,6 +61,8 @@ class SettingsService:
             )
         
         user.hashed_password = get_password_hash(password_data.new_password)
+        # Whoever held the old password may still hold a session: end them all
+        TokenService.revoke_user(db, user.id)
         db.commit()
         return True
 
@@ -114,12 +127,41 @@ class SettingsService:
             )
         
         try:
-            for note in user.shared_notes:
-                if user in note.shared_with:
-                    note.shared_with.remove(user)
+            owned_note_ids = db.query(Note.id).filter(Note.owner_id == user.id)
+            deleted_ids = [note_id for (note_id,) in owned_note_ids]
+            owned_group_ids = db.query(Group.id).filter(Group.owner_id == user.id)
+            ChangeLog.notes_removed(db, owned_note_ids)
+            for (group_id,) in owned_group_ids.all():
+                ChangeLog.group_access_removed(db, group_id)
+            db.execute(note_shares.delete().where(
+                (note_shares.c.user_id == user.id) | note_shares.c.note_id.in_(owned_note_ids)
+            ))
+            db.query(NoteAccess).filter(
+                (NoteAccess.user_id == user.id) | NoteAccess.note_id.in_(owned_note_ids)
+            ).delete(synchronize_session=False)
+            
+            db.query(NoteGroupShare).filter(
+                NoteGroupShare.note_id.in_(owned_note_ids) | NoteGroupShare.group_id.in_(owned_group_ids)
+            ).delete(synchronize_session=False)
+            db.query(GroupMember).filter(
+                (GroupMember.user_id == user.id) | GroupMember.group_id.in_(owned_group_ids)
+            ).delete(synchronize_session=False)
+            db.query(Group).filter(Group.owner_id == user.id).delete(synchronize_session=False)
+            db.query(UserTag).filter(UserTag.user_id == user.id).delete(synchronize_session=False)
+            db.query(NoteSignature).filter(NoteSignature.owner_id == user.id).delete(synchronize_session=False)
+            LinksService.delete_links(db, owned_note_ids)
+            ViewStatsService.delete_stats(db, owned_note_ids)
+            Outbox.delete_for(db, user.id)
+            db.query(RefreshToken).filter(RefreshToken.user_id == user.id).delete(synchronize_session=False)
+            db.query(Notebook).filter(Notebook.owner_id == user.id).delete(synchronize_session=False)
             
             db.delete(user)
             db.commit()
+            # Notes, shares and groups all go at once: too much to evict one by one,
+            # but the shared tier still needs tombstones for the deleted bodies
+            note_cache.invalidate_notes(db, deleted_ids)
+            note_cache.clear()
+            SimilarityService.forget_owner(user.id)
             return True
         except Exception as e:
             db.rollback()
@@ -0,0 +1,207 @@
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.note import Note, NoteSignature
+from app.models.user import User
+from app.utils import minhash
+from app.utils.lru import LRUCache
+from app.utils.minhash import np
+
+# Tail rows are merged into the sorted arrays once there are this many, or
+# an eighth of the index, whichever is larger
+_MIN_TAIL = 1024
+
+class _OwnerIndex:
+    """Array-backed LSH index over the signatures of one owner's notes."""
+
+    def __init__(self, note_ids: "np.ndarray", signatures: "np.ndarray"):
+        self._lock = threading.Lock()
+        self._tail: "OrderedDict[int, Tuple[np.ndarray, np.ndarray]]" = OrderedDict()
+        self._tail_arrays = None
+        self._build(note_ids, signatures)
+
+    def _build(self, note_ids: "np.ndarray", signatures: "np.ndarray") -> None:
+        bands = minhash.band_hashes(signatures)
+        order = np.argsort(bands, axis=0, kind="stable")
+        self.note_ids = note_ids
+        self.signatures = signatures
+        self.alive = np.ones(len(note_ids), dtype=bool)
+        self.positions: Dict[int, int] = {int(note_id): row for row, note_id in enumerate(note_ids)}
+        # (bands, n): band hashes sorted per band, and the row each one came from
+        self._keys = np.ascontiguousarray(np.take_along_axis(bands, order, axis=0).T)
+        self._rows = np.ascontiguousarray(order.T.astype(np.int32))
+
+    @property
+    def nbytes(self) -> int:
+        return self.signatures.nbytes + self._keys.nbytes + self._rows.nbytes + self.note_ids.nbytes
+
+    def signature(self, note_id: int) -> Optional["np.ndarray"]:
+        with self._lock:
+            if note_id in self._tail:
+                return self._tail[note_id][0]
+            row = self.positions.get(note_id)
+            return self.signatures[row] if row is not None else None
+
+    def upsert(self, note_id: int, sig: "np.ndarray") -> None:
+        with self._lock:
+            self._discard(note_id)
+            self._tail[note_id] = (sig, minhash.band_hashes(sig[None, :])[0])
+            self._tail_arrays = None
+            if len(self._tail) >= max(_MIN_TAIL, len(self.note_ids) // 8):
+                self._merge_tail()
+
+    def remove(self, note_id: int) -> None:
+        with self._lock:
+            self._discard(note_id)
+
+    def _discard(self, note_id: int) -> None:
+        if self._tail.pop(note_id, None) is not None:
+            self._tail_arrays = None
+        row = self.positions.pop(note_id, None)
+        if row is not None:
+            self.alive[row] = False
+
+    def _merge_tail(self) -> None:
+        tail_ids = np.fromiter(self._tail.keys(), dtype=np.int64, count=len(self._tail))
+        tail_signatures = np.stack([sig for sig, _ in self._tail.values()])
+        self._build(
+            np.concatenate([self.note_ids[self.alive], tail_ids]),
+            np.concatenate([self.signatures[self.alive], tail_signatures])
+        )
+        self._tail.clear()
+        self._tail_arrays = None
+
+    def query(self, sig: "np.ndarray", min_score: float) -> List[Tuple[int, float]]:
+        """(note_id, estimated Jaccard similarity) of candidates scoring >= ``min_score``."""
+        query_bands = minhash.band_hashes(sig[None, :])[0]
+        with self._lock:
+            found = []
+            for band, key in enumerate(query_bands):
+                keys = self._keys[band]
+                start, end = np.searchsorted(keys, key, "left"), np.searchsorted(keys, key, "right")
+                if start < end:
+                    found.append(self._rows[band, start:end])
+            ids = np.empty(0, dtype=np.int64)
+            scores = np.empty(0)
+            if found:
+                rows = np.unique(np.concatenate(found))
+                rows = rows[self.alive[rows]]
+                ids = self.note_ids[rows]
+                scores = (self.signatures[rows] == sig).mean(axis=1)
+
+            if self._tail:
+                if self._tail_arrays is None:
+                    self._tail_arrays = (
+                        np.fromiter(self._tail.keys(), dtype=np.int64, count=len(self._tail)),
+                        np.stack([entry[0] for entry in self._tail.values()]),
+                        np.stack([entry[1] for entry in self._tail.values()]),
+                    )
+                tail_ids, tail_signatures, tail_bands = self._tail_arrays
+                matches = (tail_bands == query_bands).any(axis=1)
+                ids = np.concatenate([ids, tail_ids[matches]])
+                scores = np.concatenate([scores, (tail_signatures[matches] == sig).mean(axis=1)])
+
+        keep = scores >= min_score
+        return list(zip(ids[keep].tolist(), scores[keep].tolist()))
+
+_indexes = LRUCache(
+    max_size=settings.SIMILARITY_INDEX_CACHE_BYTES,
+    ttl=settings.SIMILARITY_INDEX_TTL_SECONDS,
+    sizeof=lambda index: index.nbytes
+)
+
+class SimilarityService:
+    """Related and near-duplicate notes within each owner's own notes."""
+
+    @staticmethod
+    def enabled() -> bool:
+        return np is not None
+
+    @staticmethod
+    def store_signature(db: Session, note: Note) -> Optional["np.ndarray"]:
+        """Write the signature of ``note``'s content in the current transaction."""
+        if not SimilarityService.enabled():
+            return None
+        sig = minhash.signature(note.content)
+        if sig is None:
+            db.query(NoteSignature).filter(NoteSignature.note_id == note.id).delete(synchronize_session=False)
+        else:
+            db.merge(NoteSignature(note_id=note.id, owner_id=note.owner_id, signature=minhash.to_bytes(sig)))
+        return sig
+
+    @staticmethod
+    def delete_signatures(db: Session, note_ids: Iterable[int]) -> None:
+        db.query(NoteSignature).filter(NoteSignature.note_id.in_(note_ids)).delete(synchronize_session=False)
+
+    @staticmethod
+    def update_index(owner_id: int, note_id: int, sig: Optional["np.ndarray"]) -> None:
+        """Apply a committed write to this worker's index of ``owner_id``, if loaded."""
+        index = _indexes.get(owner_id)
+        if index is None:
+            return
+        if sig is None:
+            index.remove(note_id)
+        else:
+            index.upsert(note_id, sig)
+
+    @staticmethod
+    def forget_owner(owner_id: int) -> None:
+        _indexes.delete(owner_id)
+
+    @staticmethod
+    def _index(db: Session, owner_id: int) -> _OwnerIndex:
+        index = _indexes.get(owner_id)
+        if index is None:
+            rows = db.query(NoteSignature.note_id, NoteSignature.signature).filter(
+                NoteSignature.owner_id == owner_id
+            ).all()
+            note_ids = np.fromiter((row.note_id for row in rows), dtype=np.int64, count=len(rows))
+            signatures = np.frombuffer(b"".join(row.signature for row in rows), dtype="<u4").astype(np.uint32)
+            index = _OwnerIndex(note_ids, signatures.reshape(len(rows), settings.SIMILARITY_NUM_PERM))
+            _indexes.set(owner_id, index)
+        return index
+
+    @staticmethod
+    def _describe(db: Session, owner_id: int, matches: List[Tuple[int, float]], limit: int) -> List[dict]:
+        matches = sorted(matches, key=lambda match: (-match[1], match[0]))[:limit]
+        if not matches:
+            return []
+        titles = dict(db.query(Note.id, Note.title).filter(
+            Note.owner_id == owner_id,
+            Note.id.in_([note_id for note_id, _ in matches])
+        ).all())
+        return [
+            {"id": note_id, "title": titles[note_id], "similarity": round(score, 3)}
+            for note_id, score in matches
+            if note_id in titles
+        ]
+
+    @staticmethod
+    def similar_notes(db: Session, note: Note, user: User, limit: Optional[int] = None) -> List[dict]:
+        """The user's own notes most similar to ``note``, which ``user`` must be able to read."""
+        if not SimilarityService.enabled():
+            return []
+        index = SimilarityService._index(db, user.id)
+        sig = index.signature(note.id) if note.owner_id == user.id else None
+        if sig is None:
+            stored = db.query(NoteSignature.signature).filter(NoteSignature.note_id == note.id).scalar()
+            if stored is None:
+                return []
+            sig = minhash.from_bytes(stored)
+        matches = [
+            match for match in index.query(sig, settings.SIMILARITY_MIN_SCORE)
+            if match[0] != note.id
+        ]
+        return SimilarityService._describe(db, user.id, matches, limit or settings.SIMILARITY_LIMIT)
+
+    @staticmethod
+    def find_duplicates(db: Session, user: User, content: str, threshold: Optional[float] = None) -> List[dict]:
+        """The user's notes whose content nearly matches ``content``, e.g. before an import."""
+        sig = minhash.signature(content)
+        if sig is None:
+            return []
+        threshold = settings.SIMILARITY_DUPLICATE_THRESHOLD if threshold is None else threshold
+        matches = SimilarityService._index(db, user.id).query(sig, threshold)
+        return SimilarityService._describe(db, user.id, matches, settings.SIMILARITY_LIMIT)
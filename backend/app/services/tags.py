@@ -0,0 +1,112 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import func
+from typing import Iterable, List, Optional
+from app.core.config import settings
+from app.models.note import Tag, UserTag
+from app.models.user import User
+
+def _prefix_upper_bound(prefix: str) -> str:
+    # Smallest string greater than every string starting with prefix
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+def _dialect_insert(db: Session):
+    """``insert`` with ON CONFLICT support for the session's database, or None."""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+        return insert
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+        return insert
+    return None
+
+class TagsService:
+    @staticmethod
+    def get_or_create_tags(db: Session, names: Iterable[str]) -> List[Tag]:
+        names = list(names)
+        insert = _dialect_insert(db)
+        if insert is None:
+            tags = []
+            for tag_name in names:
+                tag = db.query(Tag).filter(Tag.name == tag_name).first()
+                if not tag:
+                    tag = Tag(name=tag_name)
+                    db.add(tag)
+                    db.flush()
+                tags.append(tag)
+            return tags
+        # Key-share locks keep the orphan sweep (app.db.tag_gc) off these tags
+        # until the caller commits the note that uses them
+        query = db.query(Tag).with_for_update(key_share=True)
+        by_name = {tag.name: tag for tag in query.filter(Tag.name.in_(names))}
+        missing = [name for name in dict.fromkeys(names) if name not in by_name]
+        if missing:
+            # Another request may create the same tag first: keep whichever row won
+            db.execute(insert(Tag).values([{"name": name} for name in missing]).on_conflict_do_nothing(
+                index_elements=[Tag.name]
+            ))
+            by_name.update((tag.name, tag) for tag in query.filter(Tag.name.in_(missing)))
+        return [by_name[name] for name in names]
+
+    @staticmethod
+    def record_usage(db: Session, user_id: int, added: Iterable[Tag] = (), removed: Iterable[Tag] = ()) -> None:
+        """Apply tag additions and removals on one note to the owner's catalog."""
+        rows = {}
+        for tag in added:
+            row = rows.setdefault(tag.id, {"user_id": user_id, "tag_id": tag.id, "name": tag.name, "usage_count": 0})
+            row["usage_count"] += 1
+        if rows:
+            # Sorted so concurrent writers lock rows in the same order
+            TagsService._upsert(db, [rows[tag_id] for tag_id in sorted(rows)])
+
+        removed_ids = [tag.id for tag in removed]
+        if removed_ids:
+            db.query(UserTag).filter(
+                UserTag.user_id == user_id, UserTag.tag_id.in_(removed_ids)
+            ).update({UserTag.usage_count: UserTag.usage_count - 1}, synchronize_session=False)
+            db.query(UserTag).filter(
+                UserTag.user_id == user_id,
+                UserTag.tag_id.in_(removed_ids),
+                UserTag.usage_count <= 0
+            ).delete(synchronize_session=False)
+
+    @staticmethod
+    def _upsert(db: Session, rows: List[dict]) -> None:
+        """Add ``usage_count`` of each row to the catalog, creating missing rows."""
+        insert = _dialect_insert(db)
+        if insert is None:
+            for row in rows:
+                updated = db.query(UserTag).filter(
+                    UserTag.user_id == row["user_id"], UserTag.tag_id == row["tag_id"]
+                ).update({UserTag.usage_count: UserTag.usage_count + row["usage_count"]}, synchronize_session=False)
+                if not updated:
+                    db.add(UserTag(**row))
+                    db.flush()
+            return
+        stmt = insert(UserTag).values(rows)
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=[UserTag.user_id, UserTag.tag_id],
+            set_={"usage_count": UserTag.usage_count + stmt.excluded.usage_count, "updated_at": func.now()}
+        ))
+
+    @staticmethod
+    def get_catalog(db: Session, user: User, limit: Optional[int] = None) -> List[UserTag]:
+        limit = min(limit or settings.TAG_CATALOG_MAX_SIZE, settings.TAG_CATALOG_MAX_SIZE)
+        return db.query(UserTag).filter(
+            UserTag.user_id == user.id
+        ).order_by(UserTag.usage_count.desc(), UserTag.name).limit(limit).all()
+
+    @staticmethod
+    def autocomplete(db: Session, user: User, prefix: str, limit: Optional[int] = None) -> List[UserTag]:
+        limit = min(limit or settings.TAG_AUTOCOMPLETE_LIMIT, settings.TAG_CATALOG_MAX_SIZE)
+        query = db.query(UserTag).filter(UserTag.user_id == user.id)
+        if prefix:
+            # The range predicates use the (user_id, name) index, which sorts
+            # names by code point (see UserTag.name); LIKE keeps the match exact
+            escaped = prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            query = query.filter(
+                UserTag.name >= prefix,
+                UserTag.name < _prefix_upper_bound(prefix),
+                UserTag.name.like(f"{escaped}%", escape="\\")
+            )
+        return query.order_by(UserTag.usage_count.desc(), UserTag.name).limit(limit).all()
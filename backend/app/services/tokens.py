@@ -0,0 +1,198 @@
+import hashlib
+import secrets
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.security import create_access_token
+from app.db.database import SessionLocal
+from app.models.token import RefreshToken, RevokedToken
+from app.models.user import User
+from app.utils.bloom import BloomFilter
+from fastapi import HTTPException, status
+
+# Rows revoked this long before the last sync are read again on the next
+# one, so a revocation committed late by another worker isn't missed
+_SYNC_OVERLAP = timedelta(seconds=30)
+
+class _Denylist:
+    """Revoked access token ids held by this worker."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._exact: Dict[str, float] = {}
+        self._bloom = BloomFilter(settings.REVOCATION_BLOOM_CAPACITY, settings.REVOCATION_BLOOM_ERROR_RATE)
+        self.synced_at: Optional[datetime] = None
+
+    def __contains__(self, jti: str) -> bool:
+        return jti in self._bloom and jti in self._exact
+
+    def add(self, jti: str, expires_at: float) -> None:
+        with self._lock:
+            if jti in self._exact:
+                return
+            self._exact[jti] = expires_at
+            if self._bloom.full:
+                self._rebuild()
+            else:
+                self._bloom.add(jti)
+
+    def _rebuild(self) -> None:
+        now = time.time()
+        self._exact = {jti: expires for jti, expires in self._exact.items() if expires > now}
+        capacity = max(settings.REVOCATION_BLOOM_CAPACITY, 2 * len(self._exact))
+        bloom = BloomFilter(capacity, settings.REVOCATION_BLOOM_ERROR_RATE)
+        bloom.update(self._exact)
+        self._bloom = bloom
+
+    def prune(self) -> None:
+        """Drop expired ids; the filter is rebuilt once half its entries are gone."""
+        with self._lock:
+            now = time.time()
+            expired = sum(1 for expires in self._exact.values() if expires <= now)
+            if expired and expired * 2 >= self._bloom.count:
+                self._rebuild()
+
+    def __len__(self) -> int:
+        return len(self._exact)
+
+_denylist = _Denylist()
+_sync_lock = threading.Lock()
+
+def _hash(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+def _aware(value: datetime) -> datetime:
+    # SQLite hands back naive UTC timestamps
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+class TokenService:
+    @staticmethod
+    def issue(db: Session, user: User, family_id: Optional[str] = None) -> dict:
+        """A new access token and a refresh token that can be spent once for the next pair."""
+        now = datetime.now(timezone.utc)
+        access_lifetime = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+        jti = secrets.token_hex(16)
+        access_token = create_access_token(
+            data={"sub": str(user.id), "jti": jti, "type": "access"}, expires_delta=access_lifetime
+        )
+        refresh_token = secrets.token_urlsafe(32)
+        db.add(RefreshToken(
+            user_id=user.id,
+            family_id=family_id or secrets.token_hex(16),
+            token_hash=_hash(refresh_token),
+            access_jti=jti,
+            access_expires_at=now + access_lifetime,
+            expires_at=now + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+        ))
+        db.commit()
+        return {
+            "access_token": access_token,
+            "refresh_token": refresh_token,
+            "token_type": "bearer",
+            "expires_in": int(access_lifetime.total_seconds())
+        }
+
+    @staticmethod
+    def refresh(db: Session, refresh_token: str) -> tuple:
+        """Spend ``refresh_token`` for a new pair; returns (user, tokens)."""
+        invalid = HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid refresh token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+        row = db.query(RefreshToken).filter(
+            RefreshToken.token_hash == _hash(refresh_token)
+        ).with_for_update().first()
+        if row is None:
+            raise invalid
+        now = datetime.now(timezone.utc)
+        if row.used_at is not None or row.revoked_at is not None:
+            # A spent token came back: whoever holds the family now may not be its owner
+            TokenService._revoke_families(db, db.query(RefreshToken.family_id).filter(
+                RefreshToken.family_id == row.family_id
+            ))
+            db.commit()
+            raise invalid
+        if _aware(row.expires_at) <= now:
+            raise invalid
+        user = db.get(User, row.user_id)
+        if user is None or not user.is_active:
+            raise invalid
+        row.used_at = now
+        return user, TokenService.issue(db, user, row.family_id)
+
+    @staticmethod
+    def revoke_access(db: Session, jti: str, expires_at: datetime) -> None:
+        """Denylist one access token, in the caller's transaction."""
+        if db.get(RevokedToken, jti) is None:
+            db.add(RevokedToken(jti=jti, expires_at=expires_at, created_at=datetime.now(timezone.utc)))
+            db.flush()
+        _denylist.add(jti, _aware(expires_at).timestamp())
+
+    @staticmethod
+    def _revoke_families(db: Session, family_ids) -> None:
+        """Revoke every refresh token of ``family_ids`` and the access tokens still live from them."""
+        now = datetime.now(timezone.utc)
+        live_access = db.query(RefreshToken.access_jti, RefreshToken.access_expires_at).filter(
+            RefreshToken.family_id.in_(family_ids), RefreshToken.access_expires_at > now
+        ).all()
+        for jti, expires_at in live_access:
+            TokenService.revoke_access(db, jti, expires_at)
+        db.query(RefreshToken).filter(
+            RefreshToken.family_id.in_(family_ids), RefreshToken.revoked_at.is_(None)
+        ).update({RefreshToken.revoked_at: now}, synchronize_session=False)
+
+    @staticmethod
+    def logout(db: Session, payload: dict, user: User, refresh_token: Optional[str] = None) -> None:
+        """Revoke the presented access token and, if given, its refresh token's family."""
+        TokenService.revoke_access(db, payload["jti"], datetime.fromtimestamp(payload["exp"], timezone.utc))
+        if refresh_token:
+            TokenService._revoke_families(db, db.query(RefreshToken.family_id).filter(
+                RefreshToken.token_hash == _hash(refresh_token), RefreshToken.user_id == user.id
+            ))
+        db.commit()
+
+    @staticmethod
+    def revoke_user(db: Session, user_id: int) -> None:
+        """Sign ``user_id`` out everywhere, in the caller's transaction."""
+        TokenService._revoke_families(db, db.query(RefreshToken.family_id).filter(
+            RefreshToken.user_id == user_id
+        ))
+
+    @staticmethod
+    def is_revoked(jti: str) -> bool:
+        if _denylist.synced_at is None:
+            db = SessionLocal()
+            try:
+                TokenService.sync(db)
+            finally:
+                db.close()
+        return jti in _denylist
+
+    @staticmethod
+    def sync(db: Session) -> int:
+        """Read revocations made by other workers since the last sync into the denylist."""
+        with _sync_lock:
+            started = datetime.now(timezone.utc)
+            query = db.query(RevokedToken.jti, RevokedToken.expires_at).filter(RevokedToken.expires_at > started)
+            if _denylist.synced_at is not None:
+                query = query.filter(RevokedToken.created_at >= _denylist.synced_at - _SYNC_OVERLAP)
+            rows = query.all()
+            db.rollback()
+            for jti, expires_at in rows:
+                _denylist.add(jti, _aware(expires_at).timestamp())
+            _denylist.prune()
+            _denylist.synced_at = started
+            return len(rows)
+
+    @staticmethod
+    def purge(db: Session) -> int:
+        """Delete expired revocations and refresh tokens."""
+        now = datetime.now(timezone.utc)
+        purged = db.query(RevokedToken).filter(RevokedToken.expires_at <= now).delete(synchronize_session=False)
+        purged += db.query(RefreshToken).filter(RefreshToken.expires_at <= now).delete(synchronize_session=False)
+        db.commit()
+        return purged
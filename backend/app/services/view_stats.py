@@ -0,0 +1,139 @@
+import threading
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.core import metrics
+from app.core.config import settings
+from app.models.note import Note, NoteViewStat
+from app.models.user import User
+from fastapi import HTTPException, status
+
+VIEWS_FLUSHED = metrics.counter("note_views_flushed_total", "Public note views written to note_view_stats")
+VIEWS_DROPPED = metrics.counter("note_views_dropped_total", "Public note views lost to failed flushes")
+
+# (note_id, day, referrer) -> views not yet written, for this worker
+_pending: Dict[Tuple[int, date, str], int] = {}
+_lock = threading.Lock()
+
+def _referrer_host(referrer: Optional[str]) -> str:
+    if not referrer:
+        return ""
+    try:
+        host = urlsplit(referrer).hostname
+    except ValueError:
+        return ""
+    return (host or "")[:255]
+
+class ViewStatsService:
+    @staticmethod
+    def enabled() -> bool:
+        return settings.VIEW_STATS_FLUSH_INTERVAL_SECONDS > 0
+
+    @staticmethod
+    def record(note_id: int, referrer: Optional[str] = None) -> bool:
+        """Count one view in memory; True once enough is pending to flush early."""
+        key = (note_id, datetime.now(timezone.utc).date(), _referrer_host(referrer))
+        with _lock:
+            _pending[key] = _pending.get(key, 0) + 1
+            return len(_pending) >= settings.VIEW_STATS_MAX_PENDING
+
+    @staticmethod
+    def _upsert(db: Session, rows: List[dict]) -> None:
+        dialect = db.get_bind().dialect.name
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        elif dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            for row in rows:
+                updated = db.query(NoteViewStat).filter(
+                    NoteViewStat.note_id == row["note_id"],
+                    NoteViewStat.day == row["day"],
+                    NoteViewStat.referrer == row["referrer"]
+                ).update({NoteViewStat.views: NoteViewStat.views + row["views"]}, synchronize_session=False)
+                if not updated:
+                    db.add(NoteViewStat(**row))
+            return
+        stmt = insert(NoteViewStat).values(rows)
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=[NoteViewStat.note_id, NoteViewStat.day, NoteViewStat.referrer],
+            set_={"views": NoteViewStat.views + stmt.excluded.views}
+        ))
+
+    @staticmethod
+    def flush(db: Session) -> int:
+        """Add every pending count to note_view_stats; returns the views written."""
+        global _pending
+        with _lock:
+            batch, _pending = _pending, {}
+        if not batch:
+            return 0
+
+        keys = sorted(batch)
+        written = 0
+        try:
+            for start in range(0, len(keys), settings.VIEW_STATS_FLUSH_BATCH_SIZE):
+                chunk = keys[start:start + settings.VIEW_STATS_FLUSH_BATCH_SIZE]
+                # Views of notes deleted since they were counted have nowhere to go
+                existing = {
+                    note_id for (note_id,) in
+                    db.query(Note.id).filter(Note.id.in_({note_id for note_id, _, _ in chunk}))
+                }
+                rows = [
+                    {"note_id": note_id, "day": day, "referrer": referrer, "views": batch[(note_id, day, referrer)]}
+                    for note_id, day, referrer in chunk if note_id in existing
+                ]
+                if rows:
+                    ViewStatsService._upsert(db, rows)
+                db.commit()
+                written += sum(row["views"] for row in rows)
+                for key in chunk:
+                    del batch[key]
+        except Exception:
+            db.rollback()
+            with _lock:
+                if len(_pending) + len(batch) <= settings.VIEW_STATS_MAX_PENDING:
+                    for key, views in batch.items():
+                        _pending[key] = _pending.get(key, 0) + views
+                    batch = {}
+            if batch:
+                VIEWS_DROPPED.inc(amount=sum(batch.values()))
+            raise
+        finally:
+            VIEWS_FLUSHED.inc(amount=written)
+        return written
+
+    @staticmethod
+    def delete_stats(db: Session, note_ids) -> None:
+        """Drop the stats of ``note_ids`` (ids or a subquery of them)."""
+        db.query(NoteViewStat).filter(NoteViewStat.note_id.in_(note_ids)).delete(synchronize_session=False)
+
+    @staticmethod
+    def get_stats(db: Session, note: Note, user: User, days: Optional[int] = None) -> dict:
+        """Views of ``note`` per day and top referrers over the last ``days`` days."""
+        if note.owner_id != user.id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Only owner can view note statistics"
+            )
+        days = min(days or settings.VIEW_STATS_DAYS, settings.VIEW_STATS_MAX_DAYS)
+        since = datetime.now(timezone.utc).date() - timedelta(days=days - 1)
+        in_range = (NoteViewStat.note_id == note.id, NoteViewStat.day >= since)
+
+        per_day = db.query(NoteViewStat.day, func.sum(NoteViewStat.views)).filter(
+            *in_range
+        ).group_by(NoteViewStat.day).order_by(NoteViewStat.day).all()
+        views = func.sum(NoteViewStat.views).label("views")
+        referrers = db.query(NoteViewStat.referrer, views).filter(
+            *in_range, NoteViewStat.referrer != ""
+        ).group_by(NoteViewStat.referrer).order_by(views.desc(), NoteViewStat.referrer).limit(
+            settings.VIEW_STATS_TOP_REFERRERS
+        ).all()
+
+        return {
+            "total_views": sum(count for _, count in per_day),
+            "days": [{"day": day, "views": count} for day, count in per_day],
+            "referrers": [{"referrer": referrer, "views": count} for referrer, count in referrers],
+        }
@@ -0,0 +1,44 @@
+import hashlib
+import math
+from typing import Iterable, Tuple
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings."""
+
+    __slots__ = ("capacity", "size", "hashes", "count", "_bits")
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        capacity = max(1, capacity)
+        self.capacity = capacity
+        self.size = max(8, int(math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+
+    @staticmethod
+    def _halves(item: str) -> Tuple[int, int]:
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        return int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+
+    def add(self, item: str) -> None:
+        h1, h2 = self._halves(item)
+        for i in range(self.hashes):
+            position = (h1 + i * h2) % self.size
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def update(self, items: Iterable[str]) -> None:
+        for item in items:
+            self.add(item)
+
+    def __contains__(self, item: str) -> bool:
+        h1, h2 = self._halves(item)
+        for i in range(self.hashes):
+            position = (h1 + i * h2) % self.size
+            if not self._bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+    @property
+    def full(self) -> bool:
+        return self.count >= self.capacity
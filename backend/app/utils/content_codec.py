@@ -0,0 +1,92 @@
+"""Compression of large note bodies at rest."""
+import threading
+import zlib
+from typing import Dict, Optional
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+from app.core.config import settings
+
+ZLIB = b"\x01"
+ZSTD = b"\x02"
+
+_lock = threading.Lock()
+_dictionaries: Dict[int, "zstandard.ZstdCompressionDict"] = {}
+_active_dict_id: Optional[int] = None
+_loaded = False
+
+def _load_dictionaries() -> None:
+    """Read every stored dictionary; the newest one compresses new bodies."""
+    global _active_dict_id, _loaded
+    # Imported here: the models import this module
+    from app.db.database import SessionLocal
+    from app.models.note import ContentDictionary
+
+    db = SessionLocal()
+    try:
+        rows = db.query(ContentDictionary.dict_id, ContentDictionary.data).order_by(ContentDictionary.id).all()
+    finally:
+        db.close()
+    with _lock:
+        for dict_id, data in rows:
+            if dict_id not in _dictionaries:
+                dictionary = zstandard.ZstdCompressionDict(data)
+                dictionary.precompute_compress(level=settings.CONTENT_ZSTD_LEVEL)
+                _dictionaries[dict_id] = dictionary
+        _active_dict_id = rows[-1][0] if rows else None
+        _loaded = True
+
+def reload_dictionaries() -> None:
+    if zstandard is not None:
+        _load_dictionaries()
+
+def _active_dictionary():
+    if not _loaded:
+        _load_dictionaries()
+    return _dictionaries.get(_active_dict_id) if _active_dict_id is not None else None
+
+def _dictionary(dict_id: int):
+    if dict_id not in _dictionaries:
+        # Trained by another process since we last looked
+        _load_dictionaries()
+    return _dictionaries[dict_id]
+
+def encode(text: Optional[str]) -> Optional[bytes]:
+    """Compressed form of ``text``, or None when it should be stored as-is."""
+    if not text or not settings.CONTENT_COMPRESSION_ENABLED:
+        return None
+    raw = text.encode()
+    if len(raw) < settings.CONTENT_COMPRESSION_MIN_BYTES:
+        return None
+    if zstandard is not None:
+        dictionary = _active_dictionary()
+        if dictionary is not None:
+            compressor = zstandard.ZstdCompressor(dict_data=dictionary, level=settings.CONTENT_ZSTD_LEVEL)
+        else:
+            compressor = zstandard.ZstdCompressor(level=settings.CONTENT_ZSTD_LEVEL)
+        encoded = ZSTD + compressor.compress(raw)
+    else:
+        encoded = ZLIB + zlib.compress(raw, 6)
+    # Incompressible bodies (already-compressed pastes) are not worth decoding
+    return encoded if len(encoded) < len(raw) else None
+
+def decode(data: bytes) -> str:
+    codec, payload = data[:1], data[1:]
+    if codec == ZLIB:
+        return zlib.decompress(payload).decode()
+    if codec == ZSTD:
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read zstd-compressed note content")
+        dict_id = zstandard.get_frame_parameters(payload).dict_id
+        dictionary = _dictionary(dict_id) if dict_id else None
+        decompressor = zstandard.ZstdDecompressor(dict_data=dictionary) if dictionary else zstandard.ZstdDecompressor()
+        return decompressor.decompress(payload).decode()
+    raise ValueError(f"Unknown content codec {codec!r}")
+
+def train_dictionary(samples, size: Optional[int] = None) -> "zstandard.ZstdCompressionDict":
+    if zstandard is None:
+        raise RuntimeError("zstandard is required to train a dictionary")
+    return zstandard.train_dictionary(size or settings.CONTENT_DICTIONARY_SIZE, [sample.encode() for sample in samples])
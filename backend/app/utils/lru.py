@@ -0,0 +1,64 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+_MISSING = object()
+
+class LRUCache:
+    """Thread-safe LRU cache bounded by total entry size, with optional TTL."""
+
+    def __init__(
+        self,
+        max_size: int,
+        ttl: Optional[float] = None,
+        sizeof: Callable[[Any], int] = lambda value: 1,
+    ):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.sizeof = sizeof
+        self.size = 0
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is _MISSING:
+                return default
+            value, size, expires_at = entry
+            if expires_at is not None and time.monotonic() >= expires_at:
+                del self._entries[key]
+                self.size -= size
+                return default
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        size = self.sizeof(value)
+        if size > self.max_size:
+            return
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            previous = self._entries.pop(key, _MISSING)
+            if previous is not _MISSING:
+                self.size -= previous[1]
+            self._entries[key] = (value, size, expires_at)
+            self.size += size
+            while self.size > self.max_size:
+                _, (_, evicted_size, _) = self._entries.popitem(last=False)
+                self.size -= evicted_size
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            entry = self._entries.pop(key, _MISSING)
+            if entry is not _MISSING:
+                self.size -= entry[1]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,78 @@
+"""MinHash signatures of note text, computed with NumPy."""
+import re
+import zlib
+from typing import Optional
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+from app.core.config import settings
+
+_WORD = re.compile(r"\w+")
+# Shingles are hashed this many at a time to bound the (perm x shingle) matrix
+_CHUNK = 4096
+_SEED = 0x5EED
+
+_params = None
+
+def _hash_params():
+    global _params
+    if _params is None:
+        rng = np.random.default_rng(_SEED)
+        # Odd multipliers make (a * x + b) >> 32 a multiply-shift hash family
+        a = rng.integers(1, 2 ** 63, size=settings.SIMILARITY_NUM_PERM, dtype=np.uint64) | np.uint64(1)
+        b = rng.integers(0, 2 ** 63, size=settings.SIMILARITY_NUM_PERM, dtype=np.uint64)
+        _params = (a[:, None], b[:, None])
+    return _params
+
+def shingles(text: str) -> "np.ndarray":
+    """Distinct 64-bit hashes of the word n-grams of ``text``."""
+    words = _WORD.findall(text.lower())
+    if not words:
+        return np.empty(0, dtype=np.uint64)
+    codes = {}
+    hashes = np.fromiter(
+        (codes.setdefault(word, zlib.crc32(word.encode())) for word in words),
+        dtype=np.uint64, count=len(words)
+    )
+    size = min(settings.SIMILARITY_SHINGLE_WORDS, len(hashes))
+    combined = hashes[:len(hashes) - size + 1].copy()
+    for offset in range(1, size):
+        combined = combined * np.uint64(0x9E3779B97F4A7C15) + hashes[offset:len(hashes) - size + 1 + offset]
+    return np.unique(combined)
+
+def signature(text: Optional[str]) -> Optional["np.ndarray"]:
+    """uint32 MinHash signature of ``text``, or None when it has no words."""
+    if np is None or not text:
+        return None
+    values = shingles(text)
+    if not len(values):
+        return None
+    a, b = _hash_params()
+    result = np.full(settings.SIMILARITY_NUM_PERM, np.iinfo(np.uint32).max, dtype=np.uint64)
+    with np.errstate(over="ignore"):
+        for start in range(0, len(values), _CHUNK):
+            hashed = (a * values[start:start + _CHUNK] + b) >> np.uint64(32)
+            np.minimum(result, hashed.min(axis=1), out=result)
+    return result.astype(np.uint32)
+
+def to_bytes(sig: "np.ndarray") -> bytes:
+    return sig.astype("<u4").tobytes()
+
+def from_bytes(data: bytes) -> "np.ndarray":
+    return np.frombuffer(data, dtype="<u4").astype(np.uint32)
+
+def band_hashes(signatures: "np.ndarray") -> "np.ndarray":
+    """(n, bands) uint32 hashes of each band of an (n, num_perm) signature matrix."""
+    rows = signatures.shape[1] // settings.SIMILARITY_BANDS
+    bands = signatures[:, :rows * settings.SIMILARITY_BANDS].reshape(
+        len(signatures), settings.SIMILARITY_BANDS, rows
+    ).astype(np.uint64)
+    combined = np.zeros(bands.shape[:2], dtype=np.uint64)
+    with np.errstate(over="ignore"):
+        for row in range(rows):
+            combined = combined * np.uint64(0x100000001B3) + bands[:, :, row]
+    # Collisions only add candidates; every candidate is scored on its full signature
+    return (combined ^ (combined >> np.uint64(32))).astype(np.uint32)
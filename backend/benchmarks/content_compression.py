@@ -0,0 +1,117 @@
+"""Benchmark compression of note bodies at rest: ``python -m benchmarks.content_compression``."""
+import argparse
+import json
+import math
+import random
+import time
+import zlib
+from pathlib import Path
+
+def _log_lines(rng: random.Random, size: int) -> str:
+    levels = ["INFO", "INFO", "INFO", "DEBUG", "WARN", "ERROR"]
+    services = ["api", "worker", "scheduler", "auth", "billing"]
+    lines = []
+    length = 0
+    while length < size:
+        line = (
+            f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T{rng.randint(0, 23):02d}:"
+            f"{rng.randint(0, 59):02d}:{rng.randint(0, 59):02d}.{rng.randint(0, 999):03d}Z "
+            f"{rng.choice(levels)} [{rng.choice(services)}] request_id={rng.getrandbits(64):016x} "
+            f"duration_ms={rng.randint(1, 5000)} status={rng.choice([200, 200, 201, 404, 500])}"
+        )
+        lines.append(line)
+        length += len(line) + 1
+    return "\n".join(lines)
+
+def _synthetic(count: int, median: int, seed: int):
+    from benchmarks.render import _document
+    rng = random.Random(seed)
+    documents = []
+    for _ in range(count):
+        size = max(64, int(rng.lognormvariate(math.log(median), 1.2)))
+        documents.append(_log_lines(rng, size) if rng.random() < 0.3 else _document(rng, size))
+    return documents
+
+def _load_corpus(path: str):
+    files = sorted(p for p in Path(path).expanduser().rglob("*") if p.suffix in (".md", ".txt"))
+    return [p.read_text(errors="replace") for p in files]
+
+def _measure(name, encode, decode, bodies):
+    stored = 0
+    encoded_bodies = []
+    start = time.perf_counter()
+    for body in bodies:
+        encoded = encode(body)
+        encoded_bodies.append(encoded)
+        stored += len(encoded)
+    encode_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    for encoded in encoded_bodies:
+        decode(encoded)
+    decode_seconds = time.perf_counter() - start
+    return {
+        "codec": name,
+        "stored_bytes": stored,
+        "encode_us_per_body": round(encode_seconds / len(bodies) * 1e6, 1),
+        "decode_us_per_body": round(decode_seconds / len(bodies) * 1e6, 1),
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=2000)
+    parser.add_argument("--median-size", type=int, default=3000)
+    parser.add_argument("--corpus", default=None, help="Directory of .md/.txt files to use instead")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    from app.core.config import settings
+    from app.utils import content_codec
+
+    documents = _load_corpus(args.corpus) if args.corpus else _synthetic(args.documents, args.median_size, args.seed)
+    random.Random(args.seed).shuffle(documents)
+    training, measured = documents[::2], documents[1::2]
+    large = [d.encode() for d in measured if len(d.encode()) >= settings.CONTENT_COMPRESSION_MIN_BYTES]
+    if not large:
+        raise SystemExit("No body reaches CONTENT_COMPRESSION_MIN_BYTES")
+    raw_total = sum(len(d.encode()) for d in measured)
+    large_total = sum(len(d) for d in large)
+
+    results = [
+        _measure("none", lambda b: b, lambda b: b, large),
+        _measure("zlib-6", lambda b: zlib.compress(b, 6), zlib.decompress, large),
+    ]
+    zstandard = content_codec.zstandard
+    if zstandard is not None:
+        level = settings.CONTENT_ZSTD_LEVEL
+        plain_c, plain_d = zstandard.ZstdCompressor(level=level), zstandard.ZstdDecompressor()
+        results.append(_measure(f"zstd-{level}", plain_c.compress, plain_d.decompress, large))
+
+        start = time.perf_counter()
+        dictionary = content_codec.train_dictionary(
+            [d for d in training if len(d.encode()) >= settings.CONTENT_COMPRESSION_MIN_BYTES] or training
+        )
+        train_seconds = time.perf_counter() - start
+        dictionary.precompute_compress(level=level)
+        dict_c = zstandard.ZstdCompressor(dict_data=dictionary, level=level)
+        dict_d = zstandard.ZstdDecompressor(dict_data=dictionary)
+        dict_result = _measure(f"zstd-{level}+dict", dict_c.compress, dict_d.decompress, large)
+        dict_result["train_seconds"] = round(train_seconds, 2)
+        dict_result["dictionary_bytes"] = len(dictionary.as_bytes())
+        results.append(dict_result)
+
+    for result in results:
+        result["ratio"] = round(large_total / result["stored_bytes"], 2)
+        # Small bodies stay uncompressed, so table savings are diluted by them
+        result["table_bytes_saved_pct"] = round((large_total - result["stored_bytes"]) / raw_total * 100, 1)
+
+    print(json.dumps({
+        "documents": len(measured),
+        "compressed_documents": len(large),
+        "min_bytes": settings.CONTENT_COMPRESSION_MIN_BYTES,
+        "raw_bytes": raw_total,
+        "large_body_bytes": large_total,
+        "codecs": results,
+    }, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+import random
+from dataclasses import dataclass, asdict
+from sqlalchemy import insert, select, update
+from sqlalchemy.orm import Session
+from app.core.security import get_password_hash
+from app.models.user import User
+from app.models.note import Note, Tag, NoteAccess, AccessRoleEnum, VisibilityEnum, note_tags, note_shares
+from app.db.backfill import backfill_user_tags
+
+BENCH_PASSWORD = "bench-password"
+
+@dataclass
+class DatasetConfig:
+    users: int = 20
+    notes_per_user: int = 50
+    tags: int = 30
+    tags_per_note: int = 2
+    share_fanout: int = 3
+    public_ratio: float = 0.1
+    content_size: int = 2000
+    seed: int = 42
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+@dataclass
+class Dataset:
+    emails: list
+    note_ids: list
+    public_tokens: list
+
+def _email(index: int) -> str:
+    return f"bench{index}@example.com"
+
+def seed_dataset(db: Session, config: DatasetConfig) -> Dataset:
+    """Insert a reproducible dataset (same config, same rows) with bulk core inserts."""
+    rng = random.Random(config.seed)
+    hashed_password = get_password_hash(BENCH_PASSWORD)
+    emails = [_email(i) for i in range(config.users)]
+
+    db.execute(insert(User), [
+        {"email": email, "name": f"Bench User {i}", "hashed_password": hashed_password, "is_active": True}
+        for i, email in enumerate(emails)
+    ])
+    user_ids = db.execute(select(User.id).where(User.email.in_(emails)).order_by(User.id)).scalars().all()
+
+    tag_names = [f"bench-tag-{i}" for i in range(config.tags)]
+    if tag_names:
+        db.execute(insert(Tag), [{"name": name} for name in tag_names])
+    tag_ids = db.execute(select(Tag.id).where(Tag.name.in_(tag_names))).scalars().all()
+
+    word_pool = ["lorem", "ipsum", "dolor", "sit", "amet", "markdown", "note", "team", "project", "draft"]
+    note_rows = []
+    for owner_id in user_ids:
+        for n in range(config.notes_per_user):
+            public = rng.random() < config.public_ratio
+            words = " ".join(rng.choice(word_pool) for _ in range(config.content_size // 6))
+            note_rows.append({
+                "title": f"Bench note {owner_id}-{n} {rng.choice(word_pool)}",
+                "content": f"# Note {n}\n\n{words}",
+                "visibility": VisibilityEnum.PUBLIC if public else VisibilityEnum.PRIVATE,
+                "owner_id": owner_id,
+                "public_token": f"bench-{owner_id}-{n}" if public else None,
+            })
+    if note_rows:
+        db.execute(insert(Note), note_rows)
+    notes = db.execute(
+        select(Note.id, Note.owner_id, Note.public_token).where(Note.owner_id.in_(user_ids)).order_by(Note.id)
+    ).all()
+
+    tag_rows, share_rows, access_rows = [], [], []
+    for note_id, owner_id, _ in notes:
+        access_rows.append({"user_id": owner_id, "note_id": note_id, "note_owner_id": owner_id, "role": AccessRoleEnum.OWNER})
+        for tag_id in rng.sample(tag_ids, min(config.tags_per_note, len(tag_ids))):
+            tag_rows.append({"note_id": note_id, "tag_id": tag_id})
+        others = [uid for uid in user_ids if uid != owner_id]
+        for user_id in rng.sample(others, min(config.share_fanout, len(others))):
+            share_rows.append({"note_id": note_id, "user_id": user_id})
+            access_rows.append({
+                "user_id": user_id, "note_id": note_id, "note_owner_id": owner_id, "role": AccessRoleEnum.SHARED
+            })
+
+    if tag_rows:
+        db.execute(insert(note_tags), tag_rows)
+    if share_rows:
+        db.execute(insert(note_shares), share_rows)
+        shared_ids = {row["note_id"] for row in share_rows}
+        db.execute(
+            update(Note)
+            .where(Note.id.in_(shared_ids), Note.visibility == VisibilityEnum.PRIVATE)
+            .values(visibility=VisibilityEnum.SHARED)
+        )
+    if access_rows:
+        db.execute(insert(NoteAccess), access_rows)
+    db.commit()
+    backfill_user_tags(db)
+
+    return Dataset(
+        emails=emails,
+        note_ids=[note_id for note_id, _, _ in notes],
+        public_tokens=[token for _, _, token in notes if token],
+    )
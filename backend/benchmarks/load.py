@@ -0,0 +1,110 @@
+import asyncio
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional
+from sqlalchemy import event
+
+class SQLCounter:
+    """Counts statements sent through an engine while attached."""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        with self._lock:
+            self.count += 1
+
+    def __enter__(self):
+        event.listen(self.engine, "before_cursor_execute", self._on_execute)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, "before_cursor_execute", self._on_execute)
+
+@dataclass
+class Scenario:
+    name: str
+    method: str
+    # Builds (path, json_body) for one request; receives the worker's rng
+    build: Callable
+    auth: bool = True
+
+@dataclass
+class ScenarioResult:
+    name: str
+    requests: int = 0
+    errors: int = 0
+    client_errors: int = 0
+    elapsed: float = 0.0
+    latencies: List[float] = field(default_factory=list)
+    sql_statements: Optional[int] = None
+
+    @staticmethod
+    def _percentile(values: List[float], pct: float) -> float:
+        if not values:
+            return 0.0
+        ordered = sorted(values)
+        index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def summary(self) -> dict:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "client_errors": self.client_errors,
+            "throughput_rps": round(self.requests / self.elapsed, 2) if self.elapsed else 0.0,
+            "p50_ms": round(self._percentile(self.latencies, 50) * 1000, 3),
+            "p95_ms": round(self._percentile(self.latencies, 95) * 1000, 3),
+            "p99_ms": round(self._percentile(self.latencies, 99) * 1000, 3),
+            "sql_per_request": (
+                round(self.sql_statements / self.requests, 2)
+                if self.sql_statements is not None and self.requests else None
+            ),
+        }
+
+async def run_scenario(
+    client,
+    scenario: Scenario,
+    tokens: List[str],
+    requests: int,
+    concurrency: int,
+    seed: int,
+    sql_counter: Optional[SQLCounter] = None,
+) -> ScenarioResult:
+    """Fire ``requests`` calls for one scenario from ``concurrency`` workers."""
+    result = ScenarioResult(name=scenario.name)
+    remaining = [requests]
+
+    async def worker(worker_id: int):
+        rng = random.Random(seed * 1000 + worker_id)
+        while remaining[0] > 0:
+            remaining[0] -= 1
+            path, body = scenario.build(rng)
+            headers = {}
+            if scenario.auth and tokens:
+                headers["Authorization"] = f"Bearer {rng.choice(tokens)}"
+            start = time.perf_counter()
+            try:
+                response = await client.request(scenario.method, path, json=body, headers=headers)
+                status_code = response.status_code
+            except Exception:
+                status_code = None
+            result.latencies.append(time.perf_counter() - start)
+            result.requests += 1
+            if status_code is None or status_code >= 500:
+                result.errors += 1
+            elif status_code >= 400:
+                # e.g. 403 on a random note the token's user cannot see
+                result.client_errors += 1
+
+    before = sql_counter.count if sql_counter else None
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    result.elapsed = time.perf_counter() - start
+    if sql_counter is not None:
+        result.sql_statements = sql_counter.count - before
+    return result
@@ -0,0 +1,51 @@
+"""Measure the per-request cost of MetricsMiddleware: ``python -m benchmarks.metrics_overhead``."""
+import argparse
+import asyncio
+import json
+import time
+
+async def _noop_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+async def _drive(app, requests: int) -> float:
+    scope = {"type": "http", "method": "GET", "path": "/bench", "headers": []}
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    start = time.perf_counter()
+    for _ in range(requests):
+        # Fresh scope per request, as the server would provide
+        await app(dict(scope), receive, send)
+    return time.perf_counter() - start
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=50000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    from app.core.metrics import MetricsMiddleware
+
+    instrumented = MetricsMiddleware(_noop_app)
+    baseline_runs, instrumented_runs = [], []
+    for _ in range(args.rounds):
+        baseline_runs.append(asyncio.run(_drive(_noop_app, args.requests)))
+        instrumented_runs.append(asyncio.run(_drive(instrumented, args.requests)))
+
+    baseline = min(baseline_runs) / args.requests
+    with_metrics = min(instrumented_runs) / args.requests
+    print(json.dumps({
+        "requests": args.requests,
+        "rounds": args.rounds,
+        "baseline_us": round(baseline * 1e6, 3),
+        "instrumented_us": round(with_metrics * 1e6, 3),
+        "overhead_us": round((with_metrics - baseline) * 1e6, 3),
+    }, indent=2))
+
+if __name__ == "__main__":
+    main()
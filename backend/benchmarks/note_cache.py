@@ -0,0 +1,170 @@
+"""Benchmark the note cache and check it never serves a stale read: ``python -m benchmarks.note_cache``."""
+import argparse
+import json
+import os
+import random
+import time
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default="sqlite:///./bench_note_cache.db", help="dropped and recreated: never real data")
+    parser.add_argument("--notes", type=int, default=500)
+    parser.add_argument("--readers", type=int, default=200)
+    parser.add_argument("--groups", type=int, default=10)
+    parser.add_argument("--operations", type=int, default=20000)
+    parser.add_argument("--write-ratio", type=float, default=0.02)
+    parser.add_argument("--foreign-ratio", type=float, default=0.05, help="Share of reads by any reader")
+    parser.add_argument("--unshare-ratio", type=float, default=0.3, help="Share of writes that unshare or reshare")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--backend", choices=("local", "none"), default="local")
+    parser.add_argument("--sync-every", type=int, default=100, help="Operations between syncs with --backend none")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    # The app reads DATABASE_URL at import time, so set it before importing anything from app
+    os.environ["DATABASE_URL"] = args.database_url
+
+    from fastapi import HTTPException
+    from app.core import metrics
+    from app.core.config import settings
+    from app.db.database import Base, engine, SessionLocal
+    from app.db.generate_data import ZipfSampler
+    from app.models import user, note, group, notebook, notification, token  # noqa: F401
+    from app.models.group import Group, GroupMember, NoteGroupShare
+    from app.models.note import Note, NoteAccess, AccessRoleEnum, VisibilityEnum
+    from app.models.user import User
+    from app.schemas.group import NoteGroupShare as NoteGroupShareCreate
+    from app.schemas.note import NoteUpdate
+    from app.services import notes as notes_module
+    from app.services.note_cache import LocalBackend, NoteCache
+    from app.services.notes import NotesService
+
+    # Off by default without a module:factory backend; the workers here are in-process
+    settings.NOTE_CACHE_ENABLED = True
+    rng = random.Random(args.seed)
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        owner = User(email="owner@bench", hashed_password="x")
+        db.add(owner)
+        db.flush()
+        groups = [Group(name=f"group {i}", owner_id=owner.id) for i in range(args.groups)]
+        db.add_all(groups)
+        db.flush()
+        group_ids = [group.id for group in groups]
+        db.bulk_insert_mappings(User, [
+            {"email": f"reader{i}@bench", "hashed_password": "x", "is_active": True}
+            for i in range(args.readers)
+        ])
+        db.bulk_insert_mappings(Note, [
+            {"title": "v0", "content": "x" * rng.randint(100, 4000), "owner_id": owner.id,
+             "visibility": VisibilityEnum.SHARED}
+            for _ in range(args.notes)
+        ])
+        db.flush()
+        reader_ids = [user_id for (user_id,) in db.query(User.id).filter(User.id != owner.id)]
+        note_ids = [note_id for (note_id,) in db.query(Note.id).order_by(Note.id)]
+        # Each reader is in one group and each note shared with one group
+        reader_group = {reader_id: group_ids[i % args.groups] for i, reader_id in enumerate(reader_ids)}
+        members = {group_id: [r for r, g in reader_group.items() if g == group_id] for group_id in group_ids}
+        note_group = {note_id: group_ids[i % args.groups] for i, note_id in enumerate(note_ids)}
+        db.bulk_insert_mappings(GroupMember, [{"group_id": group_id, "user_id": owner.id} for group_id in group_ids])
+        db.bulk_insert_mappings(GroupMember, [
+            {"group_id": group_id, "user_id": reader_id} for reader_id, group_id in reader_group.items()
+        ])
+        db.bulk_insert_mappings(NoteAccess, [
+            {"user_id": owner.id, "note_id": note_id, "note_owner_id": owner.id, "role": AccessRoleEnum.OWNER}
+            for note_id in note_ids
+        ])
+        db.bulk_insert_mappings(NoteGroupShare, [
+            {"note_id": note_id, "group_id": group_id} for note_id, group_id in note_group.items()
+        ])
+        db.commit()
+        users = {user.id: user for user in db.query(User)}
+
+        titles = {note_id: "v0" for note_id in note_ids}
+        shared = {note_id: True for note_id in note_ids}
+        backend = LocalBackend() if args.backend == "local" else None
+        caches = [NoteCache(backend) for _ in range(args.workers)]
+        sampler = ZipfSampler(len(note_ids), 1.1, rng)
+
+        def read(cache, note_id, reader_id):
+            """Read through ``cache``; True when the result matches what was last written."""
+            notes_module.note_cache = cache
+            start = time.perf_counter()
+            try:
+                body = json.loads(NotesService.get_note_cached(db, note_id, users[reader_id]).body)
+                allowed = True
+            except HTTPException:
+                allowed = False
+            elapsed = time.perf_counter() - start
+            db.rollback()
+            expected = shared[note_id] and reader_group[reader_id] == note_group[note_id]
+            fresh = allowed == expected and (not allowed or body["title"] == titles[note_id])
+            return fresh, elapsed
+
+        reads = stale = version = 0
+        read_seconds = 0.0
+        for operation in range(args.operations):
+            cache = caches[rng.randrange(args.workers)]
+            note_id = note_ids[sampler.sample()]
+            if backend is None and operation % args.sync_every == 0:
+                for worker in caches:
+                    worker.sync(db)
+            if rng.random() >= args.write_ratio:
+                if rng.random() < args.foreign_ratio:
+                    reader_id = rng.choice(reader_ids)
+                else:
+                    reader_id = rng.choice(members[note_group[note_id]])
+                fresh, elapsed = read(cache, note_id, reader_id)
+                reads += 1
+                stale += not fresh
+                read_seconds += elapsed
+                continue
+            notes_module.note_cache = cache
+            if rng.random() < args.unshare_ratio:
+                if shared[note_id]:
+                    NotesService.unshare_note_with_group(db, note_id, note_group[note_id], owner)
+                else:
+                    NotesService.share_note_with_group(
+                        db, note_id, NoteGroupShareCreate(group_id=note_group[note_id]), owner
+                    )
+                shared[note_id] = not shared[note_id]
+            else:
+                version += 1
+                NotesService.update_note(db, note_id, NoteUpdate(title=f"v{version}"), owner)
+                titles[note_id] = f"v{version}"
+
+        def ratio(cache_name):
+            hits = metrics.CACHE.value(cache_name, "hit")
+            total = hits + metrics.CACHE.value(cache_name, "miss")
+            return round(hits / total, 4) if total else None
+
+        settings.NOTE_CACHE_ENABLED = False
+        uncached_reads = min(reads, 2000)
+        uncached_seconds = 0.0
+        for _ in range(uncached_reads):
+            note_id = note_ids[sampler.sample()]
+            uncached_seconds += read(caches[0], note_id, rng.choice(members[note_group[note_id]]))[1]
+    finally:
+        db.close()
+
+    print(json.dumps({
+        "database": engine.dialect.name,
+        "backend": args.backend,
+        "workers": args.workers,
+        "notes": args.notes,
+        "operations": args.operations,
+        "reads": reads,
+        "writes": args.operations - reads,
+        "stale_reads": stale,
+        "note_hit_ratio": ratio("note"),
+        "note_shared_hit_ratio": ratio("note_shared"),
+        "note_access_hit_ratio": ratio("note_access"),
+        "cached_read_us": round(read_seconds / reads * 1e6, 1) if reads else None,
+        "uncached_read_us": round(uncached_seconds / uncached_reads * 1e6, 1) if uncached_reads else None,
+    }, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""Benchmark the notification outbox and digest dispatcher: ``python -m benchmarks.notifications``."""
+import argparse
+import json
+import os
+import random
+import time
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default="sqlite:///./bench_notifications.db", help="dropped and recreated: never real data")
+    parser.add_argument("--readers", type=int, default=500)
+    parser.add_argument("--notes", type=int, default=200)
+    parser.add_argument("--fanout", type=int, default=20)
+    parser.add_argument("--writes", type=int, default=5000)
+    parser.add_argument("--share-ratio", type=float, default=0.1)
+    parser.add_argument("--sink-latency-ms", type=float, default=0.0)
+    parser.add_argument("--sink-capacity", type=int, default=0, help="Digests per cycle before SinkBusy (0: unlimited)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    # The app reads DATABASE_URL at import time, so set it before importing anything from app
+    os.environ["DATABASE_URL"] = args.database_url
+
+    from app.core.config import settings
+    from app.db.database import Base, engine, SessionLocal
+    from app.db.generate_data import ZipfSampler
+    from app.models import user, group, notebook  # noqa: F401
+    from app.models.note import Note, NoteAccess, AccessRoleEnum, VisibilityEnum
+    from app.models.notification import OutboxEvent
+    from app.models.user import User
+    from app.services import notifications
+    from app.services.notifications import NotificationDispatcher, Outbox, SinkBusy
+
+    class BenchSink:
+        def __init__(self):
+            self.cycle = 0
+            self.sent = 0
+
+        def send(self, digest):
+            if args.sink_capacity and self.cycle >= args.sink_capacity:
+                raise SinkBusy("capacity reached")
+            if args.sink_latency_ms:
+                time.sleep(args.sink_latency_ms / 1000)
+            self.cycle += 1
+            self.sent += 1
+
+        def close(self):
+            self.cycle = 0
+
+    rng = random.Random(args.seed)
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        owner = User(email="owner@bench", hashed_password="x")
+        db.add(owner)
+        db.flush()
+        db.bulk_insert_mappings(User, [
+            {"email": f"reader{i}@bench", "hashed_password": "x", "email_notifications": True,
+             "browser_notifications": i % 2 == 0, "is_active": True}
+            for i in range(args.readers)
+        ])
+        db.bulk_insert_mappings(Note, [
+            {"title": f"note {i}", "owner_id": owner.id, "visibility": VisibilityEnum.SHARED}
+            for i in range(args.notes)
+        ])
+        db.commit()
+        reader_ids = [user_id for (user_id,) in db.query(User.id).filter(User.id != owner.id)]
+        notes = db.query(Note).all()
+        db.bulk_insert_mappings(NoteAccess, [
+            {"user_id": reader_id, "note_id": note.id, "note_owner_id": owner.id, "role": AccessRoleEnum.SHARED}
+            for note in notes for reader_id in rng.sample(reader_ids, min(args.fanout, len(reader_ids)))
+        ])
+        db.commit()
+
+        sampler = ZipfSampler(len(notes), 1.1, rng)
+        start = time.perf_counter()
+        for _ in range(args.writes):
+            note = notes[sampler.sample()]
+            if rng.random() < args.share_ratio:
+                Outbox.note_shared(db, note, owner.id, [rng.choice(reader_ids)])
+            else:
+                Outbox.note_updated(db, note, owner.id)
+            db.commit()
+        write_seconds = time.perf_counter() - start
+        outbox_rows = db.query(OutboxEvent).count()
+
+        settings.NOTIFICATION_DIGEST_SECONDS = 0
+        sink = BenchSink()
+        notifications._sinks.update({notifications.EMAIL: sink, notifications.PUSH: sink})
+        cycles = busy_cycles = delivered = 0
+        start = time.perf_counter()
+        while True:
+            result = NotificationDispatcher.dispatch(db)
+            cycles += 1
+            busy_cycles += result["busy"]
+            delivered += result["delivered"]
+            if not result["events"]:
+                break
+        dispatch_seconds = time.perf_counter() - start
+    finally:
+        db.close()
+
+    print(json.dumps({
+        "database": engine.dialect.name,
+        "readers": args.readers,
+        "notes": args.notes,
+        "fanout": args.fanout,
+        "writes": args.writes,
+        "outbox_write_ms": round(write_seconds / args.writes * 1000, 3),
+        "outbox_rows": outbox_rows,
+        "outbox_rows_per_write": round(outbox_rows / args.writes, 2),
+        "delivered_events": delivered,
+        "digests": sink.sent,
+        "dispatch_cycles": cycles,
+        "busy_cycles": busy_cycles,
+        "dispatch_events_per_second": round(delivered / dispatch_seconds) if dispatch_seconds else None,
+        "dispatch_digests_per_second": round(sink.sent / dispatch_seconds) if dispatch_seconds else None,
+    }, indent=2))
+
+if __name__ == "__main__":
+    main()
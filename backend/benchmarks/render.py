@@ -0,0 +1,82 @@
+"""Benchmark markdown rendering throughput and render-cache hit rates: ``python -m benchmarks.render``."""
+import argparse
+import json
+import random
+import time
+
+def _document(rng: random.Random, size: int) -> str:
+    words = ["note", "team", "release", "api", "draft", "review", "customer", "idea"]
+    parts = []
+    length = 0
+    while length < size:
+        kind = rng.random()
+        if kind < 0.1:
+            part = "## " + " ".join(rng.choice(words) for _ in range(4))
+        elif kind < 0.3:
+            part = "\n".join(f"- {rng.choice(words)} **{rng.choice(words)}**" for _ in range(5))
+        elif kind < 0.35:
+            part = "```\n" + "\n".join(f"x = {i}" for i in range(5)) + "\n```"
+        elif kind < 0.4:
+            part = "| a | b |\n|---|---|\n| " + rng.choice(words) + " | [link](https://example.com) |"
+        else:
+            part = " ".join(rng.choice(words) for _ in range(40))
+        parts.append(part)
+        length += len(part)
+    return "\n\n".join(parts)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=2000)
+    parser.add_argument("--median-size", type=int, default=2000)
+    parser.add_argument("--views", type=int, default=50000)
+    parser.add_argument("--zipf-s", type=float, default=1.1)
+    parser.add_argument("--cache-mb", type=float, default=16)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    from app.services import render
+    from app.services.render import RenderService
+    from app.db.generate_data import ZipfSampler
+
+    rng = random.Random(args.seed)
+    documents = [
+        _document(rng, max(50, int(rng.lognormvariate(0, 1) * args.median_size)))
+        for _ in range(args.documents)
+    ]
+    total_bytes = sum(len(d) for d in documents)
+
+    start = time.perf_counter()
+    for document in documents:
+        RenderService.render(document)
+    render_seconds = time.perf_counter() - start
+
+    render._cache.clear()
+    render._cache.max_size = int(args.cache_mb * 1024 * 1024)
+    sampler = ZipfSampler(len(documents), args.zipf_s, rng)
+    hashes = [RenderService.content_hash(d) for d in documents]
+    hits = 0
+    start = time.perf_counter()
+    for _ in range(args.views):
+        index = sampler.sample()
+        if render._cache.get(hashes[index]) is not None:
+            hits += 1
+        else:
+            render._cache.set(hashes[index], RenderService.render(documents[index]))
+    view_seconds = time.perf_counter() - start
+
+    print(json.dumps({
+        "markdown_backend": "markdown-it" if render._markdown is not None else "escaped-pre",
+        "sanitizer": "nh3" if render.nh3 is not None else None,
+        "documents": args.documents,
+        "document_mb": round(total_bytes / 1024 / 1024, 2),
+        "renders_per_second": round(args.documents / render_seconds, 1),
+        "render_mb_per_second": round(total_bytes / 1024 / 1024 / render_seconds, 2),
+        "views": args.views,
+        "cache_mb": args.cache_mb,
+        "hit_rate": round(hits / args.views, 4),
+        "views_per_second": round(args.views / view_seconds, 1),
+        "mean_view_us": round(view_seconds / args.views * 1e6, 2),
+    }, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""Benchmark the API endpoints against a freshly seeded database: ``python -m benchmarks.run``."""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+def _parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default="sqlite:///./bench.db", help="dropped and recreated: never real data")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--notes-per-user", type=int, default=50)
+    parser.add_argument("--tags", type=int, default=30)
+    parser.add_argument("--tags-per-note", type=int, default=2)
+    parser.add_argument("--share-fanout", type=int, default=3)
+    parser.add_argument("--public-ratio", type=float, default=0.1)
+    parser.add_argument("--content-size", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--requests", type=int, default=500, help="Requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--scenarios", nargs="*", help="Only run these scenarios")
+    parser.add_argument("--output", help="Write JSON results to this file instead of stdout")
+    return parser.parse_args(argv)
+
+def _git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            stderr=subprocess.DEVNULL,
+            text=True,
+        ).strip()
+    except Exception:
+        return None
+
+def _build_scenarios(dataset):
+    from benchmarks.load import Scenario
+
+    note_ids = dataset.note_ids
+    tokens = dataset.public_tokens
+    return [
+        Scenario("auth.login", "POST", lambda rng: (
+            "/api/auth/login",
+            {"email": rng.choice(dataset.emails), "password": "bench-password"},
+        ), auth=False),
+        Scenario("auth.me", "GET", lambda rng: ("/api/auth/me", None)),
+        Scenario("notes.list", "GET", lambda rng: ("/api/notes/", None)),
+        Scenario("notes.search", "GET", lambda rng: (
+            f"/api/notes/?search={rng.choice(['lorem', 'draft', 'bench-tag-1'])}", None
+        )),
+        Scenario("notes.explore", "GET", lambda rng: ("/api/notes/explore", None)),
+        Scenario("notes.get", "GET", lambda rng: (f"/api/notes/{rng.choice(note_ids)}", None)),
+        Scenario("notes.create", "POST", lambda rng: (
+            "/api/notes/",
+            {"title": f"load {rng.random()}", "content": "# Load\n\nbody", "tags": ["load"]},
+        )),
+        Scenario("public.get", "GET", lambda rng: (
+            f"/api/public/notes/{rng.choice(tokens)}" if tokens else "/api/public/notes/missing", None
+        ), auth=False),
+        Scenario("users.me", "GET", lambda rng: ("/api/users/me", None)),
+    ]
+
+async def _run(args, dataset, scenarios):
+    import httpx
+    from app.main import app
+    from app.db.database import engine
+    from benchmarks.load import SQLCounter, run_scenario
+    from benchmarks.dataset import BENCH_PASSWORD
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        tokens = []
+        for email in dataset.emails[: min(len(dataset.emails), 50)]:
+            response = await client.post("/api/auth/login", json={"email": email, "password": BENCH_PASSWORD})
+            response.raise_for_status()
+            tokens.append(response.json()["access_token"])
+
+        results = {}
+        with SQLCounter(engine) as counter:
+            for scenario in scenarios:
+                result = await run_scenario(
+                    client, scenario, tokens, args.requests, args.concurrency, args.seed, counter
+                )
+                results[scenario.name] = result.summary()
+                print(f"{scenario.name:16s} {results[scenario.name]}", file=sys.stderr)
+        return results
+
+def main(argv=None):
+    args = _parse_args(argv)
+    # The app reads DATABASE_URL at import time, so set it before importing anything from app
+    os.environ["DATABASE_URL"] = args.database_url
+    # Every request comes from one client: per-client admission limits would
+    # turn most of them into 429s and the report would measure those
+    os.environ["ADMISSION_ENABLED"] = "false"
+
+    from app.db.database import Base, engine, SessionLocal
+    from app.models import user, note, group, notebook, notification, token  # noqa: F401
+    from benchmarks.dataset import DatasetConfig, seed_dataset
+
+    config = DatasetConfig(
+        users=args.users,
+        notes_per_user=args.notes_per_user,
+        tags=args.tags,
+        tags_per_note=args.tags_per_note,
+        share_fanout=args.share_fanout,
+        public_ratio=args.public_ratio,
+        content_size=args.content_size,
+        seed=args.seed,
+    )
+
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        seed_start = time.perf_counter()
+        dataset = seed_dataset(db, config)
+        seed_seconds = time.perf_counter() - seed_start
+    finally:
+        db.close()
+
+    scenarios = _build_scenarios(dataset)
+    if args.scenarios:
+        scenarios = [s for s in scenarios if s.name in args.scenarios]
+
+    results = asyncio.run(_run(args, dataset, scenarios))
+
+    report = {
+        "commit": _git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "database": engine.dialect.name,
+        "dataset": config.as_dict(),
+        "seed_seconds": round(seed_seconds, 3),
+        "requests_per_scenario": args.requests,
+        "concurrency": args.concurrency,
+        "results": results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+if __name__ == "__main__":
+    main()
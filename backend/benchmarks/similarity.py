@@ -0,0 +1,87 @@
+"""Benchmark MinHash signatures and per-owner LSH index queries: ``python -m benchmarks.similarity``."""
+import argparse
+import json
+import math
+import random
+import time
+
+def _document(rng: random.Random, sampler, vocabulary, words: int) -> str:
+    return " ".join(vocabulary[sampler.sample()] for _ in range(words))
+
+def _edited(rng: random.Random, document: str, rate: float) -> str:
+    words = document.split()
+    for position in range(len(words)):
+        if rng.random() < rate:
+            words[position] = f"edit{rng.randrange(1000)}"
+    return " ".join(words)
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(math.ceil(fraction * len(ordered))) - 1)]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--notes", type=int, default=100000)
+    parser.add_argument("--median-words", type=int, default=150)
+    parser.add_argument("--vocabulary", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--edit-rate", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    import numpy as np
+    from app.core.config import settings
+    from app.db.generate_data import ZipfSampler
+    from app.services.similarity import _OwnerIndex
+    from app.utils import minhash
+
+    rng = random.Random(args.seed)
+    sampler = ZipfSampler(args.vocabulary, 1.0, rng)
+    vocabulary = [f"word{i}" for i in range(args.vocabulary)]
+    documents = [
+        _document(rng, sampler, vocabulary, max(5, int(rng.lognormvariate(0, 0.75) * args.median_words)))
+        for _ in range(args.notes)
+    ]
+
+    start = time.perf_counter()
+    signatures = np.stack([minhash.signature(document) for document in documents])
+    signature_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    index = _OwnerIndex(np.arange(1, args.notes + 1, dtype=np.int64), signatures)
+    build_seconds = time.perf_counter() - start
+
+    related_ms, duplicate_ms = [], []
+    found = 0
+    candidates = 0
+    for query in range(args.queries):
+        position = rng.randrange(args.notes)
+        if query % 2 == 0:
+            start = time.perf_counter()
+            matches = index.query(signatures[position], settings.SIMILARITY_MIN_SCORE)
+            related_ms.append((time.perf_counter() - start) * 1000)
+            candidates += len(matches)
+        else:
+            sig = minhash.signature(_edited(rng, documents[position], args.edit_rate))
+            start = time.perf_counter()
+            matches = index.query(sig, settings.SIMILARITY_DUPLICATE_THRESHOLD)
+            duplicate_ms.append((time.perf_counter() - start) * 1000)
+            found += any(note_id == position + 1 for note_id, _ in matches)
+
+    print(json.dumps({
+        "notes": args.notes,
+        "num_perm": settings.SIMILARITY_NUM_PERM,
+        "bands": settings.SIMILARITY_BANDS,
+        "signatures_per_second": round(args.notes / signature_seconds, 1),
+        "index_build_seconds": round(build_seconds, 3),
+        "index_mb": round(index.nbytes / 1024 / 1024, 2),
+        "related_p50_ms": round(_percentile(related_ms, 0.5), 3),
+        "related_p99_ms": round(_percentile(related_ms, 0.99), 3),
+        "related_mean_matches": round(candidates / max(1, len(related_ms)), 1),
+        "duplicate_p50_ms": round(_percentile(duplicate_ms, 0.5), 3),
+        "duplicate_p99_ms": round(_percentile(duplicate_ms, 0.99), 3),
+        "duplicate_recall": round(found / max(1, len(duplicate_ms)), 4),
+    }, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Measure cold startup time of the API, including import time: ``python -m benchmarks.startup``."""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+_PROBE = """
+import time
+start = time.perf_counter()
+import asyncio
+import app.main as main
+imported = time.perf_counter()
+
+async def _startup():
+    async with main.lifespan(main.app):
+        pass
+
+asyncio.run(_startup())
+print(f"{imported - start} {time.perf_counter() - start}")
+"""
+
+def _parse_importtime(stderr: str, top: int):
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules.append((name.strip(), int(self_us), int(cumulative_us)))
+    # Self time points at the modules that are expensive on their own
+    modules.sort(key=lambda item: item[1], reverse=True)
+    return [
+        {"module": name, "self_ms": round(self_us / 1000, 2), "cumulative_ms": round(cumulative_us / 1000, 2)}
+        for name, self_us, cumulative_us in modules[:top]
+    ]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args(argv)
+
+    cwd = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    wall, imports, ready = [], [], []
+    slowest = []
+    for _ in range(args.runs):
+        started = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", _PROBE],
+            cwd=cwd, capture_output=True, text=True, check=True,
+        )
+        wall.append(time.perf_counter() - started)
+        import_seconds, ready_seconds = map(float, proc.stdout.split()[-2:])
+        imports.append(import_seconds)
+        ready.append(ready_seconds)
+        slowest = _parse_importtime(proc.stderr, args.top)
+
+    print(json.dumps({
+        "runs": args.runs,
+        "process_wall_ms": round(statistics.median(wall) * 1000, 1),
+        "import_ms": round(statistics.median(imports) * 1000, 1),
+        "import_and_lifespan_ms": round(statistics.median(ready) * 1000, 1),
+        "slowest_imports": slowest,
+    }, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,18 @@
+# Production server: gunicorn -c gunicorn.conf.py app.main:app
+#
+# The app is imported once in the master (preload_app) and forked into
+# workers, so workers start fast and share imported code pages.
+from app.core.config import settings
+
+bind = "0.0.0.0:8000"
+workers = settings.WEB_CONCURRENCY
+worker_class = "app.core.server.UvicornWorker"
+preload_app = True
+graceful_timeout = settings.GRACEFUL_SHUTDOWN_TIMEOUT
+timeout = 60
+keepalive = 5
+
+def post_fork(server, worker):
+    # Connections opened in the master must not be shared with forked workers
+    from app.db.database import engine
+    engine.dispose(close=False)
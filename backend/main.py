@@ -1,23 +1,29 @@
+"""Run the API with uvicorn: ``python main.py``, or ``python main.py --reload`` in development."""
+import argparse
 import uvicorn
-from app.main import app
-from app.db.init_db import init_db
-from app.db.init_data import init_test_data
-from app.db.database import SessionLocal
+from app.core.config import settings
 
-def init_application():
-    init_db()
-    
-    db = SessionLocal()
-    try:
-        init_test_data(db)
-    finally:
-        db.close()
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=settings.WEB_CONCURRENCY)
+    parser.add_argument("--loop", default=settings.SERVER_LOOP, choices=["auto", "asyncio", "uvloop"])
+    parser.add_argument("--http", default=settings.SERVER_HTTP, choices=["auto", "h11", "httptools"])
+    parser.add_argument("--reload", action="store_true", help="Auto-reload on code changes (development only)")
+    return parser.parse_args(argv)
 
 if __name__ == "__main__":
-    init_application()
+    args = parse_args()
     uvicorn.run(
         "app.main:app",
-        host="0.0.0.0",
-        port=8000,
-        reload=True
+        host=args.host,
+        port=args.port,
+        reload=args.reload,
+        workers=None if args.reload else args.workers,
+        loop=args.loop,
+        http=args.http,
+        lifespan="on",
+        timeout_graceful_shutdown=settings.GRACEFUL_SHUTDOWN_TIMEOUT,
+        proxy_headers=True,
     )
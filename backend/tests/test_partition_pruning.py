@@ -0,0 +1,75 @@
+"""Partition pruning of the note read paths; needs ``TEST_DATABASE_URL`` naming a disposable Postgres database."""
+import os
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from app.db.database import Base
+from app.db.partitioning import create_tables, partition_tables, verify
+from app.models import user, note, group, notebook, notification, token
+from app.models.group import GroupMember
+from app.models.note import Note, NoteAccess, AccessRoleEnum, VisibilityEnum
+from app.models.user import User
+from app.schemas.group import GroupCreate, NoteGroupShare as NoteGroupShareCreate
+from app.services.groups import GroupsService
+from app.services.notes import NotesService
+
+DATABASE_URL = os.getenv("TEST_DATABASE_URL", "")
+
+pytestmark = pytest.mark.skipif(
+    not DATABASE_URL.startswith("postgresql"), reason="TEST_DATABASE_URL must point at a Postgres database"
+)
+
+PARTITIONS = 8
+
+@pytest.fixture(scope="module")
+def db():
+    engine = create_engine(DATABASE_URL)
+    Base.metadata.drop_all(bind=engine)
+    create_tables(engine)
+    partition_tables(engine, PARTITIONS)
+    session = sessionmaker(bind=engine)()
+    try:
+        yield session
+    finally:
+        session.close()
+        Base.metadata.drop_all(bind=engine)
+        engine.dispose()
+
+@pytest.fixture(scope="module")
+def report(db):
+    users = [User(email=f"user{i}@example.com", hashed_password="x") for i in range(PARTITIONS)]
+    db.add_all(users)
+    db.flush()
+    notes = {}
+    for owner in users:
+        for i in range(3):
+            db_note = Note(title=f"note {i}", content="body", visibility=VisibilityEnum.PRIVATE, owner_id=owner.id)
+            db.add(db_note)
+            db.flush()
+            db.add(NoteAccess(user_id=owner.id, note_id=db_note.id, note_owner_id=owner.id, role=AccessRoleEnum.OWNER))
+            notes.setdefault(owner.id, []).append(db_note)
+    sharer, recipient, group_owner, member = users[:4]
+    db.add(NoteAccess(
+        user_id=recipient.id, note_id=notes[sharer.id][0].id, note_owner_id=sharer.id, role=AccessRoleEnum.SHARED
+    ))
+    db.commit()
+
+    created = GroupsService.create_group(db, GroupCreate(name="team"), group_owner)
+    db.add(GroupMember(group_id=created["id"], user_id=member.id))
+    db.commit()
+    NotesService.share_note_with_group(
+        db, notes[group_owner.id][0].id, NoteGroupShareCreate(group_id=created["id"]), group_owner
+    )
+    db.execute(text("ANALYZE"))
+    return verify(db)
+
+@pytest.mark.parametrize("path", [
+    "get_user_notes (own notes)",
+    "get_note (owner)",
+    "get_note (shared)",
+    "get_note (group share)",
+])
+def test_reads_only_the_owners_partition(report, path):
+    case = report["checked"][path]
+    assert len(case["expected"]) == 1
+    assert case["partitions"] == case["expected"]
@@ -25,7 +25,7 @@ interface UserSettings {
 }
 
 export default function SettingsPage() {
-  const { user, updateUser } = useAuth();
+  const { user, updateUser, logout } = useAuth();
   const { updateProfile, updatePassword, updatePreferences, deleteAccount, isLoading } = useSettingsStore();
   const [activeTab, setActiveTab] = useState('profile');
   const [showCurrentPassword, setShowCurrentPassword] = useState(false);
@@ -120,13 +120,8 @@ export default function SettingsPage() {
         current_password: settings.currentPassword,
         new_password: settings.newPassword,
       });
-      
-      setSettings(prev => ({
-        ...prev,
-        currentPassword: '',
-        newPassword: '',
-        confirmPassword: '',
-      }));
+      // Every session was signed out, this one included
+      logout();
     } catch (error) {
       // Error is already handled in the store
     }
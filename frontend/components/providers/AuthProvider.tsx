@@ -1,6 +1,6 @@
 'use client';
 
-import { createContext, useContext, useEffect, useState } from 'react';
+import { createContext, useContext, useEffect, useRef, useState } from 'react';
 import { useRouter } from 'next/navigation';
 import { toast } from 'react-hot-toast';
 
@@ -30,6 +30,13 @@ const AuthContext = createContext<AuthContextType | undefined>(undefined);
 
 const API_BASE_URL = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000';
 
+interface TokenResponse {
+  access_token: string;
+  refresh_token: string;
+  expires_in: number;
+  user: User;
+}
+
 export function useAuth() {
   const context = useContext(AuthContext);
   if (context === undefined) {
@@ -45,8 +52,61 @@ export default function AuthProvider({
 }) {
   const [user, setUser] = useState<User | null>(null);
   const [isLoading, setIsLoading] = useState(true);
+  const refreshTimer = useRef<ReturnType<typeof setTimeout> | null>(null);
   const router = useRouter();
 
+  const clearSession = () => {
+    if (refreshTimer.current) {
+      clearTimeout(refreshTimer.current);
+      refreshTimer.current = null;
+    }
+    localStorage.removeItem('token');
+    localStorage.removeItem('refresh_token');
+    localStorage.removeItem('user');
+  };
+
+  // Access tokens are short-lived: swap the refresh token for a new pair
+  // shortly before the current access token expires
+  const storeTokens = (data: TokenResponse) => {
+    localStorage.setItem('token', data.access_token);
+    localStorage.setItem('refresh_token', data.refresh_token);
+    if (refreshTimer.current) {
+      clearTimeout(refreshTimer.current);
+    }
+    refreshTimer.current = setTimeout(() => {
+      refreshTokens();
+    }, Math.max(data.expires_in - 60, 10) * 1000);
+  };
+
+  const refreshTokens = async (): Promise<User | null> => {
+    const refreshToken = localStorage.getItem('refresh_token');
+    if (!refreshToken) {
+      return null;
+    }
+    try {
+      const response = await fetch(`${API_BASE_URL}/api/auth/refresh`, {
+        method: 'POST',
+        headers: {
+          'Content-Type': 'application/json',
+        },
+        body: JSON.stringify({ refresh_token: refreshToken }),
+      });
+
+      if (!response.ok) {
+        clearSession();
+        setUser(null);
+        return null;
+      }
+
+      const data: TokenResponse = await response.json();
+      storeTokens(data);
+      return data.user;
+    } catch (error) {
+      console.error('Token refresh failed:', error);
+      return null;
+    }
+  };
+
   const validateToken = async (token: string): Promise<User | null> => {
     try {
       const response = await fetch(`${API_BASE_URL}/api/auth/me`, {
@@ -102,20 +162,27 @@ export default function AuthProvider({
     const initializeAuth = async () => {
       const token = localStorage.getItem('token');
       if (token) {
-        const validUser = await validateToken(token);
+        // Refreshing also validates the session and schedules the next refresh
+        const validUser = localStorage.getItem('refresh_token')
+          ? await refreshTokens()
+          : await validateToken(token);
         if (validUser) {
           setUser(validUser);
           saveUserToStorage(validUser);
         } else {
-
-          localStorage.removeItem('token');
-          localStorage.removeItem('user');
+          clearSession();
         }
       }
       setIsLoading(false);
     };
 
     initializeAuth();
+
+    return () => {
+      if (refreshTimer.current) {
+        clearTimeout(refreshTimer.current);
+      }
+    };
   }, []);
 
   const login = async (email: string, password: string) => {
@@ -133,8 +200,8 @@ export default function AuthProvider({
         throw new Error(errorData.detail || 'Login failed');
       }
 
-      const data = await response.json();
-      localStorage.setItem('token', data.access_token);
+      const data: TokenResponse = await response.json();
+      storeTokens(data);
       saveUserToStorage(data.user);
       setUser(data.user);
       router.push('/dashboard');
@@ -172,8 +239,20 @@ export default function AuthProvider({
   };
 
   const logout = () => {
-    localStorage.removeItem('token');
-    localStorage.removeItem('user');
+    const token = localStorage.getItem('token');
+    const refreshToken = localStorage.getItem('refresh_token');
+    if (token) {
+      // Revoke server-side too; the local session ends either way
+      fetch(`${API_BASE_URL}/api/auth/logout`, {
+        method: 'POST',
+        headers: {
+          'Content-Type': 'application/json',
+          'Authorization': `Bearer ${token}`,
+        },
+        body: JSON.stringify({ refresh_token: refreshToken }),
+      }).catch((error) => console.error('Logout failed:', error));
+    }
+    clearSession();
     setUser(null);
     router.push('/login');
   };
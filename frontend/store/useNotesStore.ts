@@ -19,7 +19,9 @@ export interface Note {
   tags: Tag[];
   visibility: NoteVisibility;
   owner_id: number;
-  shared_with?: string[];
+  notebook_id?: number | null;
+  // Direct shares only (the collaborators list), not group members
+  shared_count?: number;
   public_token?: string | null;
 }
 